@@ -5,63 +5,77 @@ from typing import Dict, List
 
 from sqlalchemy import func, select
 
-from .db import SessionLocal
-from .models import NormEvent, RawEvent
+from .db import AsyncSessionLocal, SessionLocal
+from .hotfeed import read_hot_feed, read_hot_feed_async
+from .models import EFFECTIVE_TIME, NormEvent, RawEvent
+
+
+def _counts_stmt(hours: int):
+    cutoff = dt.datetime.utcnow() - dt.timedelta(hours=hours)
+    return (
+        select(NormEvent.event_type, func.count())
+        .where(EFFECTIVE_TIME >= cutoff)
+        .group_by(NormEvent.event_type)
+    )
+
+
+def _enriched_stmt(limit: int):
+    return (
+        select(NormEvent, RawEvent.url)
+        .outerjoin(RawEvent, RawEvent.id == NormEvent.raw_id)
+        .order_by(
+            NormEvent.score.desc(),
+            EFFECTIVE_TIME.desc(),
+        )
+        .limit(limit)
+    )
+
+
+def _enriched_rows(rows) -> List[dict]:
+    return [
+        {
+            "time": str(row.event_time or row.created_at),
+            "stock_code": row.stock_code,
+            "corp": row.corp_name_kr,
+            "type": row.event_type,
+            "headline": row.headline,
+            "score": float(row.score) if row.score is not None else None,
+            "url": url,
+        }
+        for row, url in rows
+    ]
 
 
 def counts_by_type(hours: int = 24) -> Dict[str, int]:
     """Return counts of normalized events grouped by type for the last *hours*."""
-    cutoff = dt.datetime.utcnow() - dt.timedelta(hours=hours)
     with SessionLocal() as session:
-        rows = session.execute(
-            select(NormEvent.event_type, func.count())
-            .where(func.coalesce(NormEvent.event_time, NormEvent.created_at) >= cutoff)
-            .group_by(NormEvent.event_type)
-        ).all()
+        rows = session.execute(_counts_stmt(hours)).all()
+    return {event_type or "UNKNOWN": int(count) for event_type, count in rows}
+
+
+async def counts_by_type_async(hours: int = 24) -> Dict[str, int]:
+    """Async variant of counts_by_type."""
+    async with AsyncSessionLocal() as session:
+        rows = (await session.execute(_counts_stmt(hours))).all()
     return {event_type or "UNKNOWN": int(count) for event_type, count in rows}
 
 
 def top_enriched(limit: int = 50) -> List[dict]:
-    """Return the top *limit* normalized events ordered by score then recency."""
+    """Return the top *limit* normalized events ordered by score then recency.
+
+    Served from the decayed hot feed when it is populated and *limit* fits.
+    """
+    hot = read_hot_feed(limit)
+    if hot is not None:
+        return hot
     with SessionLocal() as session:
-        rows = (
-            session.execute(
-                select(NormEvent)
-                .order_by(
-                    NormEvent.score.desc(),
-                    func.coalesce(NormEvent.event_time, NormEvent.created_at).desc(),
-                )
-                .limit(limit)
-            )
-            .scalars()
-            .all()
-        )
+        return _enriched_rows(session.execute(_enriched_stmt(limit)).all())
+
 
-        enriched = []
-        for row in rows:
-            url = None
-            try:
-                raw_id = int((row.ref_raw_ids or "").split(",")[0])
-                if raw_id:
-                    raw = session.execute(
-                        select(RawEvent).where(RawEvent.id == raw_id)
-                    ).scalar_one_or_none()
-                    if raw:
-                        url = raw.url
-            except (ValueError, TypeError):
-                # ref_raw_ids may be empty or malformed; ignore and continue
-                pass
-
-            enriched.append(
-                {
-                    "time": str(row.event_time or row.created_at),
-                    "stock_code": row.stock_code,
-                    "corp": row.corp_name_kr,
-                    "type": row.event_type,
-                    "headline": row.headline,
-                    "score": float(row.score) if row.score is not None else None,
-                    "url": url,
-                }
-            )
-
-    return enriched
+async def top_enriched_async(limit: int = 50) -> List[dict]:
+    """Async variant of top_enriched."""
+    hot = await read_hot_feed_async(limit)
+    if hot is not None:
+        return hot
+    async with AsyncSessionLocal() as session:
+        return _enriched_rows((await session.execute(_enriched_stmt(limit))).all())
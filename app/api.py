@@ -1,17 +1,30 @@
-from fastapi import FastAPI
-from fastapi.responses import RedirectResponse
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from fastapi import FastAPI, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 
-from .scorer import top_today, init_db_and_seed
+from . import dataversion, http_client, ratelimit
+from .db import async_engine
+from .scorer import top_today_async, init_db_and_seed
 from .fetch_dart import fetch_dart_today
 from .fetch_news_naver import fetch_naver_news
 from .normalizer import normalize_recent
-from .analytics import counts_by_type, top_enriched
-from .realtime import router as live_router
+from .hotfeed import refresh_hot_feed
+from .leader import INGEST, LeaderLock
+from .analytics import counts_by_type_async, top_enriched_async
+from .realtime import live_cache_stats, router as live_router
+from .eventbus import router as events_router
 
 app = FastAPI(title="CB Scanner (Dashboard)", version="0.4.0")
 
 app.include_router(live_router)
+app.include_router(events_router)
 
 
 @app.on_event("startup")
@@ -19,6 +32,13 @@ def startup():
     init_db_and_seed()
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    await http_client.aclose()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
 @app.get("/", include_in_schema=False)
 def root_redirect():
     return RedirectResponse(url="/dash/")
@@ -28,31 +48,95 @@ def root_redirect():
 app.mount("/dash", StaticFiles(directory="public", html=True), name="dash")
 
 
+# ----- Read-only response cache (ETag / 304) -----
+# Entries are keyed by path + query string and tagged with the data version
+# bumped whenever normalization or the hot feed commits, so a cached body is
+# valid until the next ingest cycle.
+CACHE_MAX_ENTRIES = 256
+_cache: "OrderedDict[str, tuple[int, str, bytes]]" = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0, "not_modified": 0}
+
+
+async def _cached_json(
+    request: Request, build: Callable[[], Awaitable[object]]
+) -> Response:
+    version = await dataversion.current_async()
+    params = sorted(request.query_params.multi_items())
+    key = request.url.path + "?" + "&".join(f"{k}={v}" for k, v in params)
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == version:
+            _cache.move_to_end(key)
+            _cache_stats["hits"] += 1
+        else:
+            entry = None
+    if entry is None:
+        body = json.dumps(jsonable_encoder(await build()), ensure_ascii=False).encode()
+        digest = hashlib.blake2b(body, digest_size=8).hexdigest()
+        # content-derived, so an unchanged body still yields 304 after a bump
+        entry = (version, f'W/"{digest}"', body)
+        with _cache_lock:
+            _cache[key] = entry
+            _cache.move_to_end(key)
+            while len(_cache) > CACHE_MAX_ENTRIES:
+                _cache.popitem(last=False)
+            _cache_stats["misses"] += 1
+
+    _, etag, body = entry
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        with _cache_lock:
+            _cache_stats["not_modified"] += 1
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
 @app.get("/api/health")
 def health():
     return {"ok": True}
 
 
+@app.get("/api/metrics")
+async def metrics():
+    with _cache_lock:
+        cache = {**_cache_stats, "entries": len(_cache)}
+    return {
+        "upstreams": ratelimit.snapshot(),
+        "response_cache": cache,
+        "live_cache": live_cache_stats(),
+        "data_version": await dataversion.current_async(),
+    }
+
+
 @app.get("/api/top")
-def api_top(limit: int = 10):
-    return top_today(limit=limit)
+async def api_top(request: Request, limit: int = 10):
+    return await _cached_json(request, lambda: top_today_async(limit=limit))
 
 
 @app.get("/api/top_enriched")
-def api_top_enriched(limit: int = 50):
-    return top_enriched(limit=limit)
+async def api_top_enriched(request: Request, limit: int = 50):
+    return await _cached_json(request, lambda: top_enriched_async(limit=limit))
 
 
 @app.get("/api/stats/by_type")
-def api_stats_by_type(hours: int = 24):
-    return counts_by_type(hours=hours)
+async def api_stats_by_type(request: Request, hours: int = 24):
+    return await _cached_json(request, lambda: counts_by_type_async(hours=hours))
 
 
 @app.post("/api/run/once")
 def run_once():
-    fetch_dart_today()
-    fetch_naver_news()
-    normalize_recent()
+    # never overlap the scheduler leader or a run/once in another worker
+    with LeaderLock(INGEST) as leader:
+        if not leader:
+            return JSONResponse(
+                {"status": "busy", "detail": "ingest is running in another process"},
+                status_code=409,
+            )
+        fetch_dart_today()
+        fetch_naver_news()
+        normalize_recent()
+        refresh_hot_feed()
     return {"status": "ok"}
 
 
@@ -0,0 +1,312 @@
+"""Near-duplicate clustering of raw events into one NormEvent each.
+
+One filing typically shows up as a DART disclosure plus a burst of
+syndicated Naver articles with slightly different headlines. Each article
+headline gets a 64-bit SimHash over character shingles. A new article joins
+a recent cluster of the same bucket (stock code, else corp name; see
+bucket_key) within WINDOW if their signatures differ in at most MAX_HAMMING
+bits.
+
+DART titles are generic form names ("주요사항보고서(전환사채권발행결정)"), so
+filings never take part in SimHash matching. A filing with a stock code
+joins the latest unofficial cluster of the same code and event type, which
+upgrades that cluster to official with the filing as its primary source;
+other unofficial clusters of that code and type in WINDOW (rewritten
+headlines of the same story) are merged into it. Other filings start
+clusters of their own. An article whose headline matches no cluster joins
+the latest official cluster of its code and event type, so news that
+follows a filing lands in the filing's cluster.
+
+Candidates come from a banded LSH index of recent clusters: the signature
+is cut into BANDS bands, so any two signatures within MAX_HAMMING bits share
+at least one band exactly. A probe touches only the buckets of its own
+bands, never the whole table. The index lives in the normalizing process
+(the ingest leader). It is warmed from recent norm_events once, then
+catches up on new event ids each batch.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import re
+from collections import defaultdict
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .match_ticker import normalize_corp_name
+from .models import EFFECTIVE_TIME, NormEvent
+
+SHINGLE = 3
+# Syndicated copies differ mostly in decoration, which normalize_headline()
+# strips, so they land within a few bits; rewritten headlines are 12+ bits
+# apart and are left to the official-filing rule below.
+MAX_HAMMING = 3
+BANDS = MAX_HAMMING + 1  # pigeonhole: <= MAX_HAMMING differing bits spare a band
+WINDOW = dt.timedelta(hours=24)
+
+_MASK = (1 << 64) - 1
+_BAND_BITS = 64 // BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+
+# [속보], (종합), 따옴표 등 기사마다 달라지는 장식 제거
+_DECORATION = re.compile(r"\[[^\]]*\]|\([^)]*\)|【[^】]*】")
+_NON_WORD = re.compile(r"[^0-9a-z가-힣]+")
+
+
+def normalize_headline(text: str | None) -> str:
+    t = _DECORATION.sub(" ", (text or "").lower())
+    return _NON_WORD.sub("", t)
+
+
+def _grams(t: str) -> set[str]:
+    """Character SHINGLE-grams of an already normalized string."""
+    if len(t) <= SHINGLE:
+        return {t} if t else set()
+    return {t[i : i + SHINGLE] for i in range(len(t) - SHINGLE + 1)}
+
+
+# headlines of one story share most grams; hashing dominated simhash_many
+@lru_cache(maxsize=1 << 16)
+def _gram_hash(g: str) -> int:
+    return int.from_bytes(hashlib.blake2b(g.encode(), digest_size=8).digest(), "little")
+
+
+def _shingle_hashes(text: str | None) -> list[int]:
+    return [_gram_hash(g) for g in _grams(normalize_headline(text))]
+
+
+def _to_signed(sig: int) -> int:
+    # stored in a signed BIGINT column
+    return sig - (1 << 64) if sig >= 1 << 63 else sig
+
+
+def simhash(text: str | None) -> int:
+    return simhash_hashes(_shingle_hashes(text))
+
+
+def simhash_hashes(hashes: list[int]) -> int:
+    sig = 0
+    for bit in range(64):
+        ones = sum((h >> bit) & 1 for h in hashes)
+        if ones * 2 > len(hashes):
+            sig |= 1 << bit
+    return _to_signed(sig)
+
+
+def simhash_many(texts: Iterable[str | None]) -> list[int]:
+    """simhash() over many texts, vectorized with numpy when available."""
+    per_text = [_shingle_hashes(t) for t in texts]
+    try:
+        import numpy as np
+    except ImportError:
+        return [simhash_hashes(h) for h in per_text]
+
+    counts = np.array([len(h) for h in per_text], dtype=np.int64)
+    if not counts.sum():
+        return [0] * len(per_text)
+    flat = np.fromiter(
+        (h for hs in per_text for h in hs), dtype=np.uint64, count=int(counts.sum())
+    )
+    # (shingles x 64) bit matrix, summed per text with one reduceat
+    bits = np.unpackbits(flat.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    nonempty = counts > 0
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[nonempty]
+    ones = np.add.reduceat(bits, starts, axis=0, dtype=np.uint16)
+    majority = ones * 2 > counts[nonempty, None]
+    packed = np.packbits(majority, axis=1, bitorder="little").view("<u8").ravel()
+    out = [0] * len(per_text)
+    for i, sig in zip(np.flatnonzero(nonempty), packed.tolist()):
+        out[i] = _to_signed(sig)
+    return out
+
+
+def hamming(a: int, b: int) -> int:
+    return ((a ^ b) & _MASK).bit_count()
+
+
+def _utc_naive(t) -> Optional[dt.datetime]:
+    if t is None or not isinstance(t, dt.datetime):
+        return None
+    if t.tzinfo is not None:
+        t = t.astimezone(dt.timezone.utc).replace(tzinfo=None)
+    return t
+
+
+def bucket_key(code: str | None, corp_name: str | None) -> str:
+    """Partition a row is clustered in: its stock code, else its corp name.
+
+    Rows naming neither share the "" bucket. Rows with different codes or
+    names never meet, so two companies cannot end up in one cluster.
+    """
+    if code:
+        return code
+    name = normalize_corp_name(corp_name)
+    return f"name:{name}" if name else ""
+
+
+class Cluster:
+    __slots__ = ("event_id", "sig", "bucket", "time", "event_type", "official")
+
+    def __init__(self, event_id, sig, bucket, time, event_type, official):
+        self.event_id = event_id
+        self.sig = sig  # None: not matched by headline (started by a filing)
+        self.bucket = bucket
+        self.time = _utc_naive(time)
+        self.event_type = event_type
+        self.official = bool(official)
+
+
+class LshIndex:
+    """Banded SimHash index of recent clusters, partitioned by bucket_key()."""
+
+    def __init__(self):
+        self.clusters: dict[int, Cluster] = {}
+        self.last_event_id = 0
+        self._bands: dict[tuple, set[int]] = defaultdict(set)
+        self._by_bucket: dict[str, set[int]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self.clusters)
+
+    @staticmethod
+    def _band_keys(bucket: str, sig: int):
+        sig &= _MASK
+        for band in range(BANDS):
+            yield (bucket, band, (sig >> (band * _BAND_BITS)) & _BAND_MASK)
+
+    def add(self, c: Cluster):
+        self.clusters[c.event_id] = c
+        self._by_bucket[c.bucket].add(c.event_id)
+        if c.sig is not None:
+            for key in self._band_keys(c.bucket, c.sig):
+                self._bands[key].add(c.event_id)
+
+    def discard(self, event_id: int) -> Optional[Cluster]:
+        c = self.clusters.pop(event_id, None)
+        if c is not None:
+            self._by_bucket[c.bucket].discard(event_id)
+            if c.sig is not None:
+                for key in self._band_keys(c.bucket, c.sig):
+                    self._bands[key].discard(event_id)
+        return c
+
+    def rekey(self, old_id: int, new_id: int):
+        c = self.discard(old_id)
+        if c is not None:
+            c.event_id = new_id
+            self.add(c)
+
+    def _in_window(self, c: Cluster, t: dt.datetime) -> bool:
+        return c.time is None or abs(c.time - t) <= WINDOW
+
+    def probe(self, sig: int, bucket: str, t) -> Optional[Cluster]:
+        """Closest cluster of *bucket* within MAX_HAMMING bits of *sig* near *t*."""
+        t = _utc_naive(t)
+        best, best_d = None, MAX_HAMMING + 1
+        seen: set[int] = set()
+        for key in self._band_keys(bucket, sig):
+            for event_id in self._bands.get(key, ()):
+                if event_id in seen:
+                    continue
+                seen.add(event_id)
+                c = self.clusters[event_id]
+                d = hamming(sig, c.sig)
+                if d < best_d and self._in_window(c, t):
+                    best, best_d = c, d
+        return best
+
+    def _latest(self, code: str, event_type: str, t, official: bool):
+        t = _utc_naive(t)
+        best = None
+        for event_id in self._by_bucket.get(code, ()):
+            c = self.clusters[event_id]
+            if c.official != official or c.event_type != event_type:
+                continue
+            if not self._in_window(c, t):
+                continue
+            if best is None or (c.time or t) > (best.time or t):
+                best = c
+        return best
+
+    def probe_official(self, code: str, event_type: str, t) -> Optional[Cluster]:
+        """Latest unofficial cluster of stock *code* and *event_type* near *t*."""
+        return self._latest(code, event_type, t, official=False)
+
+    def probe_filed(self, code: str, event_type: str, t) -> Optional[Cluster]:
+        """Latest official cluster of stock *code* and *event_type* near *t*.
+
+        The fallback for news whose headline matched nothing: clusters
+        started by a filing have no signature to match.
+        """
+        return self._latest(code, event_type, t, official=True)
+
+    def siblings(self, c: Cluster, t) -> list[Cluster]:
+        """Other unofficial clusters *c*'s filing also covers (same code/type)."""
+        t = _utc_naive(t)
+        out = []
+        for event_id in self._by_bucket.get(c.bucket, ()):
+            o = self.clusters[event_id]
+            if event_id == c.event_id or o.official or o.event_type != c.event_type:
+                continue
+            if self._in_window(o, t):
+                out.append(o)
+        return out
+
+    def prune(self, now: dt.datetime):
+        cutoff = _utc_naive(now) - WINDOW
+        for c in [c for c in self.clusters.values() if c.time and c.time < cutoff]:
+            self.discard(c.event_id)
+
+    def sync(self, s: Session, now: dt.datetime):
+        """Load clusters committed since the last sync (all recent on first)."""
+        now = _utc_naive(now)
+        stmt = (
+            select(
+                NormEvent.event_id,
+                NormEvent.simhash,
+                NormEvent.stock_code,
+                NormEvent.corp_name_kr,
+                EFFECTIVE_TIME.label("time"),
+                NormEvent.event_type,
+                NormEvent.has_official,
+            )
+            .where(NormEvent.event_id > self.last_event_id)
+            .order_by(NormEvent.event_id)
+        )
+        if self.last_event_id == 0:
+            stmt = stmt.where(EFFECTIVE_TIME >= now - WINDOW)
+        for r in s.execute(stmt):
+            self.add(
+                Cluster(
+                    r.event_id,
+                    r.simhash,
+                    bucket_key(r.stock_code, r.corp_name_kr),
+                    r.time,
+                    r.event_type,
+                    r.has_official,
+                )
+            )
+            self.last_event_id = r.event_id
+        self.prune(now)
+
+
+_INDEX: Optional[LshIndex] = None
+
+
+def recent_index(s: Session, now: dt.datetime) -> LshIndex:
+    """The process-wide index, caught up with norm_events."""
+    global _INDEX
+    if _INDEX is None:
+        _INDEX = LshIndex()
+    _INDEX.sync(s, now)
+    return _INDEX
+
+
+def reset_index():
+    """Forget the in-memory index (e.g. after a failed normalization batch)."""
+    global _INDEX
+    _INDEX = None
@@ -0,0 +1,176 @@
+"""Tag listed companies mentioned in news headlines.
+
+Naver items carry no issuer, so at ingest (and in /api/live/news) the title
+and description are scanned for every dim_listing name and alias. One
+Aho-Corasick automaton over all names (lower-cased) finds every occurrence
+in a single left-to-right pass. It is compiled once per ticker index
+snapshot, so it is rebuilt only when the listing version changes.
+
+Disambiguation, applied to the raw hits:
+- a mention must start at a word boundary ("한국전력" is not in "대한국전력");
+- names ending in a latin letter/digit need a latin boundary after them
+  ("SK" is not in "SKY");
+- short Hangul names (< SHORT_NAME_LEN) must be followed by a non-word
+  character or a single particle ("효성이 ..." but not "대상으로");
+- overlapping mentions resolve leftmost-longest ("삼성전자우" over "삼성전자").
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections import deque
+from typing import Iterable, NamedTuple, Optional
+
+from .match_ticker import TickerIndex, normalize_corp_name
+
+SHORT_NAME_LEN = 3
+# 조사: 짧은 회사명 바로 뒤에 붙어도 언급으로 인정
+PARTICLES = frozenset("은는이가을를의도와과에")
+
+_WORD = re.compile(r"[0-9a-z가-힣]")
+_LATIN = re.compile(r"[0-9a-z]")
+
+
+class Mention(NamedTuple):
+    start: int
+    end: int
+    stock_code: str
+
+
+def _is(pattern: re.Pattern, ch: str) -> bool:
+    return bool(pattern.match(ch))
+
+
+class CompanyTagger:
+    """Aho-Corasick automaton over company names (see module docstring)."""
+
+    def __init__(self, names: Iterable[tuple[str, str]]):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[Optional[tuple[int, str]]] = [None]  # (length, code)
+        self._out_link: list[int] = [0]  # next suffix state with an output
+        for name, code in names:
+            self._add(name.lower(), code)
+        self._link()
+
+    def _add(self, name: str, code: str):
+        if not name:
+            return
+        state = 0
+        for ch in name:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(None)
+                self._out_link.append(0)
+            state = nxt
+        if self._out[state] is None:  # first code wins for an ambiguous alias
+            self._out[state] = (len(name), code)
+
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[nxt] = target
+                self._out_link[nxt] = (
+                    target if self._out[target] is not None else self._out_link[target]
+                )
+                queue.append(nxt)
+
+    def _hits(self, text: str):
+        goto, fail, out, out_link = self._goto, self._fail, self._out, self._out_link
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            s = state if out[state] is not None else out_link[state]
+            while s:
+                length, code = out[s]
+                yield Mention(i + 1 - length, i + 1, code)
+                s = out_link[s]
+
+    @staticmethod
+    def _bounded(text: str, m: Mention) -> bool:
+        if m.start and _is(_WORD, text[m.start - 1]):
+            return False
+        if m.end == len(text):
+            return True
+        after = text[m.end]
+        if _is(_LATIN, text[m.end - 1]):
+            return not _is(_LATIN, after)
+        if m.end - m.start < SHORT_NAME_LEN and _is(_WORD, after):
+            nxt = text[m.end + 1] if m.end + 1 < len(text) else ""
+            return after in PARTICLES and not (nxt and _is(_WORD, nxt))
+        return True
+
+    def find(self, text: Optional[str]) -> list[Mention]:
+        """Non-overlapping mentions in *text*, leftmost-longest, in order."""
+        if not text:
+            return []
+        t = text.lower()
+        hits = sorted(
+            (m for m in self._hits(t) if self._bounded(t, m)),
+            key=lambda m: (m.start, -m.end),
+        )
+        out: list[Mention] = []
+        for m in hits:
+            if out and m.start < out[-1].end:
+                continue
+            out.append(m)
+        return out
+
+    def tag(self, *texts: Optional[str]) -> list[str]:
+        """Distinct stock codes mentioned in *texts*, in order of appearance."""
+        codes: dict[str, None] = {}
+        for text in texts:
+            for m in self.find(text):
+                codes.setdefault(m.stock_code)
+        return list(codes)
+
+
+def _names(index: TickerIndex) -> Iterable[tuple[str, str]]:
+    for name, code in index.exact.items():
+        yield name, code
+        bare = normalize_corp_name(name)  # '(주)에스티팜' -> '에스티팜'
+        if bare and bare != name.lower():
+            yield bare, code
+
+
+_CACHE: tuple[int, CompanyTagger] | None = None
+_LOCK = threading.Lock()
+
+
+def tagger_for(index: TickerIndex) -> CompanyTagger:
+    """The automaton for *index*, compiled once per index version."""
+    global _CACHE
+    cached = _CACHE
+    if cached is not None and cached[0] == index.version:
+        return cached[1]
+    with _LOCK:
+        if _CACHE is None or _CACHE[0] != index.version:
+            _CACHE = (index.version, CompanyTagger(_names(index)))
+        return _CACHE[1]
+
+
+def tag_news(
+    index: TickerIndex, title: Optional[str], description: Optional[str]
+) -> tuple[Optional[str], Optional[str], list[str]]:
+    """(corp name, stock code, all codes) for one article.
+
+    The primary company is the first one named in the title, else in the
+    description; its name is the listing's canonical name.
+    """
+    codes = tagger_for(index).tag(title, description)
+    if not codes:
+        return None, None, []
+    return index.name_of.get(codes[0]), codes[0], codes
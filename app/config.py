@@ -14,6 +14,11 @@ class Settings(BaseModel):
         for s in os.getenv("NAVER_NEWS_QUERIES", "전환사채,리픽싱").split(",")
         if s.strip()
     ]
+    # upstream call budgets (see app/ratelimit.py)
+    NAVER_DAILY_BUDGET: int = int(os.getenv("NAVER_DAILY_BUDGET", "25000"))
+    NAVER_RATE_PER_SEC: float = float(os.getenv("NAVER_RATE_PER_SEC", "8"))
+    DART_DAILY_BUDGET: int = int(os.getenv("DART_DAILY_BUDGET", "20000"))
+    DART_RATE_PER_SEC: float = float(os.getenv("DART_RATE_PER_SEC", "4"))
     PG_DSN: str | None = os.getenv("PG_DSN") or None
     TZ: str = "Asia/Seoul"
 
@@ -0,0 +1,162 @@
+"""DART corp master (dim_corp) loaded from corpCode.xml.
+
+DART publishes every filer as one zipped XML (~100k <list> entries) keyed by
+an 8-digit corp_code; listed companies also carry a stock_code. The zip is
+streamed to a temporary file, the XML is parsed incrementally (iterparse,
+clearing each element), and only new or modified entries (by modify_date)
+are upserted in executemany chunks. Changes bump dataversion.LISTING_KEY,
+so every process reloads its ticker index (app.match_ticker).
+
+사용법:
+    python -m app.corp_master
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import logging
+import tempfile
+import xml.etree.ElementTree as ET
+import zipfile
+from typing import IO, Iterator
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from . import dataversion, http_client, ratelimit
+from .config import settings
+from .db import SessionLocal
+from .match_ticker import invalidate_ticker_index
+from .models import DimCorp
+
+LOGGER = logging.getLogger("cb.corp_master")
+
+CORP_CODE_URL = "https://opendart.fss.or.kr/api/corpCode.xml"
+LOAD_CHUNK = 2000
+DOWNLOAD_TIMEOUT = 60.0
+
+_UPDATE_COLUMNS = ("corp_name", "stock_code", "modify_date", "updated_at")
+
+
+def _upsert(dialect: str):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:  # MySQL / MariaDB
+        from sqlalchemy.dialects.mysql import insert
+
+        stmt = insert(DimCorp)
+        return stmt.on_duplicate_key_update(
+            {c: stmt.inserted[c] for c in _UPDATE_COLUMNS}
+        )
+    stmt = insert(DimCorp)
+    return stmt.on_conflict_do_update(
+        index_elements=["corp_code"],
+        set_={c: stmt.excluded[c] for c in _UPDATE_COLUMNS},
+    )
+
+
+def _check_error_body(f: IO[bytes]):
+    """corpCode.xml answers errors with a small XML/JSON status document."""
+    f.seek(0)
+    body = f.read(4096).decode("utf-8", "replace")
+    status = message = None
+    try:
+        root = ET.fromstring(body)
+        status, message = root.findtext("status"), root.findtext("message")
+    except ET.ParseError:
+        pass
+    ratelimit.check_dart_status({"status": status})
+    raise RuntimeError(f"DART corpCode.xml status {status}: {message or body[:200]}")
+
+
+def iter_corps(f: IO[bytes]) -> Iterator[dict]:
+    """Yield dim_corp rows from a corpCode.xml zip without building the tree."""
+    with zipfile.ZipFile(f) as zf:
+        member = next(n for n in zf.namelist() if n.lower().endswith(".xml"))
+        with zf.open(member) as xml:
+            for _, elem in ET.iterparse(xml, events=("end",)):
+                if elem.tag != "list":
+                    continue
+                corp_code = (elem.findtext("corp_code") or "").strip()
+                if corp_code:
+                    yield {
+                        "corp_code": corp_code,
+                        "corp_name": (elem.findtext("corp_name") or "").strip(),
+                        "stock_code": (elem.findtext("stock_code") or "").strip()
+                        or None,
+                        "modify_date": (elem.findtext("modify_date") or "").strip()
+                        or None,
+                    }
+                elem.clear()
+
+
+def load_corps(s: Session, corps: Iterator[dict]) -> int:
+    """Upsert new / modified corps; returns rows written. The caller commits."""
+    known = dict(s.execute(select(DimCorp.corp_code, DimCorp.modify_date)).all())
+    stmt = _upsert(s.get_bind().dialect.name)
+    now = dt.datetime.utcnow()
+    written = 0
+    batch: list[dict] = []
+    for row in corps:
+        code = row["corp_code"]
+        if code in known and known[code] == row["modify_date"]:
+            continue
+        row["updated_at"] = now
+        batch.append(row)
+        if len(batch) >= LOAD_CHUNK:
+            s.execute(stmt, batch)
+            written += len(batch)
+            batch = []
+    if batch:
+        s.execute(stmt, batch)
+        written += len(batch)
+    return written
+
+
+def refresh_corp_master() -> int:
+    """Download corpCode.xml and sync dim_corp; returns rows written."""
+    api_key = settings.DART_API_KEY
+    if not api_key:
+        LOGGER.warning("DART_API_KEY is not configured; skipping corp master")
+        return 0
+
+    with tempfile.TemporaryFile() as f:
+        size = http_client.run(
+            http_client.download(
+                CORP_CODE_URL,
+                f,
+                params={"crtfc_key": api_key},
+                timeout=DOWNLOAD_TIMEOUT,
+            )
+        )
+        if not zipfile.is_zipfile(f):
+            _check_error_body(f)
+        ratelimit.check_dart_status({"status": "000"})
+        f.seek(0)
+        with SessionLocal() as s:
+            written = load_corps(s, iter_corps(f))
+            if written:
+                dataversion.bump(s, dataversion.LISTING_KEY)
+            s.commit()
+    if written:
+        invalidate_ticker_index()
+    LOGGER.info("corp master refreshed (%d bytes, written=%d)", size, written)
+    return written
+
+
+def ensure_corp_master() -> int:
+    """Load the corp master once if dim_corp is still empty."""
+    with SessionLocal() as s:
+        if s.execute(select(func.count()).select_from(DimCorp)).scalar():
+            return 0
+    return refresh_corp_master()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
+    )
+    print(f"corp master: written={refresh_corp_master()}")
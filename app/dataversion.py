@@ -0,0 +1,105 @@
+"""Monotonic data version shared by every process through ingest_state.
+
+Writers bump it inside the transaction that changes what the dashboard
+shows; readers (API response cache, event hubs) poll it at most every
+CHECK_EVERY_SEC. Other keys version other shared data the same way, e.g.
+LISTING_KEY for dim_listing / dim_corp, which every process caches as a ticker index.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import threading
+import time
+
+from sqlalchemy import insert as sa_insert, select, update
+from sqlalchemy.orm import Session
+
+from .db import AsyncSessionLocal, SessionLocal
+from .models import IngestState
+
+KEY = "data.version"
+LISTING_KEY = "listing.version"
+CHECK_EVERY_SEC = 2.0
+
+_lock = threading.Lock()
+_cached: dict[str, tuple[int, float]] = {}  # key -> (version, monotonic time read)
+
+
+def _insert_ignore(dialect: str):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+
+        return insert(IngestState).on_conflict_do_nothing(index_elements=["name"])
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+
+        return insert(IngestState).on_conflict_do_nothing(index_elements=["name"])
+    # MySQL / MariaDB
+    return sa_insert(IngestState).prefix_with("IGNORE")
+
+
+def ensure_state(session: Session, name: str, value: int = 0) -> bool:
+    """Create the ingest_state row *name* unless it exists; True if created.
+
+    An INSERT that skips an existing row, so processes creating the same
+    row for the first time do not fail each other with an IntegrityError.
+    """
+    stmt = _insert_ignore(session.get_bind().dialect.name)
+    result = session.execute(
+        stmt.values(name=name, value=value, updated_at=dt.datetime.utcnow())
+    )
+    return result.rowcount == 1
+
+
+def bump(session: Session, key: str = KEY, by: int = 1) -> int:
+    """Increment the version as part of *session*'s pending transaction.
+
+    A single ``UPDATE ... SET value = value + by``: concurrent writers never
+    hand out the same version, and the row lock it takes is held until
+    commit, so versions become visible in the order they were handed out.
+    Returns the new version; ``by`` > 1 reserves the *by* versions ending
+    there (e.g. one change sequence number per touched NormEvent).
+    """
+    stmt = (
+        update(IngestState)
+        .where(IngestState.name == key)
+        .values(value=IngestState.value + by, updated_at=dt.datetime.utcnow())
+    )
+    if session.execute(stmt).rowcount == 0:
+        ensure_state(session, key)
+        session.execute(stmt)
+    return session.execute(
+        select(IngestState.value).where(IngestState.name == key)
+    ).scalar_one()
+
+
+def current(key: str = KEY) -> int:
+    """Latest committed version, re-read from the DB at most every few seconds."""
+    version, read_at = _cached.get(key, (0, -CHECK_EVERY_SEC))
+    now = time.monotonic()
+    if now - read_at < CHECK_EVERY_SEC:
+        return version
+    with _lock:
+        version, read_at = _cached.get(key, (0, -CHECK_EVERY_SEC))
+        if now - read_at >= CHECK_EVERY_SEC:
+            with SessionLocal() as s:
+                state = s.get(IngestState, key)
+            version = state.value if state is not None else 0
+            _cached[key] = (version, now)
+        return version
+
+
+async def current_async(key: str = KEY) -> int:
+    """current() without blocking the event loop on the DB read."""
+    version, read_at = _cached.get(key, (0, -CHECK_EVERY_SEC))
+    now = time.monotonic()
+    if now - read_at < CHECK_EVERY_SEC:
+        return version
+    async with AsyncSessionLocal() as s:
+        state = await s.get(IngestState, key)
+    version = state.value if state is not None else 0
+    with _lock:
+        if now >= _cached.get(key, (0, -CHECK_EVERY_SEC))[1]:
+            _cached[key] = (version, now)
+    return version
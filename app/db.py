@@ -1,9 +1,70 @@
+import asyncio
+import importlib.util
+import logging
+
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from .config import settings
 
+LOGGER = logging.getLogger("cb.db")
+
 if settings.PG_DSN:
     engine = create_engine(settings.PG_DSN, pool_pre_ping=True, future=True)
 else:
     engine = create_engine("sqlite:///cb_scanner.db", future=True)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+
+# Async twin of the engine above for the FastAPI event loop, when the async
+# driver for the backend is installed (asyncpg/aiosqlite ship in
+# requirements.txt; aiomysql is optional).
+_ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite", "mysql": "aiomysql"}
+
+
+class _ThreadedSession:
+    """AsyncSession stand-in over a sync Session, run in worker threads.
+
+    Covers what the async read paths use (execute / get); results are
+    buffered in the thread, so nothing touches the connection on the loop.
+    """
+
+    def __init__(self):
+        self._s = SessionLocal()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await asyncio.to_thread(self._s.close)
+
+    async def execute(self, statement, *args, **kwargs):
+        def run():
+            return self._s.execute(statement, *args, **kwargs).freeze()
+
+        return (await asyncio.to_thread(run))()
+
+    async def get(self, entity, ident, **kwargs):
+        return await asyncio.to_thread(self._s.get, entity, ident, **kwargs)
+
+
+def _async_driver(backend: str):
+    driver = _ASYNC_DRIVERS.get(backend)
+    if driver is None or importlib.util.find_spec(driver) is None:
+        return None
+    return driver
+
+
+_backend = engine.url.get_backend_name()
+_driver = _async_driver(_backend)
+if _driver is not None:
+    async_engine = create_async_engine(
+        engine.url.set(drivername=f"{_backend}+{_driver}"),
+        pool_pre_ping=bool(settings.PG_DSN),
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+else:
+    LOGGER.info("no async driver for %s; async reads use worker threads", _backend)
+    async_engine = None
+    AsyncSessionLocal = _ThreadedSession
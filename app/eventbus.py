@@ -0,0 +1,272 @@
+"""Push new and changed NormEvents to SSE clients (/api/events/stream).
+
+normalize_recent() calls notify() inside its transaction. Once that
+transaction commits, hubs in the same process wake up directly. On
+PostgreSQL a NOTIFY is also sent, which reaches API workers in other
+processes (the scheduler / pipeline) through LISTEN. Every hub also checks
+the shared data version every POLL_SEC, which keeps SQLite deployments and
+dropped LISTEN connections working.
+
+Every NormEvent the normalizer inserts or changes (a merged article, an
+official filing, a refreshed type or score) gets a new change_seq, unique
+and committed in order (see normalize_rows). When a hub wakes it reads
+NormEvents with change_seq > the last one it saw in one query and fans
+them out to all of its subscribers, so the number of connected clients
+adds no upstream or per-client DB work. An update arrives as the event's
+full row again under the same "id". SSE ids are change_seq values, so a
+reconnecting client resumes from the DB via Last-Event-ID.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import weakref
+from typing import List, Optional
+
+from fastapi import APIRouter, Header, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import event as sa_event, func, select
+from sqlalchemy.orm import Session
+
+from . import dataversion
+from .db import AsyncSessionLocal, async_engine
+from .models import EFFECTIVE_TIME, NormEvent, RawEvent
+
+LOGGER = logging.getLogger("cb.events")
+
+router = APIRouter(prefix="/api/events", tags=["events"])
+
+CHANNEL = "cb_norm_events"
+POLL_SEC = dataversion.CHECK_EVERY_SEC
+HEARTBEAT_SEC = 15
+REPLAY_MAX = 500
+SUB_QUEUE_MAX = 64
+
+
+# ---- publishing side (sync, called by the normalizer) ----
+def notify(session: Session) -> None:
+    """Announce new or changed NormEvents once *session*'s transaction commits."""
+    if session.get_bind().dialect.name == "postgresql":
+        # NOTIFY is transactional: delivered on commit, dropped on rollback
+        session.execute(select(func.pg_notify(CHANNEL, "")))
+    sa_event.listen(session, "after_commit", _wake_local, once=True)
+
+
+def _wake_local(session=None):
+    for loop, hub in list(_HUBS.items()):
+        try:
+            loop.call_soon_threadsafe(hub.wake.set)
+        except RuntimeError:  # loop already closed
+            pass
+
+
+# ---- subscribing side (one hub per event loop) ----
+def _event_stmt(after_seq: int, limit: int):
+    return (
+        select(
+            NormEvent.change_seq,
+            NormEvent.event_id,
+            EFFECTIVE_TIME.label("time"),
+            NormEvent.stock_code,
+            NormEvent.corp_name_kr,
+            NormEvent.event_type,
+            NormEvent.headline,
+            NormEvent.score,
+            RawEvent.url,
+        )
+        .outerjoin(RawEvent, RawEvent.id == NormEvent.raw_id)
+        .where(NormEvent.change_seq > after_seq)
+        .order_by(NormEvent.change_seq)
+        .limit(limit)
+    )
+
+
+async def _events_after(after_seq: int, limit: int = REPLAY_MAX) -> List[dict]:
+    async with AsyncSessionLocal() as s:
+        rows = (await s.execute(_event_stmt(after_seq, limit))).all()
+    return [
+        {
+            "seq": r.change_seq,
+            "id": r.event_id,
+            "time": str(r.time) if r.time is not None else None,
+            "stock_code": r.stock_code,
+            "corp": r.corp_name_kr,
+            "type": r.event_type,
+            "headline": r.headline,
+            "score": float(r.score) if r.score is not None else None,
+            "url": r.url,
+        }
+        for r in rows
+    ]
+
+
+async def _max_seq() -> int:
+    async with AsyncSessionLocal() as s:
+        return (await s.execute(select(func.max(NormEvent.change_seq)))).scalar() or 0
+
+
+class _Hub:
+    """Reads changed NormEvents once per wake-up and fans them out to subscribers."""
+
+    def __init__(self):
+        self.wake = asyncio.Event()
+        self._subs: set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self) -> asyncio.Queue:
+        q: asyncio.Queue = asyncio.Queue(maxsize=SUB_QUEUE_MAX)
+        self._subs.add(q)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return q
+
+    def unsubscribe(self, q: asyncio.Queue):
+        self._subs.discard(q)
+        if not self._subs and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _publish(self, rows: List[dict]):
+        for q in list(self._subs):
+            if q.full():
+                # slow client: drop its oldest batch; it can resume from the DB
+                q.get_nowait()
+            q.put_nowait(rows)
+
+    async def _listen(self):
+        """LISTEN on PostgreSQL (asyncpg); returns a closer, or None otherwise."""
+        if async_engine is None or async_engine.dialect.name != "postgresql":
+            return None
+        conn = await async_engine.connect()
+        raw = (await conn.get_raw_connection()).driver_connection
+
+        def on_notify(*_):
+            self.wake.set()
+
+        await raw.add_listener(CHANNEL, on_notify)
+
+        async def close():
+            try:
+                await raw.remove_listener(CHANNEL, on_notify)
+            finally:
+                await conn.close()
+
+        return close
+
+    async def _run(self):
+        last_seq = await _max_seq()
+        version = await dataversion.current_async()
+        try:
+            close = await self._listen()
+        except Exception:
+            LOGGER.warning("LISTEN %s failed; polling only", CHANNEL, exc_info=True)
+            close = None
+        try:
+            while self._subs:
+                try:
+                    await asyncio.wait_for(self.wake.wait(), timeout=POLL_SEC)
+                except asyncio.TimeoutError:
+                    v = await dataversion.current_async()
+                    if v == version:
+                        continue
+                    version = v
+                self.wake.clear()
+                try:
+                    rows = await _events_after(last_seq)
+                except Exception:
+                    LOGGER.warning("event hub read failed", exc_info=True)
+                    continue
+                if rows:
+                    last_seq = rows[-1]["seq"]
+                    self._publish(rows)
+                    if len(rows) == REPLAY_MAX:
+                        self.wake.set()  # more pending
+        finally:
+            if close is not None:
+                await close()
+
+
+_HUBS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _Hub]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _hub() -> _Hub:
+    loop = asyncio.get_running_loop()
+    hub = _HUBS.get(loop)
+    if hub is None:
+        hub = _HUBS[loop] = _Hub()
+    return hub
+
+
+def _sse(row: dict) -> str:
+    return f"id: {row['seq']}\ndata: {json.dumps(row, ensure_ascii=False)}\n\n"
+
+
+async def _stream(request: Request, resume_from: Optional[int]):
+    hub = _hub()
+    q = hub.subscribe()  # before replaying, so nothing committed meanwhile is lost
+    sent = -1
+    try:
+        yield ":connected\n\n"
+        if resume_from is not None:
+            sent = resume_from
+            while True:
+                rows = await _events_after(sent)
+                for r in rows:
+                    yield _sse(r)
+                if rows:
+                    sent = rows[-1]["seq"]
+                if len(rows) < REPLAY_MAX:
+                    break
+        while True:
+            try:
+                rows = await asyncio.wait_for(q.get(), timeout=HEARTBEAT_SEC)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ":hb\n\n"
+                continue
+            for r in rows:
+                if r["seq"] > sent:
+                    yield _sse(r)
+                    sent = r["seq"]
+            if await request.is_disconnected():
+                break
+    except asyncio.CancelledError:
+        pass
+    finally:
+        hub.unsubscribe(q)
+
+
+@router.get("/stream")
+async def events_stream(
+    request: Request,
+    last_event_id: Optional[int] = None,
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    """Normalized events as SSE, pushed when normalization commits.
+
+    An event is sent again (same ``id`` field, new SSE id) whenever
+    normalization changes it, e.g. when an article or the filing joins.
+
+    EventSource resends the last ``id:`` as the Last-Event-ID header on
+    reconnect; ``?last_event_id=`` does the same for a first connection.
+    """
+    resume_from = last_event_id
+    if resume_from is None and last_event_id_header:
+        try:
+            resume_from = int(last_event_id_header)
+        except ValueError:
+            resume_from = None
+    return StreamingResponse(
+        _stream(request, resume_from),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
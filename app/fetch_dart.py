@@ -1,21 +1,30 @@
 ﻿from __future__ import annotations
 
+import asyncio
 import datetime as dt
 import logging
-import re
-from typing import Optional
+from collections import OrderedDict
+from typing import Iterable, Optional
 
-import httpx
+from sqlalchemy import delete, select, update
 
+from . import dataversion, http_client, ratelimit
 from .config import settings
 from .db import SessionLocal
-from .keywords import COMBINED
-from .models import RawEvent
+from .models import IngestState, RawEvent
+from .ingest import dart_dedup_key, insert_new_raw_events, issuer_keys
+from .keywords import is_cb_event
 
 LOGGER = logging.getLogger("cb.dart.fetch")
 
 DART_URL = "https://opendart.fss.or.kr/api/list.json"
 KST = dt.timezone(dt.timedelta(hours=9))
+PAGE_COUNT = 100
+MAX_CONCURRENT_PAGES = 4
+CURSOR = "dart.head."  # + series: newest receipt number per office series
+LEGACY_CURSOR = "dart.rcept_no"  # single max receipt number (unsafe, dropped)
+FSS_OFFICE = 0  # 접수처 코드: 00 금융감독원, 80 한국거래소
+SEEN_KEEP = 10000
 
 
 def _parse_receipt_datetime(raw: str | None) -> Optional[dt.datetime]:
@@ -32,55 +41,260 @@ def _parse_receipt_datetime(raw: str | None) -> Optional[dt.datetime]:
 
 def _should_capture(title: str) -> bool:
     """Check whether the disclosure title matches CB-related keywords."""
-    return bool(title and re.search(COMBINED, title, flags=re.I))
+    return is_cb_event(title)
 
 
-def fetch_dart_today() -> int:
-    """Fetch today's disclosures from DART and persist convertible-bond items.
+def _rcept_no(item: dict) -> int:
+    try:
+        return int(item.get("rcept_no") or item.get("rcp_no") or 0)
+    except ValueError:
+        return 0
+
 
-    Returns the number of RawEvent records created.
+class SeenReceipts:
+    """Receipt numbers already handled, the most recent *keep* of them (LRU).
+
+    DART numbers filings in separate series per receiving office (KRX
+    ``YYYYMMDD80xxxx``, FSS ``YYYYMMDD00xxxx``), so there is no single
+    "newest" number to compare against: a filing is new when its number has
+    not been seen. Anything the set forgets is still caught by the unique
+    dedup_key index at insert time.
     """
-    api_key = settings.DART_API_KEY
-    if not api_key:
-        LOGGER.warning("DART_API_KEY is not configured; skipping DART fetch")
-        return 0
 
-    today = dt.datetime.now(tz=KST).strftime("%Y%m%d")
-    params = {"crtfc_key": api_key, "bgn_de": today, "page_no": 1, "page_count": 100}
-    timeout = httpx.Timeout(connect=3.0, read=6.0, write=5.0, pool=3.0)
+    def __init__(self, keep: int = SEEN_KEEP):
+        self.keep = keep
+        self._nos: "OrderedDict[int, None]" = OrderedDict()
 
-    inserted = 0
-    with httpx.Client(timeout=timeout) as client, SessionLocal() as session:
-        try:
-            response = client.get(DART_URL, params=params)
-            response.raise_for_status()
-            payload = response.json()
-        except Exception as exc:
-            LOGGER.error("Failed to fetch DART list.json: %s", exc, exc_info=True)
-            return 0
-
-        for item in payload.get("list", []):
-            title = item.get("report_nm") or ""
-            if not _should_capture(title):
+    def __len__(self) -> int:
+        return len(self._nos)
+
+    def __contains__(self, rcept_no: int) -> bool:
+        return rcept_no in self._nos
+
+    def add(self, rcept_nos: Iterable[int]):
+        for no in rcept_nos:
+            if not no:
                 continue
+            self._nos[no] = None
+            self._nos.move_to_end(no)
+            if len(self._nos) > self.keep:
+                self._nos.popitem(last=False)
+
+
+_SEEN = SeenReceipts()
+
+
+def _series(rcept_no: int) -> int:
+    """Office series of a receipt number: YYYYMMDD + 2-digit office code."""
+    return rcept_no // 10_000
+
+
+def _next_heads(items: list[dict], heads: dict[int, int]) -> dict[int, int]:
+    """*heads* advanced by *items*: the highest receipt number per series."""
+    out = dict(heads)
+    for it in items:
+        no = _rcept_no(it)
+        if no > out.get(_series(no), 0):
+            out[_series(no)] = no
+    return out
+
+
+def _passed(items: list[dict], heads: dict[int, int], day: str) -> bool:
+    """True once *items* reach a known filing in every office series of *day*.
+
+    Numbers only grow within one series, so everything behind its head was
+    handled by an earlier poll. The FSS series is always required, even
+    before its first filing of the day: it sorts behind the KRX block, and
+    stopping at the KRX head would hide it. A series without a head can
+    only be passed by reading to the end of the listing.
+    """
+    prefix = int(day) * 100
+    nos = [_rcept_no(it) for it in items]
+    required = {s for s in heads if s // 100 == int(day)}
+    required.add(prefix + FSS_OFFICE)
+    required.update(_series(no) for no in nos)
+    for series in required:
+        head = heads.get(series)
+        if head is None or not any(_series(no) == series and no <= head for no in nos):
+            return False
+    return True
+
+
+async def _get_page(params: dict, page_no: int) -> dict:
+    response = await http_client.get(DART_URL, params={**params, "page_no": page_no})
+    response.raise_for_status()
+    payload = response.json()
+    ratelimit.check_dart_status(payload)
+    status = payload.get("status")
+    if status not in (None, "000", "013"):  # 013: no data for the period
+        raise RuntimeError(f"DART status {status}: {payload.get('message')}")
+    return payload
+
+
+async def _fetch_new_items(
+    params: dict, heads: dict[int, int]
+) -> tuple[list[dict], dict[int, int]]:
+    """Walk list.json pages (newest first) until every series is passed.
+
+    Page 1 reports ``total_page``; the remaining pages are requested in
+    concurrent waves of MAX_CONCURRENT_PAGES and paging stops after the wave
+    that reaches the head of every office series (see _passed). Returns the
+    items not seen before and the advanced series heads.
+    """
+    first = await _get_page(params, 1)
+    items = list(first.get("list") or [])
+    total_page = int(first.get("total_page") or 1)
+
+    page_no = 2
+    while page_no <= total_page and not _passed(items, heads, params["bgn_de"]):
+        wave = range(page_no, min(total_page, page_no + MAX_CONCURRENT_PAGES - 1) + 1)
+        pages = await asyncio.gather(*(_get_page(params, p) for p in wave))
+        for payload in pages:
+            items.extend(payload.get("list") or [])
+        page_no = wave.stop
+
+    fresh = [it for it in items if _rcept_no(it) not in _SEEN]
+    return fresh, _next_heads(items, heads)
 
-            published_at = _parse_receipt_datetime(item.get("rcept_dt"))
-
-            session.add(
-                RawEvent(
-                    source="dart",
-                    url=f"https://dart.fss.or.kr/dsaf001/main.do?rcpNo={item.get('rcp_no')}",
-                    title=title,
-                    content=None,
-                    corp_name_kr=item.get("corp_name"),
-                    published_at=published_at,
-                    raw_json=item,
-                    inserted_at=dt.datetime.utcnow(),
+
+def _to_row(item: dict, now: dt.datetime) -> dict:
+    rcept_no = item.get("rcept_no") or item.get("rcp_no")
+    corp_code, stock_code = issuer_keys(item)
+    return {
+        "source": "dart",
+        "url": f"https://dart.fss.or.kr/dsaf001/main.do?rcpNo={rcept_no}",
+        "title": item.get("report_nm") or "",
+        "content": None,
+        "corp_name_kr": item.get("corp_name"),
+        "corp_code": corp_code,
+        "stock_code": stock_code,
+        "published_at": _parse_receipt_datetime(item.get("rcept_dt")),
+        "raw_json": item,
+        "inserted_at": now,
+        "dedup_key": dart_dedup_key(item),
+    }
+
+
+def _today() -> str:
+    return dt.datetime.now(tz=KST).strftime("%Y%m%d")
+
+
+def load_cursor() -> dict[int, int]:
+    """Stored series heads; the first call also warms the seen set.
+
+    Today's stored filings (dedup_key ``dart:<YYYYMMDD...>``, read through
+    its unique index) are marked seen so a restart does not resend them.
+    """
+    with SessionLocal() as session:
+        if not len(_SEEN):
+            day = _today()
+            keys = session.execute(
+                select(RawEvent.dedup_key).where(
+                    RawEvent.dedup_key >= f"dart:{day}",
+                    RawEvent.dedup_key < f"dart:{day}~",
                 )
+            ).scalars()
+            _SEEN.add(_rcept_no({"rcept_no": k.split(":", 1)[1]}) for k in keys)
+        states = session.execute(
+            select(IngestState.name, IngestState.value).where(
+                IngestState.name.startswith(CURSOR)
             )
-            inserted += 1
+        ).all()
+    heads = {}
+    for name, value in states:
+        try:
+            heads[int(name[len(CURSOR) :])] = value or 0
+        except ValueError:
+            continue
+    return heads
 
+
+async def fetch_dart_rows(cursor: dict[int, int]) -> tuple[list[dict], dict[int, int]]:
+    """Fetch today's filings not seen before as RawEvent rows.
+
+    *cursor* maps each office series to its newest receipt number and only
+    tells paging where to stop. Returns the convertible-bond rows and the
+    advanced heads; on failure (or without an API key) nothing is returned
+    and the heads are unchanged. Skipped (non-CB) filings are marked seen
+    here, stored ones by store_dart_rows() after the commit.
+    """
+    api_key = settings.DART_API_KEY
+    if not api_key:
+        LOGGER.warning("DART_API_KEY is not configured; skipping DART fetch")
+        return [], cursor
+
+    params = {"crtfc_key": api_key, "bgn_de": _today(), "page_count": PAGE_COUNT}
+    try:
+        items, heads = await _fetch_new_items(params, cursor)
+    except Exception as exc:
+        LOGGER.error("Failed to fetch DART list.json: %s", exc, exc_info=True)
+        return [], cursor
+
+    now = dt.datetime.utcnow()
+    rows, skipped = [], []
+    for item in items:
+        if _should_capture(item.get("report_nm") or ""):
+            rows.append(_to_row(item, now))
+        else:
+            skipped.append(_rcept_no(item))
+    _SEEN.add(skipped)
+    LOGGER.debug("DART fetch (new=%d, matched=%d)", len(items), len(rows))
+    return rows, heads
+
+
+def _store_heads(session, heads: dict[int, int]) -> None:
+    """Keep today's series heads in ingest_state (``dart.head.<series>``)."""
+    day = int(_today())
+    keep = []
+    for series, no in heads.items():
+        if series // 100 != day:
+            continue
+        name = CURSOR + str(series)
+        keep.append(name)
+        dataversion.ensure_state(session, name, no)
+        session.execute(
+            update(IngestState)
+            .where(IngestState.name == name, IngestState.value < no)
+            .values(value=no, updated_at=dt.datetime.utcnow())
+        )
+    session.execute(
+        delete(IngestState).where(
+            (IngestState.name == LEGACY_CURSOR)
+            | (IngestState.name.startswith(CURSOR) & IngestState.name.not_in(keep))
+        )
+    )
+
+
+def store_dart_rows(rows: list[dict], cursor: dict[int, int]) -> list[dict]:
+    """Insert *rows* and store the series heads in one commit.
+
+    Returns the rows that were new (filings already stored are skipped by
+    the unique dedup_key index).
+    """
+    with SessionLocal() as session:
+        inserted = insert_new_raw_events(session, rows)
+        _store_heads(session, cursor)
         session.commit()
+    _SEEN.add(_rcept_no(row["raw_json"]) for row in rows)
 
-    LOGGER.info("DART ingest complete (inserted=%d)", inserted)
+    LOGGER.info(
+        "DART ingest complete (matched=%d, inserted=%d)", len(rows), len(inserted)
+    )
     return inserted
+
+
+def fetch_dart_today() -> int:
+    """Fetch today's disclosures from DART and persist convertible-bond items.
+
+    Pages are read until the stored head of every office series is passed
+    (the FSS series always), so busy filing days are covered completely;
+    filings are new when their receipt number was not seen.
+
+    Returns the number of RawEvent records created; filings already stored
+    (same receipt number) are skipped.
+    """
+    cursor = load_cursor()
+    rows, new_cursor = http_client.run(fetch_dart_rows(cursor))
+    if new_cursor == cursor and not rows:
+        return 0
+    return len(store_dart_rows(rows, new_cursor))
@@ -1,21 +1,27 @@
 ﻿from __future__ import annotations
 
+import asyncio
 import datetime as dt
 import html
 import logging
 import re
+from collections import deque
 from email.utils import parsedate_to_datetime
 from typing import Iterable, Optional
 
-import httpx
-
+from . import http_client
+from .company_tagger import tag_news
 from .config import settings
 from .db import SessionLocal
-from .keywords import COMBINED
-from .models import RawEvent
+from .ingest import insert_new_raw_events, naver_dedup_key
+from .keywords import is_cb_event
+from .match_ticker import ticker_index
 
 LOGGER = logging.getLogger("cb.naver.fetch")
 NAVER_URL = "https://openapi.naver.com/v1/search/news.json"
+NAVER_DISPLAY = 30
+NAVER_MAX_START = 1000  # API limit for the start parameter
+HOT_MAX_PAGES = 5
 
 
 def _strip(text: Optional[str]) -> str:
@@ -37,61 +43,175 @@ def _parse_pubdate(raw: Optional[str]) -> Optional[dt.datetime]:
         return None
 
 
-def fetch_naver_news(queries: Iterable[str] | None = None) -> int:
-    """Fetch convertible-bond related news from Naver and persist them."""
+class NaverCursor:
+    """What one query has already returned: newest pubDate and recent links.
+
+    Naver returns ``sort=date`` results newest first, so a poll can stop at
+    the first item this cursor has seen.
+    """
+
+    def __init__(self, keep: int = 500):
+        self.latest: Optional[dt.datetime] = None
+        self._links: deque[str] = deque(maxlen=keep)
+        self._link_set: set[str] = set()
+
+    @property
+    def primed(self) -> bool:
+        return self.latest is not None or bool(self._links)
+
+    def _seen(self, item: dict) -> bool:
+        if item.get("link") in self._link_set:
+            return True
+        pub = _parse_pubdate(item.get("pubDate"))
+        return pub is not None and self.latest is not None and pub < self.latest
+
+    def take_new(self, items: list[dict]) -> list[dict]:
+        """Leading run of *items* not seen before (stops at the first seen)."""
+        for i, item in enumerate(items):
+            if self._seen(item):
+                return items[:i]
+        return items
+
+    def advance(self, items: list[dict]):
+        for item in items:
+            link = item.get("link")
+            if link and link not in self._link_set:
+                if len(self._links) == self._links.maxlen:
+                    self._link_set.discard(self._links[0])
+                self._links.append(link)
+                self._link_set.add(link)
+            pub = _parse_pubdate(item.get("pubDate"))
+            if pub is not None and (self.latest is None or pub > self.latest):
+                self.latest = pub
+
+
+async def _get_page(query: str, headers: dict, display: int, start: int) -> list:
+    response = await http_client.get(
+        NAVER_URL,
+        headers=headers,
+        params={"query": query, "display": display, "sort": "date", "start": start},
+    )
+    response.raise_for_status()
+    return response.json().get("items", [])
+
+
+async def fetch_query(
+    query: str,
+    headers: dict,
+    display: int = NAVER_DISPLAY,
+    cursor: Optional[NaverCursor] = None,
+) -> list[dict]:
+    """Return the raw items of one Naver search, or [] on failure.
+
+    With a *cursor*, only items newer than it are returned, and a "hot"
+    query whose whole page is new is followed with start=31, 61, ... (up to
+    HOT_MAX_PAGES) so bursts do not leave gaps. The cursor is advanced.
+    """
+    out: list[dict] = []
+    start = 1
+    for _ in range(HOT_MAX_PAGES):
+        try:
+            items = await _get_page(query, headers, display, start)
+        except Exception as exc:
+            LOGGER.error(
+                "Failed to fetch Naver news for '%s': %s", query, exc, exc_info=True
+            )
+            break
+        if cursor is None:
+            return items
+        fresh = cursor.take_new(items)
+        out.extend(fresh)
+        hot = cursor.primed and len(fresh) == len(items) == display
+        start += display
+        if not hot or start > NAVER_MAX_START:
+            break
+    if cursor is not None:
+        cursor.advance(out)
+    return out
+
+
+_CURSORS: dict[str, NaverCursor] = {}
+
+
+async def _fetch_all(queries: list[str], headers: dict) -> list[list[dict]]:
+    # per-host concurrency is capped inside http_client.get
+    return await asyncio.gather(
+        *(
+            fetch_query(q, headers, cursor=_CURSORS.setdefault(q, NaverCursor()))
+            for q in queries
+        )
+    )
+
+
+def _to_row(item: dict, now: dt.datetime) -> Optional[dict]:
+    title = _strip(item.get("title"))
+    desc = _strip(item.get("description"))
+    if not is_cb_event(f"{title}\n{desc}"):
+        return None
+    return {
+        "source": "naver_news",
+        "url": item.get("link"),
+        "title": title,
+        "content": desc,
+        "corp_name_kr": None,
+        "published_at": _parse_pubdate(item.get("pubDate")),
+        "raw_json": item,
+        "inserted_at": now,
+        "dedup_key": naver_dedup_key(item),
+    }
+
+
+async def fetch_naver_rows(queries: Iterable[str] | None = None) -> list[dict]:
+    """Fetch all queries concurrently and return the matching RawEvent rows.
+
+    Each query only returns items newer than its in-process cursor.
+    Returns [] when the API credentials are missing.
+    """
     client_id = settings.NAVER_CLIENT_ID
     client_secret = settings.NAVER_CLIENT_SECRET
     if not client_id or not client_secret:
         LOGGER.warning("NAVER API credentials are missing; skipping news pull")
-        return 0
+        return []
 
     if queries is None:
         queries = settings.NAVER_NEWS_QUERIES
 
     headers = {"X-Naver-Client-Id": client_id, "X-Naver-Client-Secret": client_secret}
-    timeout = httpx.Timeout(connect=3.0, read=6.0, write=5.0, pool=3.0)
-
-    inserted = 0
-    with httpx.Client(timeout=timeout) as client, SessionLocal() as session:
-        for query in queries:
-            try:
-                response = client.get(
-                    NAVER_URL,
-                    headers=headers,
-                    params={"query": query, "display": 30, "sort": "date", "start": 1},
-                )
-                response.raise_for_status()
-                payload = response.json()
-            except Exception as exc:
-                LOGGER.error(
-                    "Failed to fetch Naver news for '%s': %s", query, exc, exc_info=True
-                )
-                continue
-
-            for item in payload.get("items", []):
-                title = _strip(item.get("title"))
-                desc = _strip(item.get("description"))
-                link = item.get("link")
-                published_at = _parse_pubdate(item.get("pubDate"))
-
-                if not re.search(COMBINED, f"{title}\n{desc}", flags=re.I):
-                    continue
-
-                session.add(
-                    RawEvent(
-                        source="naver_news",
-                        url=link,
-                        title=title,
-                        content=desc,
-                        corp_name_kr=None,
-                        published_at=published_at,
-                        raw_json=item,
-                        inserted_at=dt.datetime.utcnow(),
-                    )
-                )
-                inserted += 1
+    results = await _fetch_all(list(queries), headers)
+
+    now = dt.datetime.utcnow()
+    rows = (_to_row(item, now) for items in results for item in items)
+    return [row for row in rows if row is not None]
+
 
+def tag_companies(rows: list[dict]) -> list[dict]:
+    """Fill corp_name_kr with the listed company each article is about."""
+    index = ticker_index()
+    for row in rows:
+        row["corp_name_kr"] = tag_news(index, row["title"], row["content"])[0]
+    return rows
+
+
+def store_naver_rows(rows: list[dict]) -> list[dict]:
+    """Tag and insert *rows*; returns the ones that were new (same link is skipped)."""
+    tag_companies(rows)
+    with SessionLocal() as session:
+        inserted = insert_new_raw_events(session, rows)
         session.commit()
 
-    LOGGER.info("Naver ingest complete (inserted=%d)", inserted)
+    LOGGER.info(
+        "Naver ingest complete (inserted=%d, matched=%d)", len(inserted), len(rows)
+    )
     return inserted
+
+
+def fetch_naver_news(queries: Iterable[str] | None = None) -> int:
+    """Fetch convertible-bond related news from Naver and persist new ones.
+
+    All queries are requested concurrently over the shared HTTP client and
+    each one only returns items newer than its in-process cursor.
+    Returns the number of RawEvent records created; articles already stored
+    (same normalized link) are skipped.
+    """
+    rows = http_client.run(fetch_naver_rows(queries))
+    return len(store_naver_rows(rows)) if rows else 0
@@ -0,0 +1,141 @@
+"""Score-ranked "hot feed" with time decay, materialized into hot_feed.
+
+Stored NormEvent scores are computed at age 0, so they never decay. Decay in
+compute_score only affects the first DECAY_MINUTES of an event's life; after
+that its score is constant and ranks the same as its stored score. A refresh
+therefore only rescores events inside the decay window plus the top K older
+events by stored score, keeps the best K in memory (heapq), and rewrites the
+K-row hot_feed table. Readers get O(K) lookups regardless of history size.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import heapq
+import logging
+from typing import List
+
+from sqlalchemy import delete, insert, select
+
+from . import dataversion
+from .db import AsyncSessionLocal, SessionLocal
+from .models import EFFECTIVE_TIME, HotFeed, NormEvent, RawEvent
+from .normalizer import compute_score
+
+LOGGER = logging.getLogger("cb.hotfeed")
+
+HOT_K = 200
+DECAY_MINUTES = 1440  # compute_score's recency term reaches 0 after a day
+STALE_MINUTES = 5  # refreshed every minute; older means the refresher stopped
+
+
+def _age_minutes(t, now: dt.datetime) -> int:
+    # naive values are UTC: source times are stored in UTC (ingest.as_utc)
+    if t is None:
+        return DECAY_MINUTES
+    if t.tzinfo is not None:
+        t = t.astimezone(dt.timezone.utc).replace(tzinfo=None)
+    return max(0, int((now - t).total_seconds() // 60))
+
+
+def refresh_hot_feed(k: int = HOT_K) -> int:
+    """Recompute decayed scores and rewrite the hot_feed table; returns rows."""
+    now = dt.datetime.utcnow()
+    cutoff = now - dt.timedelta(minutes=DECAY_MINUTES)
+    cols = (NormEvent, EFFECTIVE_TIME.label("eff_time"), RawEvent.url)
+    with SessionLocal() as s:
+        recent = s.execute(
+            select(*cols)
+            .outerjoin(RawEvent, RawEvent.id == NormEvent.raw_id)
+            .where(EFFECTIVE_TIME >= cutoff)
+        ).all()
+        settled = s.execute(
+            select(*cols)
+            .outerjoin(RawEvent, RawEvent.id == NormEvent.raw_id)
+            .where(EFFECTIVE_TIME < cutoff)
+            .order_by(NormEvent.score.desc(), EFFECTIVE_TIME.desc())
+            .limit(k)
+        ).all()
+
+        def scored(row):
+            ev, eff_time, url = row
+            age = _age_minutes(eff_time, now)
+            score = compute_score(bool(ev.has_official), ev.event_type, age)
+            return score, -age, ev.event_id, ev, url
+
+        top = heapq.nlargest(
+            k, (scored(r) for r in (*recent, *settled)), key=lambda x: x[:3]
+        )
+
+        s.execute(delete(HotFeed))
+        if top:
+            s.execute(
+                insert(HotFeed),
+                [
+                    {
+                        "rank": rank,
+                        "event_id": ev.event_id,
+                        "score": score,
+                        "event_time": ev.event_time or ev.created_at,
+                        "stock_code": ev.stock_code,
+                        "corp_name_kr": ev.corp_name_kr,
+                        "event_type": ev.event_type,
+                        "headline": ev.headline,
+                        "url": url,
+                        "refreshed_at": now,
+                    }
+                    for rank, (score, _, _, ev, url) in enumerate(top, start=1)
+                ],
+            )
+        dataversion.bump(s)
+        s.commit()
+    LOGGER.info(
+        "hot feed refreshed (recent=%d, settled=%d, kept=%d)",
+        len(recent),
+        len(settled),
+        len(top),
+    )
+    return len(top)
+
+
+def _hot_rows(rows) -> List[dict] | None:
+    if not rows:
+        return None
+    age = _age_minutes(rows[0].refreshed_at, dt.datetime.utcnow())
+    if age > STALE_MINUTES:
+        LOGGER.debug("hot feed is %d minutes old; not serving it", age)
+        return None
+    return [
+        {
+            "time": str(r.event_time),
+            "stock_code": r.stock_code,
+            "corp": r.corp_name_kr,
+            "type": r.event_type,
+            "headline": r.headline,
+            "score": float(r.score) if r.score is not None else None,
+            "url": r.url,
+        }
+        for r in rows
+    ]
+
+
+def read_hot_feed(limit: int) -> List[dict] | None:
+    """Top *limit* rows of the materialized feed, or None if it can't serve it.
+
+    None also when the feed was last refreshed more than STALE_MINUTES ago,
+    so callers fall back to ranking live rows instead of a frozen feed.
+    """
+    if limit > HOT_K:
+        return None
+    with SessionLocal() as s:
+        rows = s.execute(select(HotFeed).order_by(HotFeed.rank).limit(limit))
+        return _hot_rows(rows.scalars().all())
+
+
+async def read_hot_feed_async(limit: int) -> List[dict] | None:
+    """Async variant of read_hot_feed for the API event loop."""
+    if limit > HOT_K:
+        return None
+    async with AsyncSessionLocal() as s:
+        rows = await s.execute(select(HotFeed).order_by(HotFeed.rank).limit(limit))
+        return _hot_rows(rows.scalars().all())
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import threading
+import weakref
+from typing import IO, Any, Coroutine, TypeVar
+from urllib.parse import urlsplit
+
+import httpx
+
+from . import ratelimit
+
+T = TypeVar("T")
+
+TIMEOUT = httpx.Timeout(connect=3.0, read=7.0, write=5.0, pool=5.0)
+LIMITS = httpx.Limits(
+    max_connections=32, max_keepalive_connections=16, keepalive_expiry=60.0
+)
+# Max in-flight requests per upstream host
+HOST_CONCURRENCY = {"openapi.naver.com": 8, "opendart.fss.or.kr": 4}
+DEFAULT_HOST_CONCURRENCY = 8
+
+HTTP2 = importlib.util.find_spec("h2") is not None
+
+# An AsyncClient and asyncio.Semaphore belong to one event loop, so both are
+# kept per loop: the API server's loop, and the background loop used by the
+# sync (scheduler) fetchers through run().
+_CLIENTS: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_HOST_SEMS: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the long-lived pooled client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _CLIENTS.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(timeout=TIMEOUT, limits=LIMITS, http2=HTTP2)
+        _CLIENTS[loop] = client
+    return client
+
+
+def _host_semaphore(url: str) -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    sems = _HOST_SEMS.setdefault(loop, {})
+    host = urlsplit(url).hostname or ""
+    sem = sems.get(host)
+    if sem is None:
+        sem = sems[host] = asyncio.Semaphore(
+            HOST_CONCURRENCY.get(host, DEFAULT_HOST_CONCURRENCY)
+        )
+    return sem
+
+
+async def get(url: str, **kwargs) -> httpx.Response:
+    """GET through the shared client, respecting the per-host concurrency cap.
+
+    Known upstreams also go through their rate limiter / daily budget
+    (app.ratelimit); 429 and 5xx responses trigger exponential backoff.
+    Raises ratelimit.UpstreamThrottled when the call is not allowed.
+    """
+    upstream = ratelimit.for_host(urlsplit(url).hostname)
+    if upstream is not None:
+        await upstream.acquire()
+    async with _host_semaphore(url):
+        response = await get_client().get(url, **kwargs)
+    if upstream is not None:
+        if response.status_code == 429 or response.status_code >= 500:
+            upstream.record_failure(f"HTTP {response.status_code}")
+        elif not upstream.body_status:
+            upstream.record_success()
+    return response
+
+
+async def download(url: str, dest: IO[bytes], **kwargs) -> int:
+    """Stream the body of a GET into *dest* without holding it in memory.
+
+    Same concurrency cap and upstream accounting as get(); returns the number
+    of bytes written. Non-2xx responses raise httpx.HTTPStatusError.
+    """
+    upstream = ratelimit.for_host(urlsplit(url).hostname)
+    if upstream is not None:
+        await upstream.acquire()
+    size = 0
+    async with _host_semaphore(url):
+        async with get_client().stream("GET", url, **kwargs) as response:
+            if upstream is not None:
+                if response.status_code == 429 or response.status_code >= 500:
+                    upstream.record_failure(f"HTTP {response.status_code}")
+                elif not upstream.body_status:
+                    upstream.record_success()
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                dest.write(chunk)
+                size += len(chunk)
+    return size
+
+
+async def aclose() -> None:
+    """Close the client owned by the running loop (e.g. on API shutdown)."""
+    client = _CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+# ---- background loop for synchronous callers ----
+_BG_LOOP: asyncio.AbstractEventLoop | None = None
+_BG_LOCK = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _BG_LOOP
+    with _BG_LOCK:
+        if _BG_LOOP is None or _BG_LOOP.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="cb-http-loop", daemon=True
+            ).start()
+            _BG_LOOP = loop
+        return _BG_LOOP
+
+
+def run(coro: Coroutine[Any, Any, T]) -> T:
+    """Run *coro* on the shared background loop and wait for its result.
+
+    Lets sync code (APScheduler jobs, threadpool endpoints) reuse one pooled
+    client across calls instead of opening a new connection each time.
+    Raises RuntimeError when called from the background loop itself, where
+    waiting for the result would deadlock; await the coroutine there.
+    """
+    loop = _background_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError(
+            "http_client.run() called on the background HTTP loop; await instead"
+        )
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import datetime as dt
+from typing import Iterable, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from sqlalchemy import insert as sa_insert, select
+from sqlalchemy.orm import Session
+
+from .models import RawEvent
+
+INSERT_CHUNK = 200
+
+
+def dart_dedup_key(item: dict) -> Optional[str]:
+    """Natural key of a DART list.json item (its receipt number)."""
+    rcept_no = item.get("rcept_no") or item.get("rcp_no")
+    return f"dart:{rcept_no}" if rcept_no else None
+
+
+def issuer_keys(item: dict) -> tuple[Optional[str], Optional[str]]:
+    """(corp_code, stock_code) of a DART item; blank codes become None."""
+    corp_code = (item.get("corp_code") or "").strip() or None
+    stock_code = (item.get("stock_code") or "").strip() or None
+    return corp_code, stock_code
+
+
+def as_utc(t: Optional[dt.datetime]) -> Optional[dt.datetime]:
+    """Aware *t* converted to UTC; naive values are assumed UTC already.
+
+    Outside PostgreSQL the timestamp columns keep only the wall-clock time,
+    so source times (KST) are stored in UTC to match created_at/utcnow().
+    """
+    if t is None or t.tzinfo is None:
+        return t
+    return t.astimezone(dt.timezone.utc)
+
+
+def normalize_link(url: Optional[str]) -> Optional[str]:
+    """Canonical form of an article URL for deduplication.
+
+    Lower-cases scheme/host, drops the fragment, tracking (utm_*) params and
+    a trailing slash, and sorts the remaining query parameters.
+    """
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_")
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), "")
+    )
+
+
+def naver_dedup_key(item: dict) -> Optional[str]:
+    """Natural key of a Naver news item: the publisher link when present."""
+    link = normalize_link(item.get("originallink") or item.get("link"))
+    return f"naver:{link}" if link else None
+
+
+def _insert_ignore(dialect: str):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+
+        return insert(RawEvent).on_conflict_do_nothing(index_elements=["dedup_key"])
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+
+        return insert(RawEvent).on_conflict_do_nothing(index_elements=["dedup_key"])
+    # MySQL / MariaDB
+    return sa_insert(RawEvent).prefix_with("IGNORE")
+
+
+def insert_new_raw_events(session: Session, rows: Iterable[dict]) -> list[dict]:
+    """Bulk insert RawEvent rows, skipping ones whose dedup_key already exists.
+
+    Returns the rows that were actually inserted. The caller commits.
+    """
+    batch: list[dict] = []
+    keys: set[str] = set()
+    for row in rows:
+        key = row.get("dedup_key")
+        if key is not None:
+            if key in keys:
+                continue
+            keys.add(key)
+        if row.get("published_at") is not None:
+            row["published_at"] = as_utc(row["published_at"])
+        batch.append(row)
+    if not batch:
+        return []
+
+    dialect = session.get_bind().dialect.name
+    inserted: list[dict] = []
+    for i in range(0, len(batch), INSERT_CHUNK):
+        chunk = batch[i : i + INSERT_CHUNK]
+        stmt = _insert_ignore(dialect).values(chunk)
+        if dialect in ("postgresql", "sqlite"):
+            new_keys = set(
+                session.execute(stmt.returning(RawEvent.dedup_key)).scalars()
+            )
+            inserted.extend(
+                r
+                for r in chunk
+                if r.get("dedup_key") is None or r["dedup_key"] in new_keys
+            )
+        else:
+            # no RETURNING: look the keys up before INSERT IGNORE
+            chunk_keys = [r["dedup_key"] for r in chunk if r.get("dedup_key")]
+            old_keys = set(
+                session.execute(
+                    select(RawEvent.dedup_key).where(RawEvent.dedup_key.in_(chunk_keys))
+                ).scalars()
+            )
+            session.execute(stmt)
+            inserted.extend(r for r in chunk if r.get("dedup_key") not in old_keys)
+    return inserted
+
+
+def insert_raw_events(session: Session, rows: Iterable[dict]) -> int:
+    """insert_new_raw_events(), returning only the number of rows inserted."""
+    return len(insert_new_raw_events(session, rows))
@@ -1,5 +1,8 @@
 ﻿from __future__ import annotations
 
+import re
+from typing import Callable, Mapping, Optional, Sequence
+
 # Convertible bond keywords (Korean + short codes)
 CB_REGEX = r"(전환사채|\bCB\b|교환사채|\bEB\b|신주인수권부사채|\bBW\b)"
 
@@ -8,3 +11,61 @@ EVENT_REGEX = r"(리픽싱|전환가\s*(?:재조정|조정)|전환청구|조기
 
 # Combined pattern: capture strings that mention CB + one of the event keywords
 COMBINED = rf"(?:{CB_REGEX}).*?(?:{EVENT_REGEX})|(?:{EVENT_REGEX}).*?(?:{CB_REGEX})"
+
+# Compiled once at import; callers used to pass the pattern strings to
+# re.search() for every item on every poll.
+CB_RE = re.compile(CB_REGEX, re.I)
+EVENT_RE = re.compile(EVENT_REGEX, re.I)
+
+
+def scan_keywords(text: Optional[str]) -> tuple[list[str], list[str]]:
+    """Return the (CB terms, event terms) found in *text*, in order of appearance."""
+    if not text:
+        return [], []
+    return CB_RE.findall(text), EVENT_RE.findall(text)
+
+
+def is_cb_event(text: Optional[str]) -> bool:
+    """True when a line of *text* mentions both a CB term and an event term.
+
+    Same result as ``re.search(COMBINED, text, flags=re.I)`` (whose ``.*?``
+    does not cross newlines) but each line is scanned linearly instead of
+    backtracking from every candidate start position.
+    """
+    if not text:
+        return False
+    for line in text.split("\n"):
+        if CB_RE.search(line) and EVENT_RE.search(line):
+            return True
+    return False
+
+
+def build_tagger(
+    patterns: Mapping[str, Sequence[str | Sequence[str]]], default: str = "OTHER"
+) -> Callable[[Optional[str]], str]:
+    """Build a case-insensitive classifier from ordered {tag: keywords}.
+
+    The first tag with any keyword contained in the text wins; a keyword
+    given as a tuple of parts matches when the text contains all of them.
+    Keywords are lower-cased once here rather than on every call.
+    """
+    table = []
+    for name, kws in patterns.items():
+        single = tuple(k.lower() for k in kws if isinstance(k, str))
+        combos = tuple(
+            tuple(p.lower() for p in k) for k in kws if not isinstance(k, str)
+        )
+        table.append((name, single, combos))
+
+    def tag(text: Optional[str]) -> str:
+        t = (text or "").lower()
+        for name, single, combos in table:
+            for k in single:
+                if k in t:
+                    return name
+            for parts in combos:
+                if all(p in t for p in parts):
+                    return name
+        return default
+
+    return tag
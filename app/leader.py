@@ -0,0 +1,126 @@
+"""Leader election so exactly one process ingests.
+
+On PostgreSQL the lock is a session-level advisory lock held on a dedicated
+connection: it is released when the holder exits or its connection drops,
+so a standby process takes over on its next try. Other backends (SQLite)
+use an exclusive, non-blocking lock on a file next to the database, which
+the OS releases when the holding process dies.
+
+Only the leader runs the scheduler / pipeline. API workers take the same
+lock around /api/run/once, so a manual run cannot overlap a running
+ingest. Non-leaders observe the leader's writes through the shared data
+version (app.dataversion).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from typing import Optional
+
+from sqlalchemy import func, select
+
+from .db import engine
+
+LOGGER = logging.getLogger("cb.leader")
+
+INGEST = "ingest"
+LOCK_DIR = os.getenv("CB_LOCK_DIR", ".")
+
+
+def _advisory_key(name: str) -> int:
+    digest = hashlib.blake2b(f"cb_scanner:{name}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def _flock(fd: int) -> bool:
+    try:
+        import fcntl
+    except ImportError:  # Windows
+        import msvcrt
+
+        try:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+class LeaderLock:
+    """Non-blocking, process-wide named lock (see module docstring)."""
+
+    def __init__(self, name: str = INGEST):
+        self.name = name
+        self._conn = None  # PostgreSQL connection holding the advisory lock
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self._conn is not None or self._fd is not None
+
+    def try_acquire(self) -> bool:
+        if self.held:
+            return True
+        if engine.dialect.name == "postgresql":
+            conn = engine.connect()
+            try:
+                got = conn.execute(
+                    select(func.pg_try_advisory_lock(_advisory_key(self.name)))
+                ).scalar()
+                conn.commit()
+            except Exception:
+                conn.close()
+                raise
+            if got:
+                self._conn = conn
+            else:
+                conn.close()
+            return bool(got)
+
+        path = os.path.join(LOCK_DIR, f"cb_scanner.{self.name}.lock")
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        if _flock(fd):
+            self._fd = fd
+            return True
+        os.close(fd)
+        return False
+
+    def is_held(self) -> bool:
+        """Verify the lock is still ours (the PG session may have dropped)."""
+        if self._conn is None:
+            return self._fd is not None
+        try:
+            self._conn.execute(select(1))
+            self._conn.commit()
+            return True
+        except Exception:
+            LOGGER.warning("lost leader connection for %s", self.name, exc_info=True)
+            self._conn.invalidate()
+            self._conn = None
+            return False
+
+    def release(self):
+        if self._conn is not None:
+            try:
+                self._conn.execute(
+                    select(func.pg_advisory_unlock(_advisory_key(self.name)))
+                )
+                self._conn.commit()
+            finally:
+                self._conn.close()
+                self._conn = None
+        if self._fd is not None:
+            os.close(self._fd)  # closing the descriptor drops the lock
+            self._fd = None
+
+    def __enter__(self) -> bool:
+        return self.try_acquire()
+
+    def __exit__(self, *exc):
+        self.release()
@@ -1,20 +1,231 @@
+import re
+import threading
+import time
+from functools import lru_cache
 from sqlalchemy import select
 from rapidfuzz import fuzz, process
-from .db import SessionLocal
-from .models import DimListing
+from . import dataversion
+from .db import AsyncSessionLocal, SessionLocal
+from .models import DimCorp, DimListing
+
+SCORE_CUTOFF = 85
+INDEX_TTL_SEC = 600
+
+_CORP_DECORATION = re.compile(r"\(주\)|㈜|주식회사|\s+")
+
+
+def normalize_corp_name(name: str | None) -> str:
+    """Strip legal-form decoration and whitespace: '(주) 삼성 전자' -> '삼성전자'."""
+    return _CORP_DECORATION.sub("", name or "").lower()
+
+
+class TickerIndex:
+    """Immutable snapshot of dim_listing (name -> code) and dim_corp (key -> code)."""
+
+    def __init__(self, rows, version: int, listing_version: int = 0, corp_rows=()):
+        self.version = version
+        self.listing_version = listing_version  # dataversion.LISTING_KEY
+        self.loaded_at = time.monotonic()
+        # aliases follow listing names in rows: first wins, so an alias never
+        # takes over another company's listed name
+        self.exact = {}
+        self.name_of = {}  # canonical (first) name per code
+        for name, code in rows:
+            self.exact.setdefault(name, code)
+            self.name_of.setdefault(code, name)
+        self.by_norm = {}
+        for name, code in rows:
+            self.by_norm.setdefault(normalize_corp_name(name), code)
+        # rapidfuzz choices, precomputed once per snapshot
+        self.names = list(self.exact.keys())
+        self.codes = [self.exact[n] for n in self.names]
+        # DART corp_code -> stock_code (dim_corp, listed companies only)
+        self.by_corp_code = dict(corp_rows)
+
+    def lookup(self, corp_name: str) -> str | None:
+        """Exact or normalized-name hit, without fuzzy matching."""
+        code = self.exact.get(corp_name)
+        if code is None:
+            code = self.by_norm.get(normalize_corp_name(corp_name))
+        return code
+
+    def resolve_key(self, corp_code: str | None, stock_code: str | None) -> str | None:
+        """Ticker from issuer keys: the reported stock_code, else dim_corp."""
+        if stock_code and stock_code.strip():
+            return stock_code.strip()
+        return self.by_corp_code.get(corp_code) if corp_code else None
+
+    def fuzzy(self, corp_name: str) -> str | None:
+        if not self.names:
+            return None
+        best = process.extractOne(
+            corp_name,
+            self.names,
+            scorer=fuzz.token_sort_ratio,
+            score_cutoff=SCORE_CUTOFF,
+        )
+        return self.codes[best[2]] if best else None
+
+
+_INDEX: TickerIndex | None = None
+_VERSION = 0
+_LOCK = threading.RLock()
+_LISTING_STMT = select(
+    DimListing.corp_name_kr, DimListing.stock_code, DimListing.aliases
+)
+_CORP_STMT = select(DimCorp.corp_code, DimCorp.stock_code).where(
+    DimCorp.stock_code.is_not(None)
+)
+
+
+def _fresh(idx: TickerIndex | None, listing_version: int) -> bool:
+    return (
+        idx is not None
+        and idx.listing_version == listing_version
+        and time.monotonic() - idx.loaded_at < INDEX_TTL_SEC
+    )
+
+
+def _name_rows(listing) -> list[tuple[str, str]]:
+    """(name, code) pairs: listing names first, then their comma-separated aliases."""
+    rows = [(name, code) for name, code, _ in listing]
+    rows += [
+        (alias.strip(), code)
+        for _, code, aliases in listing
+        for alias in (aliases or "").split(",")
+        if alias.strip()
+    ]
+    return rows
+
+
+def _install(listing, corp_rows, listing_version: int) -> TickerIndex:
+    global _INDEX, _VERSION
+    with _LOCK:
+        _VERSION += 1
+        _INDEX = TickerIndex(_name_rows(listing), _VERSION, listing_version, corp_rows)
+        return _INDEX
+
+
+def ticker_index() -> TickerIndex:
+    """Return the process-wide listing index.
+
+    It is reloaded after the TTL, or as soon as any process bumps the shared
+    listing version, so every API worker sees dim_listing changes.
+    """
+    listing_version = dataversion.current(dataversion.LISTING_KEY)
+    idx = _INDEX
+    if _fresh(idx, listing_version):
+        return idx
+    with _LOCK:
+        idx = _INDEX
+        if _fresh(idx, listing_version):
+            return idx
+        with SessionLocal() as s:
+            rows = s.execute(_LISTING_STMT).all()
+            corp_rows = s.execute(_CORP_STMT).all()
+        return _install(rows, corp_rows, listing_version)
+
+
+async def ticker_index_async() -> TickerIndex:
+    """ticker_index() for the event loop: the listing is loaded asynchronously."""
+    listing_version = await dataversion.current_async(dataversion.LISTING_KEY)
+    idx = _INDEX
+    if _fresh(idx, listing_version):
+        return idx
+    async with AsyncSessionLocal() as s:
+        rows = (await s.execute(_LISTING_STMT)).all()
+        corp_rows = (await s.execute(_CORP_STMT)).all()
+    return _install(rows, corp_rows, listing_version)
+
+
+def invalidate_ticker_index():
+    """Drop this process's cached index; call after dim_listing / dim_corp change.
+
+    Other processes notice through dataversion.LISTING_KEY, which the
+    writer should bump in the same transaction.
+    """
+    global _INDEX
+    with _LOCK:
+        _INDEX = None
+    _match_cached.cache_clear()
+
+
+@lru_cache(maxsize=8192)
+def _match_cached(corp_name: str, version: int) -> str | None:
+    # version is part of the key so a reloaded index never serves stale hits
+    idx = ticker_index()
+    return idx.lookup(corp_name) or idx.fuzzy(corp_name)
 
 
 def match_stock_code(corp_name: str) -> str | None:
     if not corp_name:
         return None
-    with SessionLocal() as s:
-        rows = s.execute(select(DimListing.corp_name_kr, DimListing.stock_code)).all()
-    if not rows:
-        return None
-    choices = {name: code for name, code in rows}
-    best = process.extractOne(
-        corp_name, list(choices.keys()), scorer=fuzz.token_sort_ratio
-    )
-    if best and best[1] >= 85:
-        return choices[best[0]]
-    return None
+    return _match_cached(corp_name, ticker_index().version)
+
+
+def match_many(corp_names, index: TickerIndex | None = None) -> list[str | None]:
+    """Resolve many corp names at once against a single index snapshot.
+
+    Names without an exact/normalized hit are fuzzy-matched together with
+    ``process.cdist`` when numpy is available. *index* defaults to the
+    process-wide ticker_index().
+    """
+    names = list(corp_names)
+    idx = index or ticker_index()
+    out: list[str | None] = [None] * len(names)
+    pending: dict[str, list[int]] = {}
+    for i, name in enumerate(names):
+        if not name:
+            continue
+        code = idx.lookup(name)
+        if code is not None:
+            out[i] = code
+        else:
+            pending.setdefault(name, []).append(i)
+    if not pending or not idx.names:
+        return out
+
+    queries = list(pending)
+    try:
+        scores = process.cdist(
+            queries,
+            idx.names,
+            scorer=fuzz.token_sort_ratio,
+            score_cutoff=SCORE_CUTOFF,
+            workers=-1,
+        )
+    except ImportError:  # cdist needs numpy
+        best = [idx.fuzzy(q) for q in queries]
+    else:
+        cols = scores.argmax(axis=1)
+        best = [
+            idx.codes[c] if scores[r, c] >= SCORE_CUTOFF else None
+            for r, c in enumerate(cols)
+        ]
+    for q, code in zip(queries, best):
+        for i in pending[q]:
+            out[i] = code
+    return out
+
+
+def resolve_many(rows, index: TickerIndex | None = None) -> list[str | None]:
+    """Ticker for each row carrying corp_code, stock_code and corp_name_kr.
+
+    Rows with issuer keys (DART filings) are resolved by key only, so an
+    unlisted filer is never fuzzy-matched onto a listed name. Rows without
+    keys (news) go through match_many().
+    """
+    rows = list(rows)
+    idx = index or ticker_index()
+    out: list[str | None] = [None] * len(rows)
+    by_name: list[int] = []
+    for i, r in enumerate(rows):
+        if r.corp_code or r.stock_code:
+            out[i] = idx.resolve_key(r.corp_code, r.stock_code)
+        else:
+            by_name.append(i)
+    if by_name:
+        codes = match_many((rows[i].corp_name_kr for i in by_name), idx)
+        for i, code in zip(by_name, codes):
+            out[i] = code
+    return out
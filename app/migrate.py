@@ -0,0 +1,255 @@
+"""Additive schema upgrades for databases created by older versions.
+
+``Base.metadata.create_all`` only creates missing tables, so new columns,
+their foreign keys and indexes on existing tables are added here (ALTER
+TABLE ... ADD COLUMN / ADD CONSTRAINT and CREATE INDEX IF NOT EXISTS),
+together with one-off backfills.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import logging
+
+from sqlalchemy import bindparam, inspect, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import AddConstraint, CreateColumn, CreateIndex
+
+from .dataversion import ensure_state
+from .ingest import dart_dedup_key, issuer_keys, naver_dedup_key
+from .models import Base, NormEvent, RawEvent
+
+LOGGER = logging.getLogger("cb.migrate")
+BACKFILL_CHUNK = 1000
+UTC_TIMES = "migrate.utc_times"  # ingest_state marker: source times stored in UTC
+KST_OFFSET = dt.timedelta(hours=9)
+
+
+def _add_missing_columns(engine: Engine) -> set[tuple[str, str]]:
+    insp = inspect(engine)
+    existing_tables = set(insp.get_table_names())
+    added: set[tuple[str, str]] = set()
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            have = {c["name"] for c in insp.get_columns(table.name)}
+            for col in table.columns:
+                if col.name in have:
+                    continue
+                ddl = CreateColumn(col).compile(dialect=engine.dialect)
+                conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {ddl}")
+                LOGGER.info("added column %s.%s", table.name, col.name)
+                added.add((table.name, col.name))
+    return added
+
+
+def _add_foreign_keys(engine: Engine, added: set[tuple[str, str]]) -> None:
+    """FOREIGN KEY constraints of added columns, which ADD COLUMN leaves out.
+
+    Run after the backfills, so existing rows are checked against the filled
+    values. SQLite cannot add a constraint to an existing table: upgraded
+    SQLite databases stay without these foreign keys (new ones get them
+    from create_all). A constraint the existing data violates is logged and
+    skipped rather than failing the upgrade.
+    """
+    if engine.dialect.name == "sqlite":
+        return
+    for table in Base.metadata.sorted_tables:
+        for col in table.columns:
+            if (table.name, col.name) not in added:
+                continue
+            for fk in col.foreign_keys:
+                try:
+                    with engine.begin() as conn:
+                        conn.execute(AddConstraint(fk.constraint))
+                except DBAPIError:
+                    LOGGER.warning(
+                        "could not add foreign key %s.%s -> %s",
+                        table.name,
+                        col.name,
+                        fk.target_fullname,
+                        exc_info=True,
+                    )
+                else:
+                    LOGGER.info(
+                        "added foreign key %s.%s -> %s",
+                        table.name,
+                        col.name,
+                        fk.target_fullname,
+                    )
+
+
+def _backfill_raw_dedup_keys(engine: Engine) -> None:
+    """Fill raw_events.dedup_key; later duplicates of a key keep NULL."""
+    seen: set[str] = set()
+    last_id = 0
+    stmt = (
+        update(RawEvent)
+        .where(RawEvent.id == bindparam("b_id"))
+        .values(dedup_key=bindparam("b_key"))
+    )
+    with engine.begin() as conn:
+        while True:
+            rows = conn.execute(
+                select(RawEvent.id, RawEvent.source, RawEvent.raw_json)
+                .where(RawEvent.id > last_id)
+                .order_by(RawEvent.id)
+                .limit(BACKFILL_CHUNK)
+            ).all()
+            if not rows:
+                break
+            params = []
+            for rid, source, raw in rows:
+                key = None
+                if raw and source == "dart":
+                    key = dart_dedup_key(raw)
+                elif raw and source == "naver_news":
+                    key = naver_dedup_key(raw)
+                if key and key not in seen:
+                    seen.add(key)
+                    params.append({"b_id": rid, "b_key": key})
+            if params:
+                conn.execute(stmt, params)
+            last_id = rows[-1][0]
+
+
+def _backfill_raw_issuer_keys(engine: Engine) -> None:
+    """Fill raw_events.corp_code / stock_code of DART rows from raw_json."""
+    stmt = (
+        update(RawEvent)
+        .where(RawEvent.id == bindparam("b_id"))
+        .values(corp_code=bindparam("b_corp"), stock_code=bindparam("b_stock"))
+    )
+    last_id = 0
+    with engine.begin() as conn:
+        while True:
+            rows = conn.execute(
+                select(RawEvent.id, RawEvent.raw_json)
+                .where(RawEvent.id > last_id, RawEvent.source == "dart")
+                .order_by(RawEvent.id)
+                .limit(BACKFILL_CHUNK)
+            ).all()
+            if not rows:
+                break
+            params = []
+            for rid, raw in rows:
+                if raw:
+                    corp_code, stock_code = issuer_keys(raw)
+                    params.append(
+                        {"b_id": rid, "b_corp": corp_code, "b_stock": stock_code}
+                    )
+            if params:
+                conn.execute(stmt, params)
+            last_id = rows[-1][0]
+
+
+def _backfill_norm_raw_ids(engine: Engine) -> None:
+    """Fill norm_events.raw_id from the first id in the ref_raw_ids CSV."""
+    stmt = (
+        update(NormEvent)
+        .where(NormEvent.event_id == bindparam("b_id"))
+        .values(raw_id=bindparam("b_raw"))
+    )
+    last_id = 0
+    with engine.begin() as conn:
+        while True:
+            rows = conn.execute(
+                select(NormEvent.event_id, NormEvent.ref_raw_ids)
+                .where(NormEvent.event_id > last_id)
+                .order_by(NormEvent.event_id)
+                .limit(BACKFILL_CHUNK)
+            ).all()
+            if not rows:
+                break
+            params = []
+            for event_id, ref in rows:
+                try:
+                    params.append({"b_id": event_id, "b_raw": int(ref.split(",")[0])})
+                except (AttributeError, ValueError):
+                    continue
+            if params:
+                conn.execute(stmt, params)
+            last_id = rows[-1][0]
+
+
+def _backfill_raw_norm_event_ids(engine: Engine) -> None:
+    """Point each raw row at the NormEvent whose primary source it is."""
+    event_id = (
+        select(NormEvent.event_id)
+        .where(NormEvent.raw_id == RawEvent.id)
+        .order_by(NormEvent.event_id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    with engine.begin() as conn:
+        conn.execute(update(RawEvent).values(norm_event_id=event_id))
+
+
+def _shift_source_times_to_utc(engine: Engine) -> None:
+    """Once per database: move stored KST source times to UTC.
+
+    Older versions wrote aware KST published_at values, which columns
+    outside PostgreSQL keep as KST wall-clock time next to UTC created_at
+    values. The marker row is inserted first in the same transaction, so
+    concurrent upgrades shift the times only once; new databases just get
+    the marker.
+    """
+    with Session(engine) as s, s.begin():
+        if not ensure_state(s, UTC_TIMES, 1) or engine.dialect.name == "postgresql":
+            return  # done before, or timestamptz kept the offset
+        for table, key, col in (
+            (RawEvent.__table__, "id", "published_at"),
+            (NormEvent.__table__, "event_id", "event_time"),
+        ):
+            stmt = (
+                update(table)
+                .where(table.c[key] == bindparam("b_id"))
+                .values({col: bindparam("b_time")})
+            )
+            last_id = 0
+            while True:
+                rows = s.execute(
+                    select(table.c[key], table.c[col])
+                    .where(table.c[key] > last_id, table.c[col].is_not(None))
+                    .order_by(table.c[key])
+                    .limit(BACKFILL_CHUNK)
+                ).all()
+                if not rows:
+                    break
+                s.execute(
+                    stmt, [{"b_id": rid, "b_time": t - KST_OFFSET} for rid, t in rows]
+                )
+                last_id = rows[-1][0]
+        LOGGER.info("stored source times converted from KST to UTC")
+
+
+def _create_missing_indexes(engine: Engine) -> None:
+    if engine.dialect.name in ("postgresql", "sqlite"):
+        # reflection skips expression indexes, so let the database check
+        with engine.begin() as conn:
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    conn.execute(CreateIndex(index, if_not_exists=True))
+        return
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+
+def upgrade_schema(engine: Engine) -> None:
+    """Bring an existing database up to the current models (idempotent)."""
+    added = _add_missing_columns(engine)
+    if ("raw_events", "dedup_key") in added:
+        _backfill_raw_dedup_keys(engine)
+    if ("raw_events", "corp_code") in added:
+        _backfill_raw_issuer_keys(engine)
+    if ("norm_events", "raw_id") in added:
+        _backfill_norm_raw_ids(engine)
+    if ("raw_events", "norm_event_id") in added:
+        _backfill_raw_norm_event_ids(engine)
+    _add_foreign_keys(engine, added)
+    _shift_source_times_to_utc(engine)
+    _create_missing_indexes(engine)
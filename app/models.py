@@ -1,6 +1,18 @@
 # app/models.py
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import Integer, Text, Boolean, TIMESTAMP, Numeric, VARCHAR, JSON
+from sqlalchemy import func
+from sqlalchemy import (
+    BigInteger,
+    Integer,
+    Text,
+    Boolean,
+    TIMESTAMP,
+    Numeric,
+    VARCHAR,
+    JSON,
+    Index,
+    ForeignKey,
+)
 
 
 class Base(DeclarativeBase):
@@ -12,11 +24,24 @@ class DimListing(Base):
     stock_code: Mapped[str] = mapped_column(VARCHAR(12), primary_key=True)
     corp_name_kr: Mapped[str] = mapped_column(Text)
     market: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # 약칭/영문명 등 뉴스 표기 (쉼표 구분) — see app/company_tagger.py
+    aliases: Mapped[str | None] = mapped_column(Text, nullable=True)
     updated_at: Mapped[str | None] = mapped_column(
         TIMESTAMP(timezone=True), nullable=True
     )
 
 
+class DimCorp(Base):
+    """DART corp master (corpCode.xml), keyed by DART's corp_code — see app/corp_master.py."""
+
+    __tablename__ = "dim_corp"
+    corp_code: Mapped[str] = mapped_column(VARCHAR(8), primary_key=True)
+    corp_name: Mapped[str | None] = mapped_column(Text)
+    stock_code: Mapped[str | None] = mapped_column(VARCHAR(12), index=True)  # 상장사만
+    modify_date: Mapped[str | None] = mapped_column(VARCHAR(8))
+    updated_at: Mapped[str | None] = mapped_column(TIMESTAMP(timezone=True))
+
+
 class RawEvent(Base):
     __tablename__ = "raw_events"
     # ✅ SQLite 호환: INTEGER PRIMARY KEY AUTOINCREMENT
@@ -29,6 +54,15 @@ class RawEvent(Base):
     published_at: Mapped[str | None] = mapped_column(TIMESTAMP(timezone=True))
     raw_json: Mapped[dict | None] = mapped_column(JSON)
     inserted_at: Mapped[str | None] = mapped_column(TIMESTAMP(timezone=True))
+    # 'dart:<rcept_no>' | 'naver:<normalized link>' — see app/ingest.py
+    dedup_key: Mapped[str | None] = mapped_column(Text)
+    # issuer keys reported by the source (DART list.json); NULL for news
+    corp_code: Mapped[str | None] = mapped_column(VARCHAR(8))
+    stock_code: Mapped[str | None] = mapped_column(VARCHAR(12))
+    # NormEvent (cluster) this row was normalized into — see app/cluster.py
+    norm_event_id: Mapped[int | None] = mapped_column(Integer, index=True)
+
+    __table_args__ = (Index("ux_raw_events_dedup_key", "dedup_key", unique=True),)
 
 
 class NormEvent(Base):
@@ -45,5 +79,55 @@ class NormEvent(Base):
     score: Mapped[float | None] = mapped_column(Numeric)
     has_official: Mapped[bool] = mapped_column(Boolean, default=False)
     ref_raw_ids: Mapped[str | None] = mapped_column(Text)  # CSV 문자열 보관
+    # primary source row (first of ref_raw_ids); join target for URLs/times
+    raw_id: Mapped[int | None] = mapped_column(ForeignKey("raw_events.id"), index=True)
     event_time: Mapped[str | None] = mapped_column(TIMESTAMP(timezone=True))
     created_at: Mapped[str | None] = mapped_column(TIMESTAMP(timezone=True))
+    # SimHash of the cluster's first news headline (signed 64-bit), for dedup;
+    # NULL for clusters started by a DART filing
+    simhash: Mapped[int | None] = mapped_column(BigInteger)
+    # data version of the batch that last inserted or changed the row, one
+    # number per row (app.dataversion); SSE clients resume on it (app.eventbus)
+    change_seq: Mapped[int | None] = mapped_column(BigInteger, index=True)
+
+
+# Effective event time used by the dashboard queries. Queries must use this
+# exact expression for the planner to pick the expression indexes below.
+EFFECTIVE_TIME = func.coalesce(NormEvent.event_time, NormEvent.created_at)
+
+# analytics.counts_by_type: range on effective time, grouped by type
+Index("ix_norm_events_eff_time_type", EFFECTIVE_TIME, NormEvent.event_type)
+# scorer.top_today: ORDER BY score DESC, event_time DESC, created_at DESC
+Index(
+    "ix_norm_events_score_time",
+    NormEvent.score,
+    NormEvent.event_time,
+    NormEvent.created_at,
+)
+# analytics.top_enriched: ORDER BY score DESC, effective time DESC
+Index("ix_norm_events_score_eff_time", NormEvent.score, EFFECTIVE_TIME)
+
+
+class IngestState(Base):
+    """Small key/value store for pipeline cursors and versions (e.g. DART heads)."""
+
+    __tablename__ = "ingest_state"
+    name: Mapped[str] = mapped_column(Text, primary_key=True)
+    value: Mapped[int] = mapped_column(BigInteger, default=0)
+    updated_at: Mapped[str | None] = mapped_column(TIMESTAMP(timezone=True))
+
+
+class HotFeed(Base):
+    """Materialized top-K feed with time-decayed scores (see app/hotfeed.py)."""
+
+    __tablename__ = "hot_feed"
+    rank: Mapped[int] = mapped_column(Integer, primary_key=True)
+    event_id: Mapped[int] = mapped_column(Integer)
+    score: Mapped[float | None] = mapped_column(Numeric)
+    event_time: Mapped[str | None] = mapped_column(TIMESTAMP(timezone=True))
+    stock_code: Mapped[str | None] = mapped_column(VARCHAR(12))
+    corp_name_kr: Mapped[str | None] = mapped_column(Text)
+    event_type: Mapped[str | None] = mapped_column(Text)
+    headline: Mapped[str | None] = mapped_column(Text)
+    url: Mapped[str | None] = mapped_column(Text)
+    refreshed_at: Mapped[str | None] = mapped_column(TIMESTAMP(timezone=True))
@@ -1,21 +1,26 @@
 import datetime as dt
-from sqlalchemy import select
+import itertools
+from typing import Iterable, Sequence
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.orm import Session
 from .db import SessionLocal
 from .models import RawEvent, NormEvent
-from .match_ticker import match_stock_code
+from .keywords import build_tagger
+from .match_ticker import TickerIndex, resolve_many
+from . import cluster, dataversion, eventbus
+
+# ordered: the first tag with a matching keyword wins (see keywords.build_tagger)
+EVENT_PATTERNS = {
+    "REFIX": ("리픽싱", ("전환가", "조정")),
+    "CONVERSION": ("전환청구",),
+    "REDEMPTION": ("조기상환", "풋옵션"),
+    "ISSUE": ("발행결정", "발행"),
+}
+_classify = build_tagger(EVENT_PATTERNS)
 
 
 def classify_event(text: str) -> str:
-    t = text or ""
-    if "리픽싱" in t or ("전환가" in t and "조정" in t):
-        return "REFIX"
-    if "전환청구" in t:
-        return "CONVERSION"
-    if "조기상환" in t or "풋옵션" in t:
-        return "REDEMPTION"
-    if "발행결정" in t or "발행" in t:
-        return "ISSUE"
-    return "OTHER"
+    return _classify(text)
 
 
 def compute_score(is_official: bool, event_type: str, age_minutes: int) -> float:
@@ -25,32 +30,361 @@ def compute_score(is_official: bool, event_type: str, age_minutes: int) -> float
     return round(min(1.0, base * 0.6 + type_bonus + recency * 0.3), 3)
 
 
-def normalize_recent(minutes=180):
-    cutoff = dt.datetime.utcnow() - dt.timedelta(minutes=minutes)
-    with SessionLocal() as s:
-        raws = (
-            s.execute(select(RawEvent).where(RawEvent.inserted_at >= cutoff))
-            .scalars()
-            .all()
-        )
-        for r in raws:
-            text = f"{r.title or ''} {r.content or ''}"
-            et = classify_event(text)
-            corp = r.corp_name_kr
-            code = match_stock_code(corp) if corp else None
-            is_official = r.source == "dart"
-            score = compute_score(is_official, et, 0)
-            ne = NormEvent(
-                stock_code=code,
-                corp_name_kr=corp,
-                event_type=et,
-                headline=r.title,
-                summary=(r.content or "")[:500],
-                score=score,
-                has_official=is_official,
-                ref_raw_ids=str(r.id),
-                event_time=r.published_at,
-                created_at=dt.datetime.utcnow(),
+BATCH_SIZE = 500
+
+# RawEvent columns normalization reads (no ORM objects / raw_json loaded)
+RAW_COLUMNS = (
+    RawEvent.id,
+    RawEvent.source,
+    RawEvent.title,
+    RawEvent.content,
+    RawEvent.corp_name_kr,
+    RawEvent.corp_code,
+    RawEvent.stock_code,
+    RawEvent.published_at,
+    RawEvent.norm_event_id,
+)
+
+
+def classify_many(texts: Iterable[str]) -> list[str]:
+    """classify_event over many texts; identical texts are classified once."""
+    memo: dict[str, str] = {}
+    out = []
+    for t in texts:
+        et = memo.get(t)
+        if et is None:
+            et = memo[t] = classify_event(t)
+        out.append(et)
+    return out
+
+
+_SET_MEMBER = (
+    update(RawEvent.__table__)
+    .where(RawEvent.id == bindparam("b_id"))
+    .values(norm_event_id=bindparam("b_event"))
+)
+
+
+_SET_SEQ = (
+    update(NormEvent.__table__)
+    .where(NormEvent.event_id == bindparam("b_id"))
+    .values(change_seq=bindparam("b_seq"))
+)
+
+_MOVE_MEMBERS = (
+    update(RawEvent.__table__)
+    .where(RawEvent.norm_event_id == bindparam("b_old"))
+    .values(norm_event_id=bindparam("b_new"))
+)
+
+# NormEvent columns a cluster merge reads and rewrites
+_CLUSTER_COLUMNS = (
+    NormEvent.event_id,
+    NormEvent.raw_id,
+    NormEvent.ref_raw_ids,
+    NormEvent.stock_code,
+    NormEvent.corp_name_kr,
+    NormEvent.event_type,
+    NormEvent.headline,
+    NormEvent.summary,
+    NormEvent.score,
+    NormEvent.has_official,
+    NormEvent.event_time,
+)
+
+
+def _cluster_rows(s: Session, event_ids) -> list[dict]:
+    """Stored clusters as dicts, ref_raw_ids as a list of ints."""
+    if not event_ids:
+        return []
+    out = []
+    for c in s.execute(
+        select(*_CLUSTER_COLUMNS).where(NormEvent.event_id.in_(list(event_ids)))
+    ):
+        row = dict(c._mapping)
+        row["ref_raw_ids"] = [
+            int(x) for x in (row["ref_raw_ids"] or "").split(",") if x
+        ]
+        out.append(row)
+    return out
+
+
+def _event_row(r, code: str | None, et: str) -> dict:
+    is_official = r.source == "dart"
+    return {
+        "stock_code": code,
+        "corp_name_kr": r.corp_name_kr,
+        "event_type": et,
+        "headline": r.title,
+        "summary": (r.content or "")[:500],
+        "score": compute_score(is_official, et, 0),
+        "has_official": is_official,
+        "event_time": r.published_at,
+    }
+
+
+def _earlier(a, b) -> bool:
+    return cluster._utc_naive(a) < cluster._utc_naive(b)
+
+
+def _merge_into(row: dict, r, code: str | None, et: str):
+    """Fold raw row *r* into the cluster *row* (ref_raw_ids as a list).
+
+    Fields are only filled in or improved, never blanked: the earliest known
+    event time wins and an existing headline / summary is kept.
+    """
+    row["ref_raw_ids"].append(r.id)
+    if row["stock_code"] is None and code:
+        row["stock_code"] = code
+    if r.corp_name_kr and (r.source == "dart" or not row["corp_name_kr"]):
+        row["corp_name_kr"] = r.corp_name_kr
+    if row["event_type"] == "OTHER":
+        row["event_type"] = et
+    if r.published_at is not None and (
+        row["event_time"] is None or _earlier(r.published_at, row["event_time"])
+    ):
+        row["event_time"] = r.published_at
+    if not row["headline"] and r.title:
+        row["headline"] = r.title
+    if not row["summary"] and r.content:
+        row["summary"] = r.content[:500]
+    if r.source == "dart" and not row["has_official"]:
+        # the filing arrived: it becomes the cluster's primary source
+        row["has_official"] = True
+        row["raw_id"] = r.id
+    row["score"] = compute_score(row["has_official"], row["event_type"], 0)
+
+
+def _absorb(row: dict, other: dict):
+    """Fold the sibling cluster *other* into *row* (ref_raw_ids as lists).
+
+    Like _merge_into, fields are only filled in or improved; the primary
+    source and official flag of *row* are kept.
+    """
+    row["ref_raw_ids"].extend(other["ref_raw_ids"])
+    for key in ("stock_code", "corp_name_kr", "headline", "summary"):
+        if not row[key] and other[key]:
+            row[key] = other[key]
+    if row["event_type"] == "OTHER":
+        row["event_type"] = other["event_type"]
+    if other["event_time"] is not None and (
+        row["event_time"] is None or _earlier(other["event_time"], row["event_time"])
+    ):
+        row["event_time"] = other["event_time"]
+    row["score"] = compute_score(row["has_official"], row["event_type"], 0)
+
+
+def _fold_sibling(lsh, c, target, new, merged, absorbed, folded):
+    """Merge sibling cluster *c* into *target*, which a filing just joined."""
+    lsh.discard(c.event_id)
+    folded[c.event_id] = target.event_id
+    if c.event_id < 0:  # created in this batch: never written
+        other = new.pop(c.event_id)
+        if target.event_id < 0:
+            _absorb(new[target.event_id], other)
+        else:
+            absorbed.setdefault(target.event_id, []).append(other)
+        return
+    # stored: its row is read and folded in after the loop; pending raw rows
+    # and siblings already folded into it follow it to the target
+    if c.event_id in merged:
+        merged.setdefault(target.event_id, []).extend(merged.pop(c.event_id))
+    if c.event_id in absorbed:
+        absorbed.setdefault(target.event_id, []).extend(absorbed.pop(c.event_id))
+
+
+def _refresh_row(r, code: str | None, et: str, event_id: int) -> dict:
+    """Derived fields of a primary row, leaving values it lacks untouched."""
+    row = _event_row(r, code, et)
+    if row["event_time"] is None:
+        del row["event_time"]
+    if not row["summary"]:
+        del row["summary"]
+    return {**row, "event_id": event_id}
+
+
+def normalize_rows(
+    s: Session,
+    raws: Sequence,
+    index: TickerIndex | None = None,
+    now: dt.datetime | None = None,
+    lsh: cluster.LshIndex | None = None,
+) -> int:
+    """Normalize a batch of raw rows (carrying RAW_COLUMNS) in bulk.
+
+    Tickers are resolved against one ticker index snapshot: DART rows by
+    their issuer keys, news by corp name. Each new raw row either joins a
+    recent cluster of the same company found through the LSH index
+    (app.cluster) or starts a NormEvent of its own; a filing also merges
+    the other news clusters of its story, whose events are deleted and whose
+    raw rows are repointed. New events go out as one executemany INSERT,
+    and touched clusters plus re-normalized primaries as executemany
+    UPDATEs. Every inserted or changed event gets a new change_seq from the
+    data version (app.dataversion), which the event stream resumes on. Rows
+    already folded into a cluster are skipped. The caller commits. Returns
+    the number of rows processed.
+    """
+    if not raws:
+        return 0
+    now = now or dt.datetime.utcnow()
+    lsh = lsh if lsh is not None else cluster.recent_index(s, now)
+    existing = dict(
+        s.execute(
+            select(NormEvent.raw_id, NormEvent.event_id).where(
+                NormEvent.raw_id.in_([r.id for r in raws])
             )
-            s.add(ne)
-        s.commit()
+        ).all()
+    )
+    codes = resolve_many(raws, index)
+    types = classify_many(f"{r.title or ''} {r.content or ''}" for r in raws)
+    # DART titles are form names, not headlines: no signature (app.cluster)
+    news = [i for i, r in enumerate(raws) if r.source != "dart"]
+    sigs: list[int | None] = [None] * len(raws)
+    for i, sig in zip(news, cluster.simhash_many(raws[i].title for i in news)):
+        sigs[i] = sig
+
+    temp_ids = itertools.count(-1, -1)
+    new: dict[int, dict] = {}  # temporary (negative) id -> row
+    merged: dict[int, list] = {}  # existing event id -> raw rows to fold in
+    absorbed: dict[int, list] = {}  # existing event id -> sibling rows to fold in
+    folded: dict[int, int] = {}  # sibling cluster id -> cluster it merged into
+    members: list[tuple[int, int]] = []  # (raw id, event id or temporary id)
+    changed = []
+    for r, code, et, sig in zip(raws, codes, types, sigs):
+        event_id = existing.get(r.id)
+        if event_id is not None:
+            # primary source of its cluster: refresh the derived fields
+            changed.append(_refresh_row(r, code, et, event_id))
+            members.append((r.id, event_id))
+            continue
+        if r.norm_event_id is not None:
+            continue  # already folded into a cluster
+
+        t = r.published_at or now
+        if r.source == "dart":
+            target = lsh.probe_official(code, et, t) if code else None
+            if target is not None:
+                for c in lsh.siblings(target, t):
+                    _fold_sibling(lsh, c, target, new, merged, absorbed, folded)
+        else:
+            target = lsh.probe(sig, cluster.bucket_key(code, r.corp_name_kr), t)
+            if target is None and code:
+                target = lsh.probe_filed(code, et, t)
+        if target is None:
+            temp_id = next(temp_ids)
+            row = _event_row(r, code, et)
+            row.update(raw_id=r.id, ref_raw_ids=[r.id], created_at=now, simhash=sig)
+            new[temp_id] = row
+            bucket = cluster.bucket_key(code, r.corp_name_kr)
+            lsh.add(cluster.Cluster(temp_id, sig, bucket, t, et, row["has_official"]))
+            members.append((r.id, temp_id))
+            continue
+
+        members.append((r.id, target.event_id))
+        if target.event_id < 0:
+            _merge_into(new[target.event_id], r, code, et)
+        else:
+            merged.setdefault(target.event_id, []).append((r, code, et))
+        if r.source == "dart":
+            target.official = True
+
+    # stored siblings: fold their rows in before the targets are written
+    dropped = {sib: tgt for sib, tgt in folded.items() if sib > 0}
+    for row in _cluster_rows(s, dropped):
+        target_id = dropped[row["event_id"]]
+        if target_id < 0:
+            _absorb(new[target_id], row)
+        else:
+            absorbed.setdefault(target_id, []).append(row)
+
+    real: dict[int, int] = {}
+    if new:
+        rows = list(new.values())
+        for row in rows:
+            row["ref_raw_ids"] = ",".join(map(str, row["ref_raw_ids"]))
+        # Core executemany: the ORM bulk path splits rows by their None keys
+        s.execute(insert(NormEvent.__table__), rows)
+        ids = dict(
+            s.execute(
+                select(NormEvent.raw_id, NormEvent.event_id).where(
+                    NormEvent.raw_id.in_([row["raw_id"] for row in rows])
+                )
+            ).all()
+        )
+        real = {temp_id: ids[row["raw_id"]] for temp_id, row in new.items()}
+        for temp_id, event_id in real.items():
+            lsh.rekey(temp_id, event_id)
+        lsh.last_event_id = max(lsh.last_event_id, *real.values())
+
+    for row in _cluster_rows(s, set(merged) | set(absorbed)):
+        for r, code, et in merged.get(row["event_id"], ()):
+            _merge_into(row, r, code, et)
+        for other in absorbed.get(row["event_id"], ()):
+            _absorb(row, other)
+        row["ref_raw_ids"] = ",".join(map(str, row["ref_raw_ids"]))
+        changed.append(row)
+
+    if changed:
+        s.execute(update(NormEvent), changed)  # bulk UPDATE by primary key
+    if dropped:
+        s.execute(
+            _MOVE_MEMBERS,
+            [{"b_old": sib, "b_new": real.get(t, t)} for sib, t in dropped.items()],
+        )
+        s.execute(delete(NormEvent).where(NormEvent.event_id.in_(list(dropped))))
+    if members:
+        resolved = ((rid, folded.get(eid, eid)) for rid, eid in members)
+        s.execute(
+            _SET_MEMBER,
+            [{"b_id": rid, "b_event": real.get(eid, eid)} for rid, eid in resolved],
+        )
+
+    touched = sorted({*real.values(), *(row["event_id"] for row in changed)})
+    touched = [event_id for event_id in touched if event_id not in dropped]
+    if touched:
+        # one change sequence number per event, handed out by the data version
+        last = dataversion.bump(s, by=len(touched))
+        first = last - len(touched) + 1
+        s.execute(
+            _SET_SEQ,
+            [{"b_id": eid, "b_seq": first + i} for i, eid in enumerate(touched)],
+        )
+    return len(raws)
+
+
+def normalize_recent(batch_size: int = BATCH_SIZE) -> int:
+    """Normalize RawEvents that are not folded into a NormEvent yet.
+
+    Pending rows (``norm_event_id IS NULL``, read through its index) are
+    processed in id order, *batch_size* at a time, through normalize_rows(),
+    which links every row it handles in the same commit; re-running never
+    creates duplicate NormEvents. Selecting on the link rather than an id
+    watermark also picks up rows whose insert committed after a higher id
+    was already normalized. Returns rows processed.
+    """
+    total = 0
+    last_id = 0  # within this run only: never re-read a row it just handled
+    while True:
+        with SessionLocal() as s:
+            raws = s.execute(
+                select(*RAW_COLUMNS)
+                .where(RawEvent.norm_event_id.is_(None), RawEvent.id > last_id)
+                .order_by(RawEvent.id)
+                .limit(batch_size)
+            ).all()
+            if not raws:
+                break
+
+            try:
+                normalize_rows(s, raws)
+            except Exception:
+                cluster.reset_index()  # may hold clusters that were never stored
+                raise
+            eventbus.notify(s)
+            s.commit()
+
+        total += len(raws)
+        last_id = raws[-1].id
+        if len(raws) < batch_size:
+            break
+    return total
@@ -0,0 +1,178 @@
+"""Ingest pipeline: fetch -> queue -> normalize, on one asyncio loop.
+
+The cron jobs in app.scheduler run fetching and normalization on unrelated
+clocks, so a fresh filing can wait a full normalize period before reaching
+/api/top. Here each fetch stage polls on its own interval and puts the
+RawEvents it actually inserted on an in-process queue; the normalize stage
+wakes on the first batch, lingers briefly to coalesce concurrent fetches
+into one micro-batch, then runs normalize_recent() and refresh_hot_feed().
+
+Database work stays synchronous and runs in worker threads; the HTTP side
+uses the loop's pooled client. Every cycle logs how long its events took
+from publication (filing / article time) and from fetch to the feed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import logging
+import statistics
+import time
+from typing import Awaitable, Callable
+
+from . import corp_master, fetch_dart, fetch_news_naver, http_client, ratelimit
+from .hotfeed import refresh_hot_feed
+from .normalizer import normalize_recent
+
+LOGGER = logging.getLogger("cb.pipeline")
+
+DART_INTERVAL_SEC = 60
+NAVER_INTERVAL_SEC = 60
+HOT_REFRESH_SEC = 60  # score decay still needs a periodic refresh
+CORP_REFRESH_SEC = 24 * 3600  # DART corpCode.xml changes daily at most
+LINGER_SEC = 0.5
+QUEUE_MAX = 64
+
+
+class IngestBatch:
+    """RawEvent rows one fetch cycle inserted, with when they were fetched."""
+
+    def __init__(self, source: str, rows: list[dict], fetched_at: dt.datetime):
+        self.source = source
+        self.rows = rows
+        self.fetched_at = fetched_at
+
+    def published_lags(self, now: dt.datetime) -> list[float]:
+        out = []
+        for row in self.rows:
+            t = row.get("published_at")
+            if t is None:
+                continue
+            if t.tzinfo is None:
+                t = t.replace(tzinfo=dt.timezone.utc)
+            out.append(max(0.0, (now - t).total_seconds()))
+        return out
+
+
+def _utcnow() -> dt.datetime:
+    return dt.datetime.now(dt.timezone.utc)
+
+
+async def _dart_cycle() -> list[dict]:
+    cursor = await asyncio.to_thread(fetch_dart.load_cursor)
+    rows, new_cursor = await fetch_dart.fetch_dart_rows(cursor)
+    if not rows and new_cursor == cursor:
+        return []
+    return await asyncio.to_thread(fetch_dart.store_dart_rows, rows, new_cursor)
+
+
+async def _naver_cycle() -> list[dict]:
+    rows = await fetch_news_naver.fetch_naver_rows()
+    if not rows:
+        return []
+    return await asyncio.to_thread(fetch_news_naver.store_naver_rows, rows)
+
+
+async def _fetch_stage(
+    name: str,
+    cycle: Callable[[], Awaitable[list[dict]]],
+    upstream: ratelimit.Upstream,
+    interval: float,
+    queue: asyncio.Queue,
+):
+    while True:
+        fetched_at = _utcnow()
+        try:
+            rows = await cycle()
+        except Exception:
+            LOGGER.exception("%s fetch failed", name)
+            rows = []
+        if rows:
+            await queue.put(IngestBatch(name, rows, fetched_at))
+        # spread calls out while the upstream is spending ahead of its budget
+        await asyncio.sleep(interval * upstream.stretch_factor())
+
+
+def _report(batches: list[IngestBatch], normalized: int, took: float):
+    now = _utcnow()
+    lags = sorted(lag for b in batches for lag in b.published_lags(now))
+    fetch_lag = max((now - b.fetched_at).total_seconds() for b in batches)
+    by_source: dict[str, int] = {}
+    for b in batches:
+        by_source[b.source] = by_source.get(b.source, 0) + len(b.rows)
+    if lags:
+        p95 = lags[min(len(lags) - 1, int(len(lags) * 0.95))]
+        published = "p50=%.0fs p95=%.0fs max=%.0fs" % (
+            statistics.median(lags),
+            p95,
+            lags[-1],
+        )
+    else:
+        published = "n/a"
+    LOGGER.info(
+        "cycle: new=%s normalized=%d normalize=%.2fs fetch->feed=%.1fs "
+        "published->feed %s",
+        by_source,
+        normalized,
+        took,
+        fetch_lag,
+        published,
+    )
+
+
+async def _normalize_stage(queue: asyncio.Queue):
+    while True:
+        batches = [await queue.get()]
+        await asyncio.sleep(LINGER_SEC)
+        while not queue.empty():
+            batches.append(queue.get_nowait())
+
+        started = time.monotonic()
+        try:
+            normalized = await asyncio.to_thread(normalize_recent)
+            await asyncio.to_thread(refresh_hot_feed)
+        except Exception:
+            LOGGER.exception("normalize stage failed")
+            continue
+        _report(batches, normalized, time.monotonic() - started)
+
+
+async def _hot_stage():
+    while True:
+        await asyncio.sleep(HOT_REFRESH_SEC)
+        try:
+            await asyncio.to_thread(refresh_hot_feed)
+        except Exception:
+            LOGGER.exception("hot feed refresh failed")
+
+
+async def _corp_master_stage():
+    refresh = corp_master.ensure_corp_master  # first pass: only if empty
+    while True:
+        try:
+            await asyncio.to_thread(refresh)
+        except Exception:
+            LOGGER.exception("corp master refresh failed")
+        refresh = corp_master.refresh_corp_master
+        await asyncio.sleep(CORP_REFRESH_SEC)
+
+
+async def run_pipeline():
+    """Run the fetch, normalize and hot-feed stages until cancelled."""
+    queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_MAX)
+    # pick up anything the previous run fetched but did not normalize
+    await asyncio.to_thread(normalize_recent)
+    await asyncio.to_thread(refresh_hot_feed)
+    try:
+        await asyncio.gather(
+            _fetch_stage("dart", _dart_cycle, ratelimit.DART, DART_INTERVAL_SEC, queue),
+            _fetch_stage(
+                "naver", _naver_cycle, ratelimit.NAVER, NAVER_INTERVAL_SEC, queue
+            ),
+            _normalize_stage(queue),
+            _hot_stage(),
+            _corp_master_stage(),
+        )
+    finally:
+        await http_client.aclose()
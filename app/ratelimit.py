@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import logging
+import math
+import threading
+import time
+
+from sqlalchemy import delete, select
+
+from . import dataversion
+from .config import settings
+from .db import SessionLocal
+from .models import IngestState
+
+LOGGER = logging.getLogger("cb.ratelimit")
+
+KST = dt.timezone(dt.timedelta(hours=9))
+
+BACKOFF_BASE_SEC = 2.0
+BACKOFF_MAX_SEC = 300.0
+MAX_STRETCH = 8.0
+SYNC_EVERY_SEC = 10.0
+USED_KEY = "ratelimit."  # + "<name>.<YYYYMMDD>": calls made that KST day
+
+
+class UpstreamThrottled(RuntimeError):
+    """Raised instead of calling an upstream that is backing off or out of quota."""
+
+
+class Upstream:
+    """Token bucket + daily call budget + exponential backoff for one API.
+
+    Shared by the API server loop and the scheduler's background loop, so
+    state is guarded by a thread lock and waiting uses asyncio.sleep.
+    The daily budget is shared by every process: calls are counted locally
+    and added to an ingest_state counter every SYNC_EVERY_SEC (sync()),
+    which also reads back the total of all workers. Between syncs the
+    workers together can overshoot by what they call in that interval.
+    With *body_status* set, an HTTP 200 is not yet a success: the caller
+    reports the outcome after inspecting the JSON status (see DART).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate_per_sec: float,
+        burst: int,
+        daily_budget: int,
+        body_status: bool = False,
+    ):
+        self.name = name
+        self.body_status = body_status
+        self.rate = rate_per_sec
+        self.burst = burst
+        self.daily_budget = daily_budget
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._day = dt.datetime.now(KST).date()
+        self.used_today = 0  # all processes, as of the last sync + own since
+        self._unsynced = 0  # own calls not yet added to the shared counter
+        self._synced_at = -SYNC_EVERY_SEC
+        self._swept_day = None
+        self.throttled = 0
+        self.failures = 0  # consecutive
+        self._backoff_until = 0.0
+        self._ticks: dict[str, int] = {}
+
+    def _roll_day(self):
+        today = dt.datetime.now(KST).date()
+        if today != self._day:
+            self._day = today
+            self.used_today = 0
+            self._unsynced = 0
+
+    def _try_take(self) -> float:
+        """Consume a token and return 0, or return seconds to wait."""
+        now = time.monotonic()
+        self._roll_day()
+        if self.used_today >= self.daily_budget:
+            raise UpstreamThrottled(f"{self.name}: daily budget exhausted")
+        if now < self._backoff_until:
+            return self._backoff_until - now
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._refilled) * self.rate
+        )
+        self._refilled = now
+        if self._tokens < 1.0:
+            return (1.0 - self._tokens) / self.rate
+        self._tokens -= 1.0
+        self.used_today += 1
+        self._unsynced += 1
+        return 0.0
+
+    async def acquire(self, max_wait: float = 10.0):
+        """Wait for a call slot; raise UpstreamThrottled if it is too far off."""
+        while True:
+            with self._lock:
+                wait = self._try_take()
+            if wait <= 0:
+                if time.monotonic() - self._synced_at >= SYNC_EVERY_SEC:
+                    await asyncio.to_thread(self.sync)
+                return
+            if wait > max_wait:
+                with self._lock:
+                    self.throttled += 1
+                raise UpstreamThrottled(f"{self.name}: backing off for {wait:.0f}s")
+            await asyncio.sleep(wait)
+
+    def sync(self):
+        """Add own calls to today's shared counter and read back the total."""
+        with self._lock:
+            self._roll_day()
+            day, pending = self._day, self._unsynced
+            self._unsynced = 0
+            self._synced_at = time.monotonic()
+        key = f"{USED_KEY}{self.name}.{day:%Y%m%d}"
+        try:
+            with SessionLocal() as s:
+                if pending:
+                    total = dataversion.bump(s, key, by=pending)
+                else:
+                    total = s.execute(
+                        select(IngestState.value).where(IngestState.name == key)
+                    ).scalar()
+                if self._swept_day != day:
+                    # earlier days' counters
+                    s.execute(
+                        delete(IngestState).where(
+                            IngestState.name.startswith(f"{USED_KEY}{self.name}."),
+                            IngestState.name != key,
+                        )
+                    )
+                s.commit()
+        except Exception:
+            LOGGER.warning("%s: call counter sync failed", self.name, exc_info=True)
+            with self._lock:
+                if self._day == day:
+                    self._unsynced += pending
+            return
+        with self._lock:
+            self._swept_day = day
+            if self._day == day:
+                self.used_today = (total or 0) + self._unsynced
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+
+    def record_failure(self, reason: str):
+        """Back off exponentially after 429 / 5xx / throttling status codes."""
+        with self._lock:
+            self.failures += 1
+            delay = min(BACKOFF_MAX_SEC, BACKOFF_BASE_SEC * 2 ** (self.failures - 1))
+            self._backoff_until = max(self._backoff_until, time.monotonic() + delay)
+        LOGGER.warning("%s throttled (%s); backing off %.0fs", self.name, reason, delay)
+
+    def stretch_factor(self) -> float:
+        """How much to lengthen poll intervals so the budget lasts the day.
+
+        1.0 while usage is on pace with the elapsed share of the (KST) day,
+        growing up to MAX_STRETCH as calls run ahead of it.
+        """
+        with self._lock:
+            self._roll_day()
+            used = self.used_today / max(1, self.daily_budget)
+        now = dt.datetime.now(KST)
+        elapsed = (now.hour * 3600 + now.minute * 60 + now.second) / 86400
+        return max(1.0, min(MAX_STRETCH, used / max(elapsed, 0.05)))
+
+    def should_skip(self, job: str) -> bool:
+        """For fixed-cadence jobs: run only every ceil(stretch)-th tick."""
+        every = math.ceil(self.stretch_factor())
+        with self._lock:
+            n = self._ticks[job] = self._ticks.get(job, 0) + 1
+        return every > 1 and n % every != 0
+
+    def snapshot(self) -> dict:
+        stretch = self.stretch_factor()
+        with self._lock:
+            return {
+                "used_today": self.used_today,
+                "daily_budget": self.daily_budget,
+                "remaining": max(0, self.daily_budget - self.used_today),
+                "consecutive_failures": self.failures,
+                "backoff_sec": round(
+                    max(0.0, self._backoff_until - time.monotonic()), 1
+                ),
+                "throttled": self.throttled,
+                "stretch": round(stretch, 2),
+            }
+
+
+NAVER = Upstream(
+    "naver",
+    rate_per_sec=settings.NAVER_RATE_PER_SEC,
+    burst=10,
+    daily_budget=settings.NAVER_DAILY_BUDGET,
+)
+DART = Upstream(
+    "dart",
+    rate_per_sec=settings.DART_RATE_PER_SEC,
+    burst=5,
+    daily_budget=settings.DART_DAILY_BUDGET,
+    body_status=True,
+)
+
+_BY_HOST = {"openapi.naver.com": NAVER, "opendart.fss.or.kr": DART}
+
+# DART list.json status codes that mean "slow down"
+# 020: 요청 제한 초과, 800: 시스템 점검
+DART_THROTTLE_STATUS = {"020", "800"}
+
+
+def for_host(host: str | None) -> Upstream | None:
+    return _BY_HOST.get(host or "")
+
+
+def by_name(name: str) -> Upstream | None:
+    return {"naver": NAVER, "dart": DART}.get(name)
+
+
+def check_dart_status(payload: dict):
+    """Report a DART response outcome from its JSON status code."""
+    status = payload.get("status")
+    if status in DART_THROTTLE_STATUS:
+        DART.record_failure(f"status {status}")
+    else:
+        DART.record_success()
+
+
+def snapshot() -> dict:
+    return {u.name: u.snapshot() for u in _BY_HOST.values()}
@@ -1,19 +1,21 @@
 from fastapi import APIRouter, Request
-from fastapi.responses import StreamingResponse
-import asyncio, json, re, html, datetime as dt, time
+from fastapi.responses import Response, StreamingResponse
+import asyncio, gzip, json, re, html, datetime as dt, logging, time
+from collections import OrderedDict
 from email.utils import parsedate_to_datetime
-import httpx
-from typing import Iterable, Optional, Set
-from sqlalchemy import select
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
 
+from . import http_client, ratelimit
 from .config import settings
-from .keywords import COMBINED
-from .db import SessionLocal
-from .models import DimListing
+from .fetch_news_naver import NaverCursor, fetch_query
+from .company_tagger import tag_news
+from .keywords import build_tagger, is_cb_event
+from .match_ticker import ticker_index_async
+
+LOGGER = logging.getLogger("cb.live")
 
 router = APIRouter(prefix="/api/live", tags=["live"])
 
-NAVER_URL = "https://openapi.naver.com/v1/search/news.json"
 DART_URL = "https://opendart.fss.or.kr/api/list.json"
 
 # ---- timezones / helpers ----
@@ -36,13 +38,9 @@ CLASSIFY_PATTERNS = {
 }
 
 
-def _classify(text: str) -> str:
-    """Roughly classify the headline into a CB-related category."""
-    t = (text or "").lower()
-    for tag, keywords in CLASSIFY_PATTERNS.items():
-        if any(k.lower() in t for k in keywords):
-            return tag
-    return "OTHER"
+# Roughly classify the headline into a CB-related category (substring
+# scans in tag order; see keywords.build_tagger).
+_classify = build_tagger(CLASSIFY_PATTERNS)
 
 
 def _to_utc(d: Optional[dt.datetime]) -> Optional[dt.datetime]:
@@ -63,32 +61,295 @@ def _iso_to_utc(s: Optional[str]) -> Optional[dt.datetime]:
     return _to_utc(d)
 
 
-# ---- listing cache (corp -> stock_code) ----
-_CHOICES = None
-_LAST_LOAD = None
+# ---- payload encoding (once per item, shared by every client) ----
+try:
+    import orjson
 
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+except ImportError:
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
 
-def _load_choices():
-    global _CHOICES, _LAST_LOAD
-    now = dt.datetime.now(UTC)
-    if (
-        _CHOICES is None
-        or _LAST_LOAD is None
-        or (now - _LAST_LOAD).total_seconds() > 600
-    ):
-        with SessionLocal() as s:
-            rows = s.execute(
-                select(DimListing.corp_name_kr, DimListing.stock_code)
-            ).all()
-        _CHOICES = {name: code for name, code in rows}
-        _LAST_LOAD = now
-    return _CHOICES
 
+# Upstream item as received; only sent when asked for (fields=...,raw)
+HEAVY_FIELDS = frozenset({"raw"})
+GZIP_MIN_BYTES = 1024
 
-def _lookup_code(corp_name: Optional[str]) -> Optional[str]:
-    if not corp_name:
+
+def _parse_fields(fields: Optional[str]) -> Optional[tuple]:
+    """Normalized ``fields=`` projection; None means every field but HEAVY_FIELDS."""
+    if not fields:
         return None
-    return _load_choices().get(corp_name)
+    return tuple(sorted({f.strip() for f in fields.split(",") if f.strip()}))
+
+
+def _project(row: dict, fields: Optional[tuple]) -> dict:
+    if fields is None:
+        return {k: v for k, v in row.items() if k not in HEAVY_FIELDS}
+    return {k: row[k] for k in fields if k in row}
+
+
+class _Event:
+    """One upstream row plus its SSE frame, encoded once per field projection."""
+
+    __slots__ = ("row", "_frames")
+
+    def __init__(self, row: dict):
+        self.row = row
+        self._frames: Dict[Optional[tuple], bytes] = {}
+
+    def frame(self, fields: Optional[tuple]) -> bytes:
+        f = self._frames.get(fields)
+        if f is None:
+            f = self._frames[fields] = (
+                b"data: " + _dumps(_project(self.row, fields)) + b"\n\n"
+            )
+        return f
+
+
+def _json_response(request: Request, rows: List[dict], fields: Optional[tuple]):
+    """Projected rows as JSON, gzipped when the client accepts it."""
+    body = _dumps([_project(r, fields) for r in rows])
+    headers = {"Vary": "Accept-Encoding"}
+    if len(body) >= GZIP_MIN_BYTES and "gzip" in request.headers.get(
+        "accept-encoding", ""
+    ):
+        body = gzip.compress(body, compresslevel=5)
+        headers["Content-Encoding"] = "gzip"
+    return Response(body, media_type="application/json", headers=headers)
+
+
+# ---- shared upstream pollers (one per stream key, fanned out to clients) ----
+HEARTBEAT_SEC = 15
+SUB_QUEUE_MAX = 32
+SNAPSHOT_MAX = 300
+
+
+def _row_key(r: dict) -> int:
+    # 64-bit in-process hash; only ever compared within this process
+    return hash(f"{r.get('url')}|{r.get('time')}")
+
+
+class _RecentKeys:
+    """Dedup set that forgets keys not seen for *window_sec* seconds.
+
+    Keys are refreshed each time upstream returns them again, so a row stays
+    suppressed while it is still in the upstream listing and is dropped once
+    it has aged out; *max_size* bounds memory regardless of the window.
+    """
+
+    def __init__(self, window_sec: float, max_size: int = 20000):
+        self.window_sec = window_sec
+        self.max_size = max_size
+        self._keys: "OrderedDict[int, float]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: int) -> bool:
+        """Record *key*; return True if it was not already present."""
+        now = time.monotonic()
+        is_new = key not in self._keys
+        self._keys[key] = now
+        self._keys.move_to_end(key)
+        cutoff = now - self.window_sec
+        while self._keys:
+            seen_at = next(iter(self._keys.values()))
+            if seen_at >= cutoff and len(self._keys) <= self.max_size:
+                break
+            self._keys.popitem(last=False)
+        return is_new
+
+
+class _SharedPoller:
+    """Poll one upstream source once on behalf of every subscribed SSE client.
+
+    Each subscriber gets its own queue; the poller pushes only rows it has not
+    published before, and stops as soon as the last subscriber leaves. Rows
+    are published as _Event objects, so each SSE frame is encoded once no
+    matter how many clients receive it.
+    """
+
+    def __init__(self, key: tuple, fetch: Callable[[], Awaitable[List[dict]]]):
+        self.key = key
+        self._fetch = fetch
+        self._subs: Dict[asyncio.Queue, int] = {}  # queue -> requested interval
+        self._seen = _RecentKeys(window_sec=0)
+        self._snapshot: List[_Event] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, interval: int, minutes: int) -> asyncio.Queue:
+        q: asyncio.Queue = asyncio.Queue(maxsize=SUB_QUEUE_MAX)
+        # remember rows for the widest look-back any subscriber asked for
+        self._seen.window_sec = max(self._seen.window_sec, minutes * 60)
+        if self._snapshot:
+            # late joiners start from the latest upstream window
+            q.put_nowait(list(self._snapshot))
+        self._subs[q] = max(2, min(60, interval))
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return q
+
+    def unsubscribe(self, q: asyncio.Queue) -> int:
+        self._subs.pop(q, None)
+        if not self._subs and self._task is not None:
+            self._task.cancel()
+            self._task = None
+        return len(self._subs)
+
+    def _publish(self, rows: List[_Event]):
+        for q in list(self._subs):
+            if q.full():
+                # slow client: drop its oldest batch rather than block the poller
+                q.get_nowait()
+            q.put_nowait(rows)
+
+    async def _run(self):
+        while self._subs:
+            try:
+                rows = await self._fetch()
+            except Exception:
+                LOGGER.warning("live poller %s fetch failed", self.key, exc_info=True)
+                rows = []
+
+            fresh = [_Event(r) for r in rows if self._seen.add(_row_key(r))]
+            if fresh:
+                # fetchers may return only deltas, so accumulate the window
+                self._snapshot = (fresh + self._snapshot)[:SNAPSHOT_MAX]
+                self._publish(fresh)
+
+            # stretch the cadence when the upstream's daily budget runs hot
+            upstream = ratelimit.by_name(self.key[0])
+            stretch = upstream.stretch_factor() if upstream else 1.0
+            await asyncio.sleep(min(self._subs.values(), default=60) * stretch)
+
+
+_POLLERS: Dict[tuple, _SharedPoller] = {}
+
+
+def _subscribe(
+    key: tuple,
+    fetch: Callable[[], Awaitable[List[dict]]],
+    interval: int,
+    minutes: int,
+) -> tuple[_SharedPoller, asyncio.Queue]:
+    poller = _POLLERS.get(key)
+    if poller is None:
+        poller = _POLLERS[key] = _SharedPoller(key, fetch)
+    return poller, poller.subscribe(interval, minutes)
+
+
+def _unsubscribe(poller: _SharedPoller, q: asyncio.Queue):
+    if poller.unsubscribe(q) == 0 and _POLLERS.get(poller.key) is poller:
+        del _POLLERS[poller.key]
+
+
+# ---- coalesced one-shot fetches (/news, /dart) ----
+LIVE_TTL_SEC = 5.0
+LIVE_CACHE_MAX = 128
+
+
+class _SingleFlight:
+    """Share one upstream fetch among identical concurrent requests.
+
+    A finished result is served for *ttl* seconds; while a fetch for a key
+    is in flight, further callers await the same task instead of starting
+    their own. The task is shielded, so a client that disconnects does not
+    cancel it for the others. Failed fetches are not cached.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._done: "OrderedDict[tuple, tuple[float, List[dict]]]" = OrderedDict()
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+
+    async def get(
+        self, key: tuple, fetch: Callable[[], Awaitable[List[dict]]]
+    ) -> List[dict]:
+        """Rows for *key* (shared between callers: do not mutate them)."""
+        entry = self._done.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._done.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[1]
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["misses"] += 1
+            task = self._inflight[key] = asyncio.ensure_future(fetch())
+            task.add_done_callback(lambda t: self._finish(key, t))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: tuple, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            self.stats["errors"] += 1
+            return
+        self._done[key] = (time.monotonic() + self.ttl, task.result())
+        self._done.move_to_end(key)
+        while len(self._done) > self.max_entries:
+            self._done.popitem(last=False)
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "entries": len(self._done),
+            "inflight": len(self._inflight),
+            "ttl_sec": self.ttl,
+        }
+
+
+_LIVE = _SingleFlight(LIVE_TTL_SEC, LIVE_CACHE_MAX)
+
+
+def live_cache_stats() -> dict:
+    """Hit / miss / coalesced counters of the /api/live fetch cache."""
+    return _LIVE.snapshot()
+
+
+async def _sse_from_poller(
+    request: Request,
+    key: tuple,
+    fetch: Callable[[], Awaitable[List[dict]]],
+    interval: int,
+    minutes: int,
+    accept: Callable[[dict], bool],
+    fields: Optional[tuple] = None,
+):
+    """Relay batches from the shared poller for *key* to one client as SSE."""
+    poller, q = _subscribe(key, fetch, interval, minutes)
+    try:
+        yield ":connected\n\n"  # onopen 유도
+        while True:
+            try:
+                rows = await asyncio.wait_for(q.get(), timeout=HEARTBEAT_SEC)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ":hb\n\n"
+                continue
+            chunk = b"".join(ev.frame(fields) for ev in rows if accept(ev.row))
+            if chunk:
+                yield chunk
+            if await request.is_disconnected():
+                break
+    except asyncio.CancelledError:
+        pass
+    finally:
+        _unsubscribe(poller, q)
+
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",
+}
 
 
 # ===================== NAVER NEWS =====================
@@ -102,7 +363,10 @@ def _parse_pubdate(s: Optional[str]) -> Optional[dt.datetime]:
 
 
 async def _fetch_naver_once(
-    queries: Iterable[str], display: int = 30, mode: str = "all"
+    queries: Iterable[str],
+    display: int = 30,
+    mode: str = "all",
+    cursors: Optional[Dict[str, NaverCursor]] = None,
 ):
     """Fetch a batch of Naver news results for the given queries.
 
@@ -110,52 +374,59 @@ async def _fetch_naver_once(
         queries: Search keywords to request.
         display: Maximum results per query.
         mode: 'cb' to filter by CB keywords, otherwise 'all'.
+        cursors: Per-query cursors; when given only unseen items are returned.
     """
     cid, csec = settings.NAVER_CLIENT_ID, settings.NAVER_CLIENT_SECRET
     if not cid or not csec:
         return []
 
     headers = {"X-Naver-Client-Id": cid, "X-Naver-Client-Secret": csec}
-    timeout = httpx.Timeout(connect=3.0, read=7.0, write=5.0, pool=5.0)
+    index = await ticker_index_async()
+
+    # all queries in flight at once (capped per host by http_client)
+    results = await asyncio.gather(
+        *(
+            fetch_query(
+                q,
+                headers,
+                display=display,
+                cursor=(
+                    None if cursors is None else cursors.setdefault(q, NaverCursor())
+                ),
+            )
+            for q in queries
+        )
+    )
     out = []
-    async with httpx.AsyncClient(timeout=timeout) as c:
-        for q in queries:
-            try:
-                r = await c.get(
-                    NAVER_URL,
-                    headers=headers,
-                    params={"query": q, "display": display, "sort": "date", "start": 1},
-                )
-                data = r.json()
-            except Exception:
-                data = {}
-
-            for item in data.get("items", []):
-                title = _strip(item.get("title", ""))
-                desc = _strip(item.get("description", ""))
-                link = item.get("link")
-                pub = _parse_pubdate(item.get("pubDate"))  # aware
-                pub_u = _to_utc(pub)  # UTC-aware
-                text = f"{title}\n{desc}"
-
-                if mode == "cb" and not re.search(COMBINED, text, flags=re.I):
-                    continue
-
-                ts = int(pub_u.timestamp() * 1000) if pub_u else None
-                out.append(
-                    {
-                        "source": "naver_news",
-                        "time": pub_u.isoformat() if pub_u else None,
-                        "time_ts": ts,
-                        "type": _classify(text),
-                        "headline": title,
-                        "summary": desc,
-                        "corp": None,
-                        "stock_code": None,
-                        "url": link,
-                        "raw": item,
-                    }
-                )
+    for items in results:
+        for item in items:
+            title = _strip(item.get("title", ""))
+            desc = _strip(item.get("description", ""))
+            link = item.get("link")
+            pub = _parse_pubdate(item.get("pubDate"))  # aware
+            pub_u = _to_utc(pub)  # UTC-aware
+            text = f"{title}\n{desc}"
+
+            if mode == "cb" and not is_cb_event(text):
+                continue
+
+            ts = int(pub_u.timestamp() * 1000) if pub_u else None
+            corp, code, codes = tag_news(index, title, desc)
+            out.append(
+                {
+                    "source": "naver_news",
+                    "time": pub_u.isoformat() if pub_u else None,
+                    "time_ts": ts,
+                    "type": _classify(text),
+                    "headline": title,
+                    "summary": desc,
+                    "corp": corp,
+                    "stock_code": code,
+                    "stock_codes": codes,  # every listed company mentioned
+                    "url": link,
+                    "raw": item,
+                }
+            )
 
     out.sort(
         key=lambda x: _iso_to_utc(x["time"]) or dt.datetime.min.replace(tzinfo=UTC),
@@ -166,12 +437,18 @@ async def _fetch_naver_once(
 
 @router.get("/news")
 async def live_news(
-    q: Optional[str] = None, display: int = 30, minutes: int = 60, mode: str = "auto"
+    request: Request,
+    q: Optional[str] = None,
+    display: int = 30,
+    minutes: int = 60,
+    mode: str = "auto",
+    fields: Optional[str] = None,
 ):
     """
     온디맨드 뉴스 조회.
     mode: 'auto'|'cb'|'all'
       - auto: q 있으면 'all', 없으면 'cb'
+    fields: 쉼표로 구분한 응답 필드 (기본: raw 제외 전체)
     """
     queries = [
         s.strip()
@@ -179,7 +456,11 @@ async def live_news(
         if s.strip()
     ]
     use_mode = "all" if (mode == "auto" and q) else ("cb" if mode == "auto" else mode)
-    rows = await _fetch_naver_once(queries, display=display, mode=use_mode)
+    # minutes only filters below, so requests differing in it share a fetch
+    rows = await _LIVE.get(
+        ("naver", tuple(sorted(set(queries))), use_mode, display),
+        lambda: _fetch_naver_once(queries, display=display, mode=use_mode),
+    )
 
     cutoff = dt.datetime.now(UTC) - dt.timedelta(minutes=minutes)
 
@@ -187,7 +468,7 @@ async def live_news(
         t = _iso_to_utc(r.get("time"))
         return (t is None) or (t >= cutoff)
 
-    return [r for r in rows if ok(r)]
+    return _json_response(request, [r for r in rows if ok(r)], _parse_fields(fields))
 
 
 @router.get("/stream")
@@ -198,55 +479,35 @@ async def news_stream(
     minutes: int = 60,
     display: int = 30,
     mode: str = "auto",
+    fields: Optional[str] = None,
 ):
-    """뉴스 SSE 스트림 (즉시 ping + heartbeat)."""
+    """뉴스 SSE 스트림 (즉시 ping + heartbeat). fields: /news와 동일한 필드 선택."""
     queries = [
         s.strip()
         for s in (q or ",".join(settings.NAVER_NEWS_QUERIES)).split(",")
         if s.strip()
     ]
     use_mode = "all" if (mode == "auto" and q) else ("cb" if mode == "auto" else mode)
-    seen: Set[str] = set()
 
-    def _cutoff():
-        return dt.datetime.now(UTC) - dt.timedelta(minutes=minutes)
+    def accept(r):
+        t = _iso_to_utc(r.get("time"))
+        co = dt.datetime.now(UTC) - dt.timedelta(minutes=minutes)
+        return t is None or t >= co
 
-    async def event_gen():
-        try:
-            yield ":connected\n\n"  # onopen 유도
-            last_hb = time.monotonic()
-            while True:
-                if await request.is_disconnected():
-                    break
-                rows = await _fetch_naver_once(queries, display=display, mode=use_mode)
-                co = _cutoff()
-                sent = False
-                for r in rows:
-                    key = f"{r.get('url')}|{r.get('time')}"
-                    if key in seen:
-                        continue
-                    seen.add(key)
-                    t = _iso_to_utc(r.get("time"))
-                    if t is not None and t < co:
-                        continue
-                    yield f"data: {json.dumps(r, ensure_ascii=False)}\n\n"
-                    sent = True
-                now = time.monotonic()
-                if not sent and now - last_hb > 15:
-                    last_hb = now
-                    yield ":hb\n\n"
-                await asyncio.sleep(max(2, min(60, interval)))
-        except asyncio.CancelledError:
-            pass
+    cursors: Dict[str, NaverCursor] = {}
+
+    async def fetch():
+        return await _fetch_naver_once(
+            queries, display=display, mode=use_mode, cursors=cursors
+        )
 
+    key = ("naver", tuple(queries), use_mode, display)
     return StreamingResponse(
-        event_gen(),
+        _sse_from_poller(
+            request, key, fetch, interval, minutes, accept, _parse_fields(fields)
+        ),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        },
+        headers=SSE_HEADERS,
     )
 
 
@@ -262,6 +523,26 @@ def _parse_rcept_dt(s: Optional[str]) -> Optional[dt.datetime]:
         return None
 
 
+def _dart_days(minutes: int) -> tuple[str, str]:
+    """(bgn_de, end_de) KST dates list.json is queried with for a look-back."""
+    now_kst = dt.datetime.now(KST)
+    start_kst = now_kst - dt.timedelta(minutes=minutes)
+    return start_kst.strftime("%Y%m%d"), now_kst.strftime("%Y%m%d")
+
+
+def _fetch_dart_shared(minutes: int, page_count: int) -> Awaitable[List[dict]]:
+    """_fetch_dart_once through the live cache.
+
+    The upstream query depends only on the date range and page size, so
+    look-backs that span the same days share one fetch.
+    """
+    key = ("dart", *_dart_days(minutes), page_count)
+    return _LIVE.get(
+        key,
+        lambda: _fetch_dart_once(minutes=minutes, page_count=page_count, max_pages=3),
+    )
+
+
 async def _fetch_dart_once(
     minutes: int = 60, page_count: int = 100, max_pages: int = 3
 ):
@@ -276,59 +557,68 @@ async def _fetch_dart_once(
     if not key:
         return []
 
-    now_kst = dt.datetime.now(KST)
-    start_kst = now_kst - dt.timedelta(minutes=minutes)
+    bgn_de, end_de = _dart_days(minutes)
     params_base = {
         "crtfc_key": key,
-        "bgn_de": start_kst.strftime("%Y%m%d"),
-        "end_de": now_kst.strftime("%Y%m%d"),
+        "bgn_de": bgn_de,
+        "end_de": end_de,
         "page_count": page_count,
     }
 
-    timeout = httpx.Timeout(connect=3.0, read=7.0, write=5.0, pool=5.0)
+    # index loaded via the async engine so the event loop never blocks on it
+    index = await ticker_index_async()
     out = []
-    async with httpx.AsyncClient(timeout=timeout) as c:
-        for page_no in range(1, max_pages + 1):
-            params = dict(params_base)
-            params["page_no"] = page_no
-            try:
-                r = await c.get(DART_URL, params=params)
-                data = r.json()
-            except Exception:
-                data = {}
-
-            items = data.get("list", []) or []
-            if not items:
-                break
-
-            for it in items:
-                title = it.get("report_nm") or ""
-                corp = it.get("corp_name")
-                code = _lookup_code(corp)
-                pub = _parse_rcept_dt(it.get("rcept_dt"))  # aware(KST)
-                rcp_no = it.get("rcp_no")
-                url = f"https://dart.fss.or.kr/dsaf001/main.do?rcpNo={rcp_no}"
-                ts = None
-                if pub is not None:
-                    try:
-                        ts = int(pub.astimezone(UTC).timestamp() * 1000)
-                    except Exception:
-                        ts = None
-                out.append(
-                    {
-                        "source": "dart",
-                        "time": pub.isoformat() if pub else None,  # ISO(±tz)
-                        "time_ts": ts,
-                        "type": _classify(title),
-                        "headline": title,
-                        "summary": "",
-                        "corp": corp,
-                        "stock_code": code,
-                        "rcp_no": rcp_no,
-                        "url": url,
-                        "raw": it,
-                    }
-                )
+    for page_no in range(1, max_pages + 1):
+        params = dict(params_base)
+        params["page_no"] = page_no
+        try:
+            r = await http_client.get(DART_URL, params=params)
+            data = r.json()
+            ratelimit.check_dart_status(data)
+        except ratelimit.UpstreamThrottled:
+            LOGGER.info("live DART fetch skipped: upstream throttled")
+            break
+        except Exception:
+            data = {}
+
+        items = data.get("list", []) or []
+        if not items:
+            break
+
+        for it in items:
+            title = it.get("report_nm") or ""
+            corp = it.get("corp_name")
+            # issuer keys first; the name only for items without them
+            if it.get("corp_code") or it.get("stock_code"):
+                code = index.resolve_key(it.get("corp_code"), it.get("stock_code"))
+            else:
+                code = index.exact.get(corp) if corp else None
+            pub = _parse_rcept_dt(it.get("rcept_dt"))  # aware(KST)
+            rcp_no = it.get("rcept_no") or it.get("rcp_no")
+            url = f"https://dart.fss.or.kr/dsaf001/main.do?rcpNo={rcp_no}"
+            ts = None
+            if pub is not None:
+                try:
+                    ts = int(pub.astimezone(UTC).timestamp() * 1000)
+                except Exception:
+                    ts = None
+            out.append(
+                {
+                    "source": "dart",
+                    "time": pub.isoformat() if pub else None,  # ISO(±tz)
+                    "time_ts": ts,
+                    "type": _classify(title),
+                    "headline": title,
+                    "summary": "",
+                    "corp": corp,
+                    "stock_code": code,
+                    "rcp_no": rcp_no,
+                    # list.json dates are YYYYMMDD only (time stays None)
+                    "rcept_dt": it.get("rcept_dt"),
+                    "url": url,
+                    "raw": it,
+                }
+            )
 
     out.sort(
         key=lambda x: _iso_to_utc(x["time"]) or dt.datetime.min.replace(tzinfo=UTC),
@@ -339,30 +629,39 @@ async def _fetch_dart_once(
 
 @router.get("/dart")
 async def live_dart(
-    minutes: int = 60, page_count: int = 100, limit: int = 10, scope: str = "cb"
+    request: Request,
+    minutes: int = 60,
+    page_count: int = 100,
+    limit: int = 10,
+    scope: str = "cb",
+    fields: Optional[str] = None,
 ):
     """Return recent DART disclosures filtered by scope and time window.
 
     Args:
+        request: FastAPI request (Accept-Encoding decides gzip).
         minutes: Look-back window in minutes.
         page_count: Items per page for the DART API.
         limit: Maximum number of rows to return.
         scope: 'cb' to keep CB-related items, 'all' otherwise.
+        fields: Comma-separated fields to return; default all but 'raw'.
     """
-    rows = await _fetch_dart_once(minutes=minutes, page_count=page_count, max_pages=3)
+    rows = await _fetch_dart_shared(minutes, page_count)
     cutoff = dt.datetime.now(UTC) - dt.timedelta(minutes=minutes)
 
     def match_scope(r):
         if scope == "all":
             return True
-        return bool(re.search(COMBINED, r.get("headline") or "", flags=re.I))
+        return is_cb_event(r.get("headline"))
 
     def ok(r):
         t = _iso_to_utc(r.get("time"))
         return ((t is None) or (t >= cutoff)) and match_scope(r)
 
     out = [r for r in rows if ok(r)]
-    return out[: max(1, min(200, limit))]
+    return _json_response(
+        request, out[: max(1, min(200, limit))], _parse_fields(fields)
+    )
 
 
 @router.get("/dart/stream")
@@ -372,6 +671,7 @@ async def dart_stream(
     minutes: int = 60,
     page_count: int = 100,
     scope: str = "cb",
+    fields: Optional[str] = None,
 ):
     """Server-sent events stream of DART disclosures.
 
@@ -381,55 +681,25 @@ async def dart_stream(
         minutes: Look-back window in minutes.
         page_count: Items per page for the DART API.
         scope: 'cb' to keep CB-related items, 'all' otherwise.
+        fields: Comma-separated fields to send; default all but 'raw'.
     """
-    seen: Set[str] = set()
 
-    def _cutoff():
-        return dt.datetime.now(UTC) - dt.timedelta(minutes=minutes)
+    def accept(r):
+        t = _iso_to_utc(r.get("time"))
+        co = dt.datetime.now(UTC) - dt.timedelta(minutes=minutes)
+        return t is None or t >= co
 
-    async def event_gen():
-        try:
-            yield ":connected\n\n"
-            last_hb = time.monotonic()
-            while True:
-                if await request.is_disconnected():
-                    break
-                rows = await _fetch_dart_once(
-                    minutes=minutes, page_count=page_count, max_pages=3
-                )
-                co = _cutoff()
-                sent = False
-                for r in rows:
-                    key = f"{r.get('url')}|{r.get('time')}"
-                    if key in seen:
-                        continue
-                    if scope != "all" and not re.search(
-                        COMBINED, r.get("headline") or "", flags=re.I
-                    ):
-                        continue
-                    t = _iso_to_utc(r.get("time"))
-                    if t is not None and t < co:
-                        continue
-
-                    seen.add(key)
-                    yield f"data: {json.dumps(r, ensure_ascii=False)}\n\n"
-                    sent = True
-
-                now = time.monotonic()
-                if not sent and now - last_hb > 15:
-                    last_hb = now
-                    yield ":hb\n\n"
-
-                await asyncio.sleep(max(2, min(60, interval)))
-        except asyncio.CancelledError:
-            pass
+    async def fetch():
+        rows = await _fetch_dart_shared(minutes, page_count)
+        if scope == "all":
+            return rows
+        return [r for r in rows if is_cb_event(r.get("headline"))]
 
+    key = ("dart", scope, minutes, page_count)
     return StreamingResponse(
-        event_gen(),
+        _sse_from_poller(
+            request, key, fetch, interval, minutes, accept, _parse_fields(fields)
+        ),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        },
+        headers=SSE_HEADERS,
     )
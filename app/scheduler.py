@@ -2,10 +2,15 @@
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR, EVENT_JOB_MISSED
 from .fetch_dart import fetch_dart_today
+from .corp_master import ensure_corp_master, refresh_corp_master
 from .fetch_news_naver import fetch_naver_news
 from .normalizer import normalize_recent
+from .hotfeed import refresh_hot_feed
+from .pipeline import run_pipeline
+from .leader import INGEST, LeaderLock
 from .scorer import init_db_and_seed
-import time, datetime as dt, logging
+from . import ratelimit
+import asyncio, sys, time, datetime as dt, logging
 
 # 🔊 로깅 기본 설정
 logging.basicConfig(
@@ -22,14 +27,38 @@ def _listener(event):
         log.info(f"JOB OK: {event.job_id} (ran at {event.scheduled_run_time})")
 
 
-def main():
-    init_db_and_seed()
+def _budgeted(job, upstream: ratelimit.Upstream):
+    """Skip ticks of a cron job while *upstream* is spending ahead of budget."""
+
+    def run():
+        if upstream.should_skip(job.__name__):
+            log.info(
+                "SKIP: %s (%s budget stretch x%.1f)",
+                job.__name__,
+                upstream.name,
+                upstream.stretch_factor(),
+            )
+            return
+        return job()
+
+    run.__name__ = job.__name__
+    return run
+
+
+LEADER_RETRY_SEC = 15
+LEADER_CHECK_SEC = 5
+
+
+def _build_scheduler() -> BackgroundScheduler:
     sch = BackgroundScheduler(
         timezone="Asia/Seoul", job_defaults={"coalesce": True, "max_instances": 1}
     )
     sch.add_listener(_listener, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED)
 
     # 👇 시작 즉시 1회 실행(시작 확인용)
+    sch.add_job(
+        ensure_corp_master, "date", next_run_time=dt.datetime.now(), id="corp_once"
+    )
     sch.add_job(
         fetch_dart_today, "date", next_run_time=dt.datetime.now(), id="dart_once"
     )
@@ -39,20 +68,80 @@ def main():
     sch.add_job(
         normalize_recent, "date", next_run_time=dt.datetime.now(), id="norm_once"
     )
+    sch.add_job(
+        refresh_hot_feed, "date", next_run_time=dt.datetime.now(), id="hot_once"
+    )
 
     # ⏱ 주기 작업
-    sch.add_job(fetch_dart_today, "cron", minute="*/5", id="dart_5m")
-    sch.add_job(fetch_naver_news, "cron", minute="*/4", id="naver_4m")
+    sch.add_job(
+        _budgeted(fetch_dart_today, ratelimit.DART), "cron", minute="*/5", id="dart_5m"
+    )
+    sch.add_job(
+        _budgeted(fetch_naver_news, ratelimit.NAVER),
+        "cron",
+        minute="*/4",
+        id="naver_4m",
+    )
     sch.add_job(normalize_recent, "cron", minute="*/5", id="norm_5m")
+    # DART 고유번호(corpCode.xml) 마스터: 하루 1회 갱신
+    sch.add_job(refresh_corp_master, "cron", hour=6, minute=10, id="corp_daily")
+    # 점수 감쇠 반영 (hot_feed 재계산)
+    sch.add_job(refresh_hot_feed, "cron", minute="*", id="hot_1m")
+    return sch
 
+
+def _run_scheduler(lock: LeaderLock):
+    sch = _build_scheduler()
     sch.start()
     log.info("Scheduler started. Jobs: %s", [j.id for j in sch.get_jobs()])
+    try:
+        while lock.is_held():
+            time.sleep(LEADER_CHECK_SEC)
+        log.error("Lost ingest leadership; stopping jobs")
+    finally:
+        sch.shutdown()
+
+
+async def _run_pipeline(lock: LeaderLock):
+    task = asyncio.create_task(run_pipeline())
+    while not task.done():
+        await asyncio.sleep(LEADER_CHECK_SEC)
+        if not task.done() and not await asyncio.to_thread(lock.is_held):
+            log.error("Lost ingest leadership; stopping pipeline")
+            task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+def main():
+    init_db_and_seed()
+    pipeline = "--pipeline" in sys.argv[1:]
+    # 여러 프로세스가 떠 있어도 수집은 리더 1곳만 (나머지는 대기)
+    lock = LeaderLock(INGEST)
+    standing_by = False
     try:
         while True:
-            time.sleep(5)
+            if not lock.try_acquire():
+                if not standing_by:
+                    log.info("Another process is the ingest leader; standing by")
+                    standing_by = True
+                time.sleep(LEADER_RETRY_SEC)
+                continue
+            standing_by = False
+            log.info("Acquired ingest leadership")
+            if pipeline:
+                # 수집 → 큐 → 즉시 정규화 (cron 대신 단일 async 파이프라인)
+                log.info("Starting ingest pipeline")
+                asyncio.run(_run_pipeline(lock))
+            else:
+                _run_scheduler(lock)
+            lock.release()
     except KeyboardInterrupt:
-        log.info("Shutting down scheduler...")
-        sch.shutdown()
+        log.info("Shutting down...")
+    finally:
+        lock.release()
 
 
 if __name__ == "__main__":
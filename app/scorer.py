@@ -1,11 +1,16 @@
 from sqlalchemy import select, desc
-from .db import SessionLocal, engine
+from . import dataversion
+from .db import AsyncSessionLocal, SessionLocal, engine
 from .models import Base, NormEvent, DimListing
+from .match_ticker import invalidate_ticker_index
+from .migrate import upgrade_schema
+from .hotfeed import read_hot_feed, read_hot_feed_async
 import datetime as dt, csv, os
 
 
 def init_db_and_seed():
     Base.metadata.create_all(engine)
+    upgrade_schema(engine)
     path = os.path.join(
         os.path.dirname(os.path.dirname(__file__)), "data", "dim_listing_sample.csv"
     )
@@ -20,34 +25,55 @@ def init_db_and_seed():
                             stock_code=row["stock_code"],
                             corp_name_kr=row["corp_name_kr"],
                             market=row.get("market"),
+                            aliases=row.get("aliases") or None,
                         )
                     )
+            dataversion.bump(s, dataversion.LISTING_KEY)
             s.commit()
+            invalidate_ticker_index()
+
+
+def _top_stmt(limit):
+    return (
+        select(NormEvent)
+        .order_by(
+            desc(NormEvent.score),
+            desc(NormEvent.event_time),
+            desc(NormEvent.created_at),
+        )
+        .limit(limit)
+    )
+
+
+def _top_rows(rows):
+    return [
+        {
+            "time": str(r.event_time or r.created_at),
+            "stock_code": r.stock_code,
+            "corp": r.corp_name_kr,
+            "type": r.event_type,
+            "headline": r.headline,
+            "score": float(r.score) if r.score is not None else None,
+        }
+        for r in rows
+    ]
+
+
+def _without_url(hot):
+    return [{k: v for k, v in r.items() if k != "url"} for r in hot]
 
 
 def top_today(limit=10):
+    hot = read_hot_feed(limit)
+    if hot is not None:
+        return _without_url(hot)
     with SessionLocal() as s:
-        rows = (
-            s.execute(
-                select(NormEvent)
-                .order_by(
-                    desc(NormEvent.score),
-                    desc(NormEvent.event_time),
-                    desc(NormEvent.created_at),
-                )
-                .limit(limit)
-            )
-            .scalars()
-            .all()
-        )
-        return [
-            {
-                "time": str(r.event_time or r.created_at),
-                "stock_code": r.stock_code,
-                "corp": r.corp_name_kr,
-                "type": r.event_type,
-                "headline": r.headline,
-                "score": float(r.score) if r.score is not None else None,
-            }
-            for r in rows
-        ]
+        return _top_rows(s.execute(_top_stmt(limit)).scalars().all())
+
+
+async def top_today_async(limit=10):
+    hot = await read_hot_feed_async(limit)
+    if hot is not None:
+        return _without_url(hot)
+    async with AsyncSessionLocal() as s:
+        return _top_rows((await s.execute(_top_stmt(limit))).scalars().all())
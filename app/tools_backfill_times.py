@@ -1,59 +1,165 @@
 """원본 시간으로 과거 데이터 보정 스크립트
 사용법:
-    python -m app.tools_backfill_times
+    python -m app.tools_backfill_times [--chunk 5000] [--restart]
+
+시간이 비어 있는 행만 id 순서(keyset)로 chunk 단위로 읽고, chunk마다 커밋하며
+진행 위치를 ingest_state에 저장합니다. 중단 후 다시 실행하면 이어서 진행하고
+(--restart로 처음부터), 끝까지 완료하면 체크포인트를 지웁니다.
 """
 
+import argparse
 import datetime as dt
-from email.utils import parsedate_to_datetime
-from sqlalchemy import select
+import logging
+import time
+
+from sqlalchemy import delete, func, select, update
+
 from .db import SessionLocal
-from .models import RawEvent, NormEvent
+from .fetch_dart import _parse_receipt_datetime
+from .fetch_news_naver import _parse_pubdate
+from .ingest import as_utc
+from .models import IngestState, NormEvent, RawEvent
+
+LOGGER = logging.getLogger("cb.backfill")
+
+CHUNK = 5000
+RAW_CHECKPOINT = "backfill.raw_id"
+NORM_CHECKPOINT = "backfill.norm_event_id"
+
+
+def _published_at(source, raw_json):
+    if not raw_json:
+        return None
+    if source == "naver_news":  # NAVER: pubDate
+        return as_utc(_parse_pubdate(raw_json.get("pubDate")))
+    if source == "dart":  # DART: rcept_dt
+        return as_utc(_parse_receipt_datetime(raw_json.get("rcept_dt")))
+    return None
+
+
+def _checkpoint(s, name, value=None):
+    state = s.get(IngestState, name)
+    if value is None:
+        return state.value if state is not None else 0
+    if state is None:
+        state = IngestState(name=name, value=0)
+        s.add(state)
+    state.value = value
+    state.updated_at = dt.datetime.utcnow()
+
 
+class _Progress:
+    def __init__(self, label):
+        self.label = label
+        self.started = time.monotonic()
+        self.scanned = 0
+        self.fixed = 0
 
-def run():
-    fixed_raw, fixed_norm = 0, 0
+    def step(self, scanned, fixed, position):
+        self.scanned += scanned
+        self.fixed += fixed
+        elapsed = time.monotonic() - self.started
+        LOGGER.info(
+            "%s: scanned=%d fixed=%d at id=%d (%.0f rows/s)",
+            self.label,
+            self.scanned,
+            self.fixed,
+            position,
+            self.scanned / elapsed if elapsed else 0.0,
+        )
+
+
+def backfill_raw(chunk=CHUNK):
+    """RawEvent.published_at from raw_json, for rows where it is NULL."""
+    progress = _Progress("raw")
     with SessionLocal() as s:
-        raws = s.execute(select(RawEvent)).scalars().all()
-        for r in raws:
-            # NAVER: pubDate
-            if r.source == "naver_news" and r.raw_json and not r.published_at:
-                pub = r.raw_json.get("pubDate")
-                if pub:
-                    try:
-                        r.published_at = parsedate_to_datetime(pub)
-                        fixed_raw += 1
-                    except Exception:
-                        pass
-            # DART: rcept_dt
-            if r.source == "dart" and r.raw_json and not r.published_at:
-                s2 = r.raw_json.get("rcept_dt")
-                if s2 and len(s2) == 14:
-                    try:
-                        KST = dt.timezone(dt.timedelta(hours=9))
-                        r.published_at = dt.datetime.strptime(
-                            s2, "%Y%m%d%H%M%S"
-                        ).replace(tzinfo=KST)
-                        fixed_raw += 1
-                    except Exception:
-                        pass
-        s.commit()
+        last_id = _checkpoint(s, RAW_CHECKPOINT)
+    while True:
+        with SessionLocal() as s:
+            rows = s.execute(
+                select(RawEvent.id, RawEvent.source, RawEvent.raw_json)
+                .where(
+                    RawEvent.id > last_id,
+                    RawEvent.published_at.is_(None),
+                    RawEvent.source.in_(("naver_news", "dart")),
+                )
+                .order_by(RawEvent.id)
+                .limit(chunk)
+            ).all()
+            if not rows:
+                break
+            params = []
+            for r in rows:
+                published_at = _published_at(r.source, r.raw_json)
+                if published_at is not None:
+                    params.append({"id": r.id, "published_at": published_at})
+            if params:
+                s.execute(update(RawEvent), params)  # executemany by primary key
+            last_id = rows[-1].id
+            _checkpoint(s, RAW_CHECKPOINT, last_id)
+            s.commit()
+        progress.step(len(rows), len(params), last_id)
+    return progress.fixed
+
+
+def backfill_norm(chunk=CHUNK):
+    """NormEvent.event_time from its source RawEvent, one id range at a time."""
+    progress = _Progress("norm")
+    with SessionLocal() as s:
+        last_id = _checkpoint(s, NORM_CHECKPOINT)
+        max_id = s.execute(select(func.max(NormEvent.event_id))).scalar() or 0
+    while last_id < max_id:
+        upper = min(last_id + chunk, max_id)
+        with SessionLocal() as s:
+            # UPDATE norm_events SET event_time = raw_events.published_at
+            # FROM raw_events WHERE ... (multi-table UPDATE on MySQL)
+            result = s.execute(
+                update(NormEvent)
+                .where(
+                    NormEvent.event_id > last_id,
+                    NormEvent.event_id <= upper,
+                    NormEvent.event_time.is_(None),
+                    NormEvent.raw_id == RawEvent.id,
+                    RawEvent.published_at.is_not(None),
+                )
+                .values(event_time=RawEvent.published_at)
+                .execution_options(synchronize_session=False)
+            )
+            _checkpoint(s, NORM_CHECKPOINT, upper)
+            s.commit()
+        progress.step(upper - last_id, result.rowcount, upper)
+        last_id = upper
+    return progress.fixed
+
 
-        # NormEvent.event_time 보정 (ref_raw_ids = RawEvent.id)
-        norms = s.execute(select(NormEvent)).scalars().all()
-        for n in norms:
-            try:
-                rid = int((n.ref_raw_ids or "").split(",")[0])
-            except Exception:
-                continue
-            raw = s.execute(
-                select(RawEvent).where(RawEvent.id == rid)
-            ).scalar_one_or_none()
-            if raw and raw.published_at and not n.event_time:
-                n.event_time = raw.published_at
-                fixed_norm += 1
+def _clear_checkpoints():
+    with SessionLocal() as s:
+        s.execute(
+            delete(IngestState).where(
+                IngestState.name.in_((RAW_CHECKPOINT, NORM_CHECKPOINT))
+            )
+        )
         s.commit()
+
+
+def run(chunk=CHUNK, restart=False):
+    if restart:
+        _clear_checkpoints()
+    fixed_raw = backfill_raw(chunk)
+    # NormEvent.event_time 보정 (NormEvent.raw_id -> RawEvent)
+    fixed_norm = backfill_norm(chunk)
+    # 완료: 다음 실행은 처음부터
+    _clear_checkpoints()
     print(f"backfill done: raw={fixed_raw}, norm={fixed_norm}")
 
 
 if __name__ == "__main__":
-    run()
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
+    )
+    ap = argparse.ArgumentParser(description="원본 시간으로 과거 데이터 보정")
+    ap.add_argument("--chunk", type=int, default=CHUNK)
+    ap.add_argument("--restart", action="store_true", help="체크포인트 무시")
+    args = ap.parse_args()
+    run(args.chunk, args.restart)
@@ -0,0 +1,114 @@
+"""키워드 매칭 벤치마크: 기존 re.search(COMBINED) vs is_cb_event / scan_keywords
+사용법:
+    python -m app.tools_bench_keywords [--items 20000] [--repeat 5]
+
+뉴스 제목+요약, DART 보고서명 형태의 합성 코퍼스로 항목당 매칭 시간(µs)을
+출력하고, 두 방식의 판정이 모두 같은지 확인합니다. 네트워크는 쓰지 않습니다.
+"""
+
+import argparse
+import random
+import re
+import time
+
+from .keywords import COMBINED, is_cb_event, scan_keywords
+
+HEADLINES = [
+    "{corp}, {amount}억원 규모 전환사채 발행 결정",
+    "{corp}, 제{n}회차 CB 전환가액 {price}원으로 조정",
+    "[공시] {corp}, 전환사채 전환청구권 행사… 신주 {n}만주 상장",
+    "{corp}, 교환사채(EB) {amount}억 발행결정… 자사주 교환 대상",
+    "{corp} BW 리픽싱에 주가 희석 우려",
+    "{corp}, 전환사채 조기상환청구(풋옵션) {amount}억원 접수",
+    "{corp}, 신주인수권부사채 콜옵션 행사로 {amount}억 취득",
+    "{corp}, {amount}억원 규모 유상증자 결정",
+    "{corp} 3분기 영업이익 {amount}억…전년比 {n}%↑",
+    "{corp}, 자사주 {n}만주 매입 결정",
+    "코스닥 {corp}, 최대주주 변경 소식에 상한가",
+    "{corp}, 전환사채 만기 앞두고 차환 부담",
+]
+DESCRIPTIONS = [
+    "{corp}는 운영자금 조달을 위해 {amount}억원 규모의 전환사채를 발행한다고 공시했다.",
+    "회사 측은 이번 결정이 재무구조 개선을 위한 것이라고 설명했다.",
+    "업계에서는 CB 물량 부담이 당분간 이어질 것으로 보고 있다. 전환가 재조정 조항도 포함됐다.",
+    "증권가는 {corp}의 실적 개선이 하반기에도 이어질 것으로 전망했다.",
+    "CB BW EB 관련 공시가 잇따르며 투자자 주의가 요구된다. " * 3,
+]
+REPORTS = [
+    "주요사항보고서(전환사채권발행결정)",
+    "전환가액의조정",
+    "전환청구권행사",
+    "주요사항보고서(교환사채권발행결정)",
+    "조기상환청구권행사",
+    "분기보고서 (2026.09)",
+    "임원ㆍ주요주주특정증권등소유상황보고서",
+    "주식등의대량보유상황보고서(일반)",
+]
+
+
+def corpus(n: int, seed: int = 7) -> list[str]:
+    """Texts as the fetchers match them: 'title\\ndescription' or report_nm."""
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        fill = {
+            "corp": f"테스트기업{rnd.randint(0, 999):03d}",
+            "amount": rnd.randint(10, 2000),
+            "price": rnd.randint(500, 90000),
+            "n": rnd.randint(1, 99),
+        }
+        if i % 4 == 3:
+            out.append(rnd.choice(REPORTS))
+        else:
+            title = rnd.choice(HEADLINES).format(**fill)
+            out.append(f"{title}\n{rnd.choice(DESCRIPTIONS).format(**fill)}")
+    return out
+
+
+def _before(texts):
+    # what the fetchers did per item before the matcher module
+    return [bool(re.search(COMBINED, t, flags=re.I)) for t in texts]
+
+
+def _after(texts):
+    return [is_cb_event(t) for t in texts]
+
+
+def _scan(texts):
+    return [scan_keywords(t) for t in texts]
+
+
+def _best_us(fn, texts, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(texts)
+        best = min(best, time.perf_counter() - started)
+    return best / len(texts) * 1e6
+
+
+def run(n_items: int = 20000, repeat: int = 5):
+    texts = corpus(n_items)
+    expected = _before(texts)
+    mismatches = sum(a != b for a, b in zip(expected, _after(texts)))
+    print(
+        f"{n_items} items, {sum(expected)} matched, "
+        f"{mismatches} mismatches between old and new"
+    )
+    before = _best_us(_before, texts, repeat)
+    for label, fn in (
+        ("re.search(COMBINED)", _before),
+        ("is_cb_event", _after),
+        ("scan_keywords (all)", _scan),
+    ):
+        us = before if fn is _before else _best_us(fn, texts, repeat)
+        print(f"{label:>20}: {us:6.2f} us/item (x{before / us:.1f})")
+    return mismatches == 0
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--items", type=int, default=20000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+    raise SystemExit(0 if run(args.items, args.repeat) else 1)
@@ -0,0 +1,219 @@
+"""정규화 벤치마크: 행 단위(기존) vs 배치(normalize_rows) 처리량 비교
+사용법:
+    python -m app.tools_bench_normalize [--rows 100000] [--listings 2000]
+
+임시 SQLite DB에 합성 RawEvent를 적재한 뒤 각 경로로 정규화하고
+rows/sec를 출력합니다. 운영 DB는 건드리지 않습니다.
+- row-by-row: 기존 경로 (행마다 NormEvent 1건)
+- batched:    normalize_rows, 클러스터링 끔 (행마다 NormEvent 1건 — 같은 작업량)
+- clustered:  normalize_rows, 클러스터링 켬 (운영 경로)
+speedup은 같은 작업량끼리(batched / row-by-row) 비교합니다.
+"""
+
+import argparse
+import datetime as dt
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine, delete, func, insert, select, update
+from sqlalchemy.orm import sessionmaker
+
+from .cluster import LshIndex
+from .match_ticker import TickerIndex
+from .models import Base, NormEvent, RawEvent
+from .normalizer import (
+    BATCH_SIZE,
+    RAW_COLUMNS,
+    classify_event,
+    compute_score,
+    normalize_rows,
+)
+
+# (DART report name, news headline template)
+EVENTS = [
+    ("전환사채권발행결정", "{corp}, {amount}억원 규모 전환사채 발행 결정"),
+    ("전환가액의조정", "{corp}, 전환사채 전환가액 {price}원으로 하향 조정"),
+    ("전환청구권행사", "{corp}, {amount}억원 규모 전환청구권 행사"),
+    ("조기상환청구권행사", "{corp}, {amount}억원 규모 전환사채 조기상환 청구"),
+]
+DECORATIONS = ["{}", "[속보] {}", "{}(종합)", "{} …", "[마켓] {}"]
+
+
+def _synthetic(n_rows: int, n_listings: int, seed: int = 7):
+    """One DART filing plus 0-20 syndicated articles per real-world event."""
+    rnd = random.Random(seed)
+    listings = [(f"테스트기업{i:05d}", f"{i:06d}") for i in range(n_listings)]
+    now = dt.datetime.utcnow()
+    raws = []
+    while len(raws) < n_rows:
+        corp, code = rnd.choice(listings)
+        report_nm, template = rnd.choice(EVENTS)
+        headline = template.format(
+            corp=corp, amount=rnd.randint(10, 2000), price=rnd.randint(500, 90000)
+        )
+        t = now - dt.timedelta(seconds=len(raws) * 3)
+        name, keys = corp, (f"9{code}", code)  # (corp_code, stock_code)
+        roll = rnd.random()
+        if roll < 0.1:
+            name = f"(주){corp}"  # normalized-name hit
+        elif roll < 0.15:
+            name, keys = f"{corp}홀딩스", (f"8{code}", None)  # unlisted filer
+        rows = [("dart", report_nm, name, None, keys)]
+        rows += [
+            (
+                "naver_news",
+                rnd.choice(DECORATIONS).format(headline),
+                corp,  # tagged at ingest (app.company_tagger)
+                headline,
+                (None, None),
+            )
+            for _ in range(rnd.randint(0, 20))
+        ]
+        rnd.shuffle(rows)
+        for source, title, corp_name, content, (corp_code, stock_code) in rows:
+            i = len(raws)
+            raws.append(
+                {
+                    "source": source,
+                    "url": f"https://example.com/{i}",
+                    "title": title,
+                    "content": content,
+                    "corp_name_kr": corp_name,
+                    "corp_code": corp_code,
+                    "stock_code": stock_code,
+                    "published_at": t,
+                    "inserted_at": now,
+                    "dedup_key": f"bench:{i}",
+                }
+            )
+    return listings, raws[:n_rows]
+
+
+def _rowwise(s, raws, index: TickerIndex):
+    """The previous per-row path: classify, name-match and s.add one at a time.
+
+    Matching uses the same in-memory index, so the comparison measures the
+    per-row Python/ORM overhead rather than listing reloads. The batched
+    path resolves DART rows by issuer key instead.
+    """
+    now = dt.datetime.utcnow()
+    for r in raws:
+        code = None
+        if r.corp_name_kr:
+            code = index.lookup(r.corp_name_kr) or index.fuzzy(r.corp_name_kr)
+        et = classify_event(f"{r.title or ''} {r.content or ''}")
+        is_official = r.source == "dart"
+        s.add(
+            NormEvent(
+                raw_id=r.id,
+                ref_raw_ids=str(r.id),
+                created_at=now,
+                stock_code=code,
+                corp_name_kr=r.corp_name_kr,
+                event_type=et,
+                headline=r.title,
+                summary=(r.content or "")[:500],
+                score=compute_score(is_official, et, 0),
+                has_official=is_official,
+                event_time=r.published_at,
+            )
+        )
+
+
+class _NoClustering(LshIndex):
+    """Index that never matches: one NormEvent per row, like row-by-row."""
+
+    def probe(self, sig, bucket, t):
+        return None
+
+    def probe_official(self, code, event_type, t):
+        return None
+
+    def probe_filed(self, code, event_type, t):
+        return None
+
+    def add(self, c):
+        pass
+
+
+def _batched(lsh: LshIndex):
+    # one index across the run, as in production
+
+    def run(s, raws, index: TickerIndex):
+        normalize_rows(s, raws, index, lsh=lsh)
+
+    return run
+
+
+def _time(Session, path, index) -> tuple[int, float]:
+    with Session() as s:
+        s.execute(delete(NormEvent))
+        s.commit()
+    total, elapsed, last_id = 0, 0.0, 0
+    with Session() as s:
+        while True:
+            raws = s.execute(
+                select(*RAW_COLUMNS)
+                .where(RawEvent.id > last_id)
+                .order_by(RawEvent.id)
+                .limit(BATCH_SIZE)
+            ).all()
+            if not raws:
+                break
+            started = time.perf_counter()
+            path(s, raws, index)
+            s.commit()
+            elapsed += time.perf_counter() - started
+            total += len(raws)
+            last_id = raws[-1].id
+        events = s.execute(select(func.count(NormEvent.event_id))).scalar()
+    return total, elapsed, events
+
+
+def run(n_rows: int = 100_000, n_listings: int = 2000):
+    listings, raws = _synthetic(n_rows, n_listings)
+    index = TickerIndex(listings, version=1)
+
+    fd, path = tempfile.mkstemp(suffix=".db", prefix="cb_bench_")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", future=True)
+    try:
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine, future=True)
+        with Session() as s:
+            for i in range(0, len(raws), 1000):
+                s.execute(insert(RawEvent), raws[i : i + 1000])
+            s.commit()
+
+        results = {}
+        paths = (
+            ("row-by-row", _rowwise),
+            ("batched", _batched(_NoClustering())),
+            ("clustered", _batched(LshIndex())),
+        )
+        for name, fn in paths:
+            with Session() as s:
+                s.execute(update(RawEvent).values(norm_event_id=None))
+                s.commit()
+            total, elapsed, events = _time(Session, fn, index)
+            results[name] = total / elapsed if elapsed else float("inf")
+            print(
+                f"{name:>10}: {total} rows in {elapsed:.2f}s "
+                f"({results[name]:,.0f} rows/s, {events} events)"
+            )
+        # same work (one event per row) on both sides of the ratio
+        print(f"speedup: x{results['batched'] / results['row-by-row']:.1f}")
+        print(f"clustered vs batched: x{results['clustered'] / results['batched']:.2f}")
+    finally:
+        engine.dispose()
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--listings", type=int, default=2000)
+    args = ap.parse_args()
+    run(args.rows, args.listings)
@@ -0,0 +1,194 @@
+"""수집 사이클 벤치마크: 쿼리 수에 따른 Naver/DART 한 사이클 지연 시간
+사용법:
+    python -m app.tools_bench_pipeline [--latency-ms 80] [--queries 1,2,5,10,20] [--repeat 5]
+
+로컬 가짜 Naver 검색/DART list.json 서버(요청마다 --latency-ms 지연)를 띄우고
+- sequential: 기존 방식 (쿼리마다 새 클라이언트로 순차 요청)
+- concurrent: fetch_naver_rows (공유 클라이언트 + 동시 요청)
+의 사이클 지연(중앙값)과, DART 페이지 수별 fetch_dart_rows 지연을 출력합니다.
+실제 업스트림이나 DB는 호출하지 않습니다.
+"""
+
+import argparse
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+
+from . import fetch_dart, fetch_news_naver, http_client
+from .config import settings
+
+NAVER_PATH = "/v1/search/news.json"
+DART_PATH = "/api/list.json"
+
+
+class _FakeUpstream(BaseHTTPRequestHandler):
+    """Answers like Naver search / DART list.json after a fixed delay."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, as the real upstreams
+    latency = 0.08
+    dart_pages = 1
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        url = urlsplit(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path == NAVER_PATH:
+            body = self._naver(params)
+        elif url.path == DART_PATH:
+            body = self._dart(params)
+        else:
+            self.send_error(404)
+            return
+        data = json.dumps(body, ensure_ascii=False).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    @staticmethod
+    def _naver(params: dict) -> dict:
+        query = params.get("query", "")
+        start, display = int(params.get("start", 1)), int(params.get("display", 10))
+        items = [
+            {
+                "title": f"<b>테스트기업{n % 97:02d}</b>, {query} 관련 전환사채 발행 결정",
+                "originallink": f"https://news.example.com/{query}/{n}",
+                "link": f"https://n.news.naver.com/mnews/article/{abs(hash(query)) % 1000:03d}/{n:010d}",
+                "description": f"테스트기업{n % 97:02d}는 전환사채 발행을 결정했다.",
+                "pubDate": "Sat, 17 Oct 2026 10:23:45 +0900",
+            }
+            for n in range(start, start + display)
+        ]
+        return {"total": 1000, "start": start, "display": display, "items": items}
+
+    @classmethod
+    def _dart(cls, params: dict) -> dict:
+        page_no, page_count = int(params.get("page_no", 1)), int(params["page_count"])
+        first = cls.dart_pages * page_count - (page_no - 1) * page_count
+        items = [
+            {
+                "corp_code": f"{n:08d}",
+                "corp_name": f"테스트기업{n % 97:02d}",
+                "stock_code": f"{n % 97:06d}",
+                "corp_cls": "K",
+                "report_nm": (
+                    "주요사항보고서(전환사채권발행결정)" if n % 5 == 0 else "분기보고서"
+                ),
+                "rcept_no": f"{params['bgn_de']}80{n:04d}",
+                "flr_nm": "x",
+                "rcept_dt": params["bgn_de"],
+                "rm": "",
+            }
+            for n in range(first, first - page_count, -1)
+        ]
+        return {
+            "status": "000",
+            "page_no": page_no,
+            "total_page": cls.dart_pages,
+            "list": items,
+        }
+
+
+async def _sequential(url: str, queries: list[str], headers: dict) -> int:
+    """Previous Naver poll: one fresh client and round trip per query, in turn."""
+    n = 0
+    for q in queries:
+        async with httpx.AsyncClient(timeout=http_client.TIMEOUT) as client:
+            r = await client.get(
+                url,
+                headers=headers,
+                params={
+                    "query": q,
+                    "display": fetch_news_naver.NAVER_DISPLAY,
+                    "sort": "date",
+                    "start": 1,
+                },
+            )
+            n += len(r.json().get("items", []))
+    return n
+
+
+async def _concurrent(queries: list[str]) -> int:
+    fetch_news_naver._CURSORS.clear()  # every query starts cold: one page each
+    return len(await fetch_news_naver.fetch_naver_rows(queries))
+
+
+async def _dart_cycle() -> int:
+    fetch_dart._SEEN = fetch_dart.SeenReceipts()
+    rows, _ = await fetch_dart.fetch_dart_rows({})
+    return len(rows)
+
+
+def _median_ms(make, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        http_client.run(make())
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def run(latency_ms: int = 80, counts=(1, 2, 5, 10, 20), repeat: int = 5):
+    _FakeUpstream.latency = latency_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeUpstream)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    saved = (
+        fetch_news_naver.NAVER_URL,
+        fetch_dart.DART_URL,
+        settings.NAVER_CLIENT_ID,
+        settings.NAVER_CLIENT_SECRET,
+        settings.DART_API_KEY,
+    )
+    fetch_news_naver.NAVER_URL = base + NAVER_PATH
+    fetch_dart.DART_URL = base + DART_PATH
+    settings.NAVER_CLIENT_ID = settings.NAVER_CLIENT_SECRET = "bench"
+    settings.DART_API_KEY = "bench"
+    headers = {"X-Naver-Client-Id": "bench", "X-Naver-Client-Secret": "bench"}
+    try:
+        http_client.run(_concurrent(["warmup"]))  # open the pooled connections
+        print(f"fake upstream latency {latency_ms} ms, median of {repeat}")
+        print(f"{'queries':>8} {'sequential':>12} {'concurrent':>12} {'speedup':>8}")
+        for n in counts:
+            queries = [f"q{i}" for i in range(n)]
+            seq = _median_ms(
+                lambda: _sequential(fetch_news_naver.NAVER_URL, queries, headers),
+                repeat,
+            )
+            conc = _median_ms(lambda: _concurrent(queries), repeat)
+            print(f"{n:>8} {seq:>10.0f}ms {conc:>10.0f}ms {seq / conc:>7.1f}x")
+
+        print(f"{'DART pages':>10} {'cycle':>10}")
+        for pages in (1, 4, 8):
+            _FakeUpstream.dart_pages = pages
+            ms = _median_ms(_dart_cycle, repeat)
+            print(f"{pages:>10} {ms:>8.0f}ms")
+    finally:
+        (
+            fetch_news_naver.NAVER_URL,
+            fetch_dart.DART_URL,
+            settings.NAVER_CLIENT_ID,
+            settings.NAVER_CLIENT_SECRET,
+            settings.DART_API_KEY,
+        ) = saved
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--latency-ms", type=int, default=80)
+    ap.add_argument("--queries", default="1,2,5,10,20")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+    run(args.latency_ms, [int(x) for x in args.queries.split(",")], args.repeat)
@@ -0,0 +1,139 @@
+"""SSE 페이로드 벤치마크: 기존(클라이언트마다 json.dumps, raw 포함) vs 공유 프레임
+사용법:
+    python -m app.tools_bench_sse [--events 5000] [--clients 50]
+
+합성 뉴스/공시 행으로 이벤트당 바이트 수와 1,000 이벤트당 CPU 시간을 출력합니다.
+네트워크나 업스트림은 호출하지 않습니다.
+"""
+
+import argparse
+import gzip
+import json
+import random
+import time
+
+from .realtime import _Event, _dumps, _parse_fields, _project
+
+DASHBOARD_FIELDS = "time,type,corp,stock_code,headline,url,rcp_no,rcept_dt"
+
+
+def _synthetic(n: int, seed: int = 7) -> list[dict]:
+    """Rows shaped like _fetch_naver_once / _fetch_dart_once output."""
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(n):
+        corp = f"테스트기업{rnd.randint(0, 1999):04d}"
+        if i % 2:
+            title = f"{corp}, {rnd.randint(10, 900)}억원 규모 전환사채 발행 결정"
+            desc = f"{corp}는 운영자금 조달을 위해 전환사채를 발행한다고 공시했다. " * 2
+            link = f"https://n.news.naver.com/mnews/article/{i:03d}/{i:010d}"
+            rows.append(
+                {
+                    "source": "naver_news",
+                    "time": "2026-10-17T01:23:45+00:00",
+                    "time_ts": 1792200225000,
+                    "type": "ISSUE",
+                    "headline": title,
+                    "summary": desc,
+                    "corp": corp,
+                    "stock_code": f"{i % 2000:06d}",
+                    "stock_codes": [f"{i % 2000:06d}"],
+                    "url": link,
+                    "raw": {
+                        "title": f"<b>{title}</b>",
+                        "originallink": f"https://www.example-news.co.kr/{i}",
+                        "link": link,
+                        "description": f"<b>{desc}</b>",
+                        "pubDate": "Sat, 17 Oct 2026 10:23:45 +0900",
+                    },
+                }
+            )
+        else:
+            rcept_no = f"20261017{i:06d}"
+            rows.append(
+                {
+                    "source": "dart",
+                    "time": None,
+                    "time_ts": None,
+                    "type": "ISSUE",
+                    "headline": "주요사항보고서(전환사채권발행결정)",
+                    "summary": "",
+                    "corp": corp,
+                    "stock_code": f"{i % 2000:06d}",
+                    "rcp_no": rcept_no,
+                    "rcept_dt": "20261017",
+                    "url": f"https://dart.fss.or.kr/dsaf001/main.do?rcpNo={rcept_no}",
+                    "raw": {
+                        "corp_code": f"{i:08d}",
+                        "corp_name": corp,
+                        "stock_code": f"{i % 2000:06d}",
+                        "corp_cls": "K",
+                        "report_nm": "주요사항보고서(전환사채권발행결정)",
+                        "rcept_no": rcept_no,
+                        "flr_nm": corp,
+                        "rcept_dt": "20261017",
+                        "rm": "",
+                    },
+                }
+            )
+    return rows
+
+
+def _before(rows, clients):
+    """Previous relay: every client json.dumps every row, raw included."""
+    out = 0
+    for _ in range(clients):
+        for r in rows:
+            out += len(f"data: {json.dumps(r, ensure_ascii=False)}\n\n".encode())
+    return out
+
+
+def _after(rows, clients, fields):
+    events = [_Event(r) for r in rows]  # the shared poller wraps each row once
+    out = 0
+    for _ in range(clients):
+        out += len(b"".join(ev.frame(fields) for ev in events))
+    return out
+
+
+def _measure(fn, rows, clients, *args):
+    started = time.process_time()
+    total = fn(rows, clients, *args)
+    cpu = time.process_time() - started
+    return total / (len(rows) * clients), cpu * 1000 / len(rows) * 1000
+
+
+def run(n_events: int = 5000, clients: int = 50):
+    rows = _synthetic(n_events)
+    cases = [
+        ("before (raw, per client)", _before, ()),
+        ("after (default, shared)", _after, (None,)),
+        ("after (dashboard fields)", _after, (_parse_fields(DASHBOARD_FIELDS),)),
+    ]
+    print(f"{n_events} events x {clients} clients")
+    for label, fn, args in cases:
+        per_event, cpu = _measure(fn, rows, clients, *args)
+        one, cpu_one = _measure(fn, rows, 1, *args)
+        print(
+            f"{label:>26}: {per_event:,.0f} B/event, "
+            f"CPU {cpu_one:,.1f} ms/1k events (1 client), "
+            f"{cpu:,.1f} ms/1k events ({clients} clients)"
+        )
+
+    for label, fields in (("raw", ()), ("dashboard", DASHBOARD_FIELDS)):
+        if fields == ():
+            body = json.dumps(rows[:100], ensure_ascii=False).encode()
+        else:
+            body = _dumps([_project(r, _parse_fields(fields)) for r in rows[:100]])
+        print(
+            f"/api/live JSON, 100 rows, {label:>9}: {len(body):,} B, "
+            f"gzip {len(gzip.compress(body, compresslevel=5)):,} B"
+        )
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--events", type=int, default=5000)
+    ap.add_argument("--clients", type=int, default=50)
+    args = ap.parse_args()
+    run(args.events, args.clients)
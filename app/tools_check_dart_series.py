@@ -0,0 +1,153 @@
+"""DART 접수처 시리즈 점검: KRX(80)/FSS(00) 번호가 섞여도 새 공시를 놓치지 않는지 확인
+사용법:
+    python -m app.tools_check_dart_series [--krx 150] [--page-count 100]
+
+가짜 list.json(접수번호 내림차순, 페이지당 --page-count건)과 임시 SQLite DB로
+load_cursor -> fetch_dart_rows -> store_dart_rows 한 사이클을 반복하며
+- 두 시리즈가 함께 있을 때 양쪽의 새 공시가 모두 잡히는지
+- KRX 공시만 --krx건 쌓인 뒤 (한 페이지를 넘게) 들어온 첫 FSS 공시가 잡히는지
+- 새 공시가 없으면 아무것도 다시 보내지 않는지 (재시작 포함)
+를 검사합니다. 실패하면 종료 코드 1. 실제 DART API나 운영 DB는 쓰지 않습니다.
+"""
+
+import argparse
+import os
+import tempfile
+
+from sqlalchemy import create_engine
+
+from . import fetch_dart, http_client
+from .config import settings
+from .db import SessionLocal
+from .models import Base
+
+CB_REPORT = "주요사항보고서(전환사채권발행결정)"
+
+
+class _Listing:
+    """list.json over an in-memory set of filings, newest receipt first."""
+
+    def __init__(self, page_count: int):
+        self.page_count = page_count
+        self.items: list[dict] = []
+
+    def add(self, office: str, serial: int, cb: bool = True):
+        self.items.append(
+            {
+                "corp_code": f"{serial:08d}",
+                "corp_name": f"테스트기업{serial % 97:02d}",
+                "stock_code": f"{serial % 97:06d}",
+                "report_nm": CB_REPORT if cb else "분기보고서",
+                "rcept_no": f"{fetch_dart._today()}{office}{serial:04d}",
+                "rcept_dt": fetch_dart._today(),
+            }
+        )
+
+    async def get_page(self, params: dict, page_no: int) -> dict:
+        ordered = sorted(self.items, key=lambda it: it["rcept_no"], reverse=True)
+        n = self.page_count
+        return {
+            "status": "000",
+            "page_no": page_no,
+            "total_page": max(1, -(-len(ordered) // n)),
+            "list": ordered[(page_no - 1) * n : page_no * n],
+        }
+
+
+def _poll() -> list[str]:
+    """One fetch_dart_today cycle; the receipt numbers it stored."""
+    cursor = fetch_dart.load_cursor()
+    rows, heads = http_client.run(fetch_dart.fetch_dart_rows(cursor))
+    inserted = fetch_dart.store_dart_rows(rows, heads)
+    return sorted(r["raw_json"]["rcept_no"] for r in inserted)
+
+
+def _check(label, ok, detail) -> bool:
+    print(f"{'PASS' if ok else 'FAIL'} {label}: {detail}")
+    return ok
+
+
+def _expect(label, got: list[str], *want: str) -> bool:
+    suffixes = sorted(no[8:] for no in got)
+    return _check(label, suffixes == sorted(want), f"new {suffixes or '[]'}")
+
+
+def run(n_krx: int = 150, page_count: int = 100) -> bool:
+    fd, path = tempfile.mkstemp(suffix=".db", prefix="cb_check_")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", future=True)
+    bind = SessionLocal.kw["bind"]
+    SessionLocal.configure(bind=engine)
+    saved = (
+        fetch_dart._get_page,
+        fetch_dart._SEEN,
+        fetch_dart.PAGE_COUNT,
+        settings.DART_API_KEY,
+    )
+    listing = _Listing(page_count)
+    fetch_dart._get_page = listing.get_page
+    fetch_dart.PAGE_COUNT = page_count
+    settings.DART_API_KEY = "check"
+    ok = True
+    try:
+        Base.metadata.create_all(engine)
+
+        # both series present: new filings in either must be picked up
+        fetch_dart._SEEN = fetch_dart.SeenReceipts()
+        n_mixed = page_count + page_count // 2
+        for i in range(n_mixed):
+            listing.add("80", i, cb=i % 3 == 0)
+        for i in range(5):
+            listing.add("00", i, cb=i % 2 == 0)
+        want = len(range(0, n_mixed, 3)) + len(range(0, 5, 2))
+        first = _poll()
+        ok &= _check("two series, first poll", len(first) == want, f"{len(first)} new")
+        listing.add("00", 5)
+        listing.add("80", n_mixed)
+        ok &= _expect("two series, later poll", _poll(), "000005", f"80{n_mixed:04d}")
+        ok &= _expect("two series, quiet poll", _poll())
+
+        # KRX only, then the day's first FSS filing sorts behind all of it
+        listing.items.clear()
+        with engine.begin() as conn:
+            Base.metadata.drop_all(conn)
+            Base.metadata.create_all(conn)
+        fetch_dart._SEEN = fetch_dart.SeenReceipts()
+        for i in range(n_krx):
+            listing.add("80", i)
+        first = _poll()
+        ok &= _check(f"{n_krx} KRX filings", len(first) == n_krx, f"{len(first)} new")
+        listing.add("00", 0)
+        ok &= _expect("first FSS filing behind the KRX block", _poll(), "000000")
+        listing.add("80", n_krx)
+        listing.add("00", 1)
+        ok &= _expect("both series advance", _poll(), "000001", f"80{n_krx:04d}")
+
+        fetch_dart._SEEN = fetch_dart.SeenReceipts()  # restart
+        ok &= _expect("quiet poll after restart", _poll())
+        day = fetch_dart._today()
+        heads = fetch_dart.load_cursor()
+        want = {
+            int(f"{day}00"): int(f"{day}000001"),
+            int(f"{day}80"): int(f"{day}80{n_krx:04d}"),
+        }
+        ok &= _check("stored heads", heads == want, str(heads))
+    finally:
+        (
+            fetch_dart._get_page,
+            fetch_dart._SEEN,
+            fetch_dart.PAGE_COUNT,
+            settings.DART_API_KEY,
+        ) = saved
+        SessionLocal.configure(bind=bind)
+        engine.dispose()
+        os.remove(path)
+    return ok
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--krx", type=int, default=150)
+    ap.add_argument("--page-count", type=int, default=100)
+    args = ap.parse_args()
+    raise SystemExit(0 if run(args.krx, args.page_count) else 1)
@@ -0,0 +1,131 @@
+"""정규화 멱등성 점검: normalize_recent를 두 번 돌려도 NormEvent가 늘지 않는지 확인
+사용법:
+    python -m app.tools_check_normalize [--rows 5000] [--listings 200]
+
+임시 SQLite DB에 합성 RawEvent를 적재하고 normalize_recent를 실행한 뒤
+- 같은 입력으로 다시 실행
+에서 norm_events 행 수와 묶인 raw 수가 변하지 않는지, 이미 처리된 id보다
+작은 id로 늦게 커밋된 raw와 새 raw만 추가로 처리되는지 검사합니다. 실패하면 종료 코드 1. 운영 DB는 건드리지 않습니다.
+"""
+
+import argparse
+import os
+import tempfile
+
+from sqlalchemy import create_engine, func, insert, select
+
+from . import cluster, match_ticker
+from .db import SessionLocal
+from .models import Base, DimListing, NormEvent, RawEvent
+from .normalizer import normalize_recent
+from .tools_bench_normalize import _synthetic
+
+
+def _counts(s) -> tuple[int, int, int]:
+    """(norm_events, raw rows folded into one, raw rows without a link)."""
+    events = s.execute(select(func.count(NormEvent.event_id))).scalar()
+    linked = s.execute(
+        select(func.count(RawEvent.id)).where(RawEvent.norm_event_id.is_not(None))
+    ).scalar()
+    unlinked = s.execute(
+        select(func.count(RawEvent.id)).where(RawEvent.norm_event_id.is_(None))
+    ).scalar()
+    return events, linked, unlinked
+
+
+def _add_raws(s, raws: list[tuple[int, dict]]):
+    """Insert (id, row) pairs with explicit ids."""
+    for i in range(0, len(raws), 1000):
+        chunk = [
+            {**r, "id": rid, "dedup_key": f"check:{rid}"}
+            for rid, r in raws[i : i + 1000]
+        ]
+        s.execute(insert(RawEvent), chunk)
+    s.commit()
+
+
+def _check(label, ok, detail) -> bool:
+    print(f"{'PASS' if ok else 'FAIL'} {label}: {detail}")
+    return ok
+
+
+def run(n_rows: int = 5000, n_listings: int = 200) -> bool:
+    listings, raws = _synthetic(n_rows + n_rows // 5, n_listings)
+    numbered = list(enumerate(raws, start=1))
+    first, later = numbered[:n_rows], numbered[n_rows:]
+    # every 10th id commits late: after higher ids were already normalized
+    late = first[::10]
+    early = [pair for i, pair in enumerate(first) if i % 10]
+
+    fd, path = tempfile.mkstemp(suffix=".db", prefix="cb_check_")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", future=True)
+    bind = SessionLocal.kw["bind"]
+    SessionLocal.configure(bind=engine)  # normalize_recent opens its own sessions
+    cluster.reset_index()
+    match_ticker.invalidate_ticker_index()
+    ok = True
+    try:
+        Base.metadata.create_all(engine)
+        with SessionLocal() as s:
+            s.execute(
+                insert(DimListing),
+                [{"stock_code": code, "corp_name_kr": name} for name, code in listings],
+            )
+            s.commit()
+            _add_raws(s, early)
+
+        processed = normalize_recent()
+        with SessionLocal() as s:
+            base = _counts(s)
+        ok &= _check(
+            "first run",
+            processed == len(early) and base[1] == len(early) and base[2] == 0,
+            f"processed={processed}, events={base[0]}, linked={base[1]}",
+        )
+
+        processed = normalize_recent()
+        with SessionLocal() as s:
+            again = _counts(s)
+        ok &= _check(
+            "second run",
+            processed == 0 and again == base,
+            f"processed={processed}, events={again[0]} (was {base[0]})",
+        )
+
+        with SessionLocal() as s:
+            _add_raws(s, late)
+        processed = normalize_recent()
+        with SessionLocal() as s:
+            caught = _counts(s)
+        ok &= _check(
+            "late-committed lower ids",
+            processed == len(late) and caught[1] == n_rows and caught[2] == 0,
+            f"processed={processed}, linked={caught[1]} of {n_rows}",
+        )
+
+        with SessionLocal() as s:
+            _add_raws(s, later)
+        processed = normalize_recent()
+        with SessionLocal() as s:
+            grown = _counts(s)
+        ok &= _check(
+            "new rows only",
+            processed == len(later) and grown[1] == len(raws) and grown[2] == 0,
+            f"processed={processed}, events={grown[0]} (+{grown[0] - caught[0]})",
+        )
+    finally:
+        SessionLocal.configure(bind=bind)
+        cluster.reset_index()
+        match_ticker.invalidate_ticker_index()
+        engine.dispose()
+        os.remove(path)
+    return ok
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=int, default=5000)
+    ap.add_argument("--listings", type=int, default=200)
+    args = ap.parse_args()
+    raise SystemExit(0 if run(args.rows, args.listings) else 1)
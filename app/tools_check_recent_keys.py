@@ -0,0 +1,78 @@
+"""SSE dedup 집합 점검: _RecentKeys가 상한(max_size)과 메모리 한도를 지키는지 확인
+사용법:
+    python -m app.tools_check_recent_keys [--keys 100000] [--bytes-per-key 300]
+
+기본 상한(20000)을 넘겨 키를 채운 뒤 크기가 max_size를 넘지 않는지,
+tracemalloc으로 잰 메모리가 max_size x --bytes-per-key 이하이고 키를 더
+넣어도 늘지 않는지, 시간 창(window_sec)이 지나면 비워지는지 검사합니다. 실패하면 종료 코드 1.
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from .realtime import _RecentKeys, _row_key
+
+
+def _check(label, ok, detail) -> bool:
+    print(f"{'PASS' if ok else 'FAIL'} {label}: {detail}")
+    return ok
+
+
+def _fill(keys: _RecentKeys, start: int, n: int):
+    for i in range(start, start + n):
+        keys.add(_row_key({"url": f"https://n.news.naver.com/{i}", "time": str(i)}))
+
+
+def run(n_keys: int = 100_000, bytes_per_key: int = 300) -> bool:
+    keys = _RecentKeys(window_sec=3600)
+    ok = True
+
+    tracemalloc.start()
+    _fill(keys, 0, keys.max_size + n_keys)
+    churned, _ = tracemalloc.get_traced_memory()
+    _fill(keys, keys.max_size + n_keys, n_keys)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total = keys.max_size + 2 * n_keys
+    ok &= _check(
+        "size",
+        len(keys) == keys.max_size,
+        f"{len(keys)} keys after {total} adds (cap {keys.max_size})",
+    )
+    limit = keys.max_size * bytes_per_key
+    ok &= _check(
+        "memory",
+        peak <= limit,
+        f"{current:,} B current, {peak:,} B peak "
+        f"({current / len(keys):.0f} B/key, limit {limit:,} B)",
+    )
+    # once the table has churned, more keys must not grow it
+    ok &= _check(
+        "flat past cap",
+        current <= churned * 1.05,
+        f"{churned:,} B -> {current:,} B after {n_keys} more keys",
+    )
+    newest = _row_key(
+        {
+            "url": f"https://n.news.naver.com/{total - 1}",
+            "time": str(total - 1),
+        }
+    )
+    ok &= _check("newest kept", not keys.add(newest), "latest key still suppressed")
+
+    short = _RecentKeys(window_sec=0.05)
+    _fill(short, 0, 1000)
+    time.sleep(0.1)
+    short.add(-1)
+    ok &= _check("window expiry", len(short) == 1, f"{len(short)} keys after window")
+    return ok
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--keys", type=int, default=100_000)
+    ap.add_argument("--bytes-per-key", type=int, default=300)
+    args = ap.parse_args()
+    raise SystemExit(0 if run(args.keys, args.bytes_per_key) else 1)
@@ -0,0 +1,185 @@
+"""인덱스 점검: 대량 시드 후 대시보드/수집 핫 쿼리의 실행 계획(EXPLAIN)과 지연 확인
+사용법:
+    python -m app.tools_explain_indexes [--rows 1000000] [--budget-ms 50] [--dsn URL]
+
+기본은 임시 SQLite DB에 norm_events / raw_events를 --rows 건씩 적재하고
+ANALYZE 후 각 쿼리가
+- 기대한 인덱스를 사용하는지 (EXPLAIN 결과에 인덱스 이름이 있는지)
+- 중앙값 지연이 --budget-ms 이하인지
+검사합니다. 실패하면 종료 코드 1. --dsn으로 PostgreSQL/MySQL 스크래치 DB를
+지정할 수 있으며, norm_events가 비어 있지 않으면 적재하지 않고 중단합니다.
+"""
+
+import argparse
+import datetime as dt
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, func, insert, select, text
+
+from .analytics import _counts_stmt, _enriched_stmt
+from .models import EFFECTIVE_TIME, Base, NormEvent, RawEvent
+from .scorer import _top_stmt
+
+CHUNK = 10_000
+TYPES = ["ISSUE", "REFIX", "CONVERSION", "REDEMPTION", "OTHER"]
+
+
+def _hot_queries() -> list[tuple[str, object, str]]:
+    """(label, statement, index the plan must use)."""
+    cutoff = dt.datetime.utcnow() - dt.timedelta(minutes=360)
+    day = dt.datetime.utcnow().strftime("%Y%m%d")
+    return [
+        ("scorer.top_today", _top_stmt(10), "ix_norm_events_score_time"),
+        ("analytics.top_enriched", _enriched_stmt(50), "ix_norm_events_score_eff_time"),
+        ("analytics.counts_by_type", _counts_stmt(24), "ix_norm_events_eff_time_type"),
+        (
+            "hotfeed recent window",
+            select(NormEvent.event_id).where(EFFECTIVE_TIME >= cutoff),
+            "ix_norm_events_eff_time_type",
+        ),
+        (
+            "ingest dedup lookup",
+            select(RawEvent.dedup_key).where(
+                RawEvent.dedup_key.in_([f"bench:{i}" for i in range(0, 5000, 50)])
+            ),
+            "ux_raw_events_dedup_key",
+        ),
+        (
+            "fetch_dart seen warm-up",
+            select(RawEvent.dedup_key).where(
+                RawEvent.dedup_key >= f"dart:{day}",
+                RawEvent.dedup_key < f"dart:{day}~",
+            ),
+            "ux_raw_events_dedup_key",
+        ),
+        (
+            "normalizer members",
+            select(RawEvent.id).where(RawEvent.norm_event_id == 12345),
+            "ix_raw_events_norm_event_id",
+        ),
+        (
+            "normalizer pending rows",
+            select(RawEvent.id)
+            .where(RawEvent.norm_event_id.is_(None), RawEvent.id > 0)
+            .order_by(RawEvent.id)
+            .limit(500),
+            "ix_raw_events_norm_event_id",
+        ),
+    ]
+
+
+def _seed(engine, n_rows: int, seed: int = 7):
+    rnd = random.Random(seed)
+    now = dt.datetime.utcnow()
+    with engine.begin() as conn:
+        for start in range(0, n_rows, CHUNK):
+            raws, events = [], []
+            for i in range(start, min(start + CHUNK, n_rows)):
+                t = now - dt.timedelta(seconds=rnd.randint(0, 30 * 86400))
+                source = "dart" if i % 10 == 0 else "naver_news"
+                raws.append(
+                    {
+                        "id": i + 1,
+                        "source": source,
+                        "url": f"https://example.com/{i}",
+                        "title": f"테스트기업{i % 2000:04d}, 전환사채 발행 결정",
+                        "published_at": t,
+                        "inserted_at": t,
+                        "dedup_key": (
+                            f"dart:{t:%Y%m%d}{i:06d}"
+                            if source == "dart"
+                            else f"bench:{i}"
+                        ),
+                        "norm_event_id": i // 10 + 1,
+                    }
+                )
+                events.append(
+                    {
+                        "event_id": i + 1,
+                        "raw_id": i + 1,
+                        "stock_code": f"{i % 2000:06d}",
+                        "event_type": rnd.choice(TYPES),
+                        "headline": "h",
+                        "score": round(rnd.random(), 3),
+                        "has_official": source == "dart",
+                        # ~10% without a source time: coalesce to created_at
+                        "event_time": None if i % 10 == 1 else t,
+                        "created_at": t,
+                    }
+                )
+            conn.execute(insert(RawEvent.__table__), raws)
+            conn.execute(insert(NormEvent.__table__), events)
+        conn.execute(text("ANALYZE"))
+
+
+def _plan(conn, stmt) -> str:
+    sql = str(stmt.compile(conn.engine, compile_kwargs={"literal_binds": True}))
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    return "\n".join(
+        " ".join(map(str, row)) for row in conn.exec_driver_sql(prefix + sql)
+    )
+
+
+def _median_ms(conn, stmt, repeat: int = 5) -> float:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        conn.execute(stmt).all()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def run(n_rows: int = 1_000_000, budget_ms: float = 50.0, dsn: str | None = None):
+    path = None
+    if dsn is None:
+        fd, path = tempfile.mkstemp(suffix=".db", prefix="cb_explain_")
+        os.close(fd)
+        dsn = f"sqlite:///{path}"
+    engine = create_engine(dsn, future=True)
+    ok = True
+    try:
+        Base.metadata.create_all(engine)
+        with engine.connect() as conn:
+            existing = conn.execute(select(func.count(NormEvent.event_id))).scalar()
+        if existing:
+            print(f"norm_events already has {existing} rows; use an empty scratch DB")
+            return False
+        started = time.perf_counter()
+        _seed(engine, n_rows)
+        print(
+            f"seeded {n_rows:,} rows per table in {time.perf_counter() - started:.0f}s"
+        )
+
+        with engine.connect() as conn:
+            for label, stmt, index in _hot_queries():
+                plan = _plan(conn, stmt)
+                ms = _median_ms(conn, stmt)
+                used = index in plan
+                fast = ms <= budget_ms
+                ok &= used and fast
+                print(
+                    f"{'PASS' if used and fast else 'FAIL'} {label}: "
+                    f"{index} {'used' if used else 'NOT used'}, {ms:.1f} ms"
+                )
+                if not used:
+                    print("    " + plan.replace("\n", "\n    "))
+    finally:
+        engine.dispose()
+        if path is not None:
+            os.remove(path)
+    return ok
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--budget-ms", type=float, default=50.0)
+    ap.add_argument(
+        "--dsn", default=None, help="empty scratch DB (default: temp SQLite)"
+    )
+    args = ap.parse_args()
+    raise SystemExit(0 if run(args.rows, args.budget_ms, args.dsn) else 1)